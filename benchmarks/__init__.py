@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the events API.
+
+Each module is runnable with ``python -m benchmarks.<name>`` from the project
+root. Benchmarks run against a throwaway SQLite file (``BENCHMARK_DB``), never
+against ``db.sqlite3``.
+"""
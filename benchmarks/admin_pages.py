@@ -0,0 +1,71 @@
+"""
+Time the admin pages that used to grow with the number of attendees.
+
+    python -m benchmarks.admin_pages --events 10 --attendees 100000
+
+Seeds the data with raw inserts, logs in a superuser and requests each page
+``--repeat`` times through the in-process ``Client``, reporting latency and
+SQL queries per page.
+"""
+import argparse
+import time
+
+from benchmarks import harness
+
+
+def pages(event_id):
+    from django.urls import reverse
+
+    changelist = reverse('admin:events_attendee_changelist')
+    return [
+        ('event change page', reverse('admin:events_event_change', args=[event_id])),
+        ('event changelist', reverse('admin:events_event_changelist')),
+        ('event search', reverse('admin:events_event_changelist') + '?q=seeded'),
+        ('attendee changelist', changelist),
+        ('attendees of one event', f'{changelist}?event__id__exact={event_id}'),
+        ('attendee change page', reverse('admin:events_attendee_change', args=[1])),
+        ('event autocomplete', reverse('admin:autocomplete') + '?app_label=events&model_name=attendee&field_name=event&term=seeded'),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=10)
+    parser.add_argument('--attendees', type=int, default=100_000, help='attendees per event')
+    parser.add_argument('--repeat', type=int, default=20, help='requests per page')
+    args = parser.parse_args()
+
+    harness.setup()
+    harness.bulk_seed(events=args.events, attendees_per_event=args.attendees)
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from events.models import Event
+
+    client = Client()
+    client.force_login(User.objects.create_superuser('bench', 'bench@example.com', 'bench'))
+    # The first event: its attendees are furthest from the end of the table
+    event_id = Event.objects.order_by('id').values_list('id', flat=True).first()
+
+    rows = []
+    for name, url in pages(event_id):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise SystemExit(f'{name}: HTTP {response.status_code}')
+        latencies = []
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                request_started = time.perf_counter()
+                client.get(url)
+                latencies.append(time.perf_counter() - request_started)
+            elapsed = time.perf_counter() - started
+        rows.append({'page': name, **harness.summarize(latencies, elapsed), 'queries': len(queries) // args.repeat})
+
+    harness.print_table(rows, ['page', 'requests', 'mean_ms', 'p50_ms', 'p99_ms', 'queries'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark every events API endpoint and save the results as JSON.
+
+    python -m benchmarks.api_suite --events 100000 --attendees 100 --output results/HEAD.json
+    python -m benchmarks.api_suite --reuse --output results/HEAD.json --compare results/main.json
+
+Seeds ``--events`` events with ``--attendees`` attendees each (``--reuse``
+keeps the previous benchmark database instead), then drives each endpoint
+twice through Django's in-process test client: ``serial`` (one client) and
+``concurrent`` (``--concurrency`` client threads). Each row reports
+throughput, p50/p95/p99 latency and SQL queries per request, the latter read
+from the ``/metrics`` registry. ``--compare`` prints the change against an
+earlier results file.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from benchmarks import harness
+
+# Suite endpoint -> (URL name, extra settings)
+ENDPOINTS = {
+    'event-list': ('event-list', {}),
+    'event-list-uncached': ('event-list', {'EVENT_LIST_CACHE': {'ALIAS': 'nocache'}}),
+    'event-detail': ('event-detail', {}),
+    'event-attendees': ('event-attendees', {}),
+    'event-register': ('event-register', {}),
+}
+MODES = ('serial', 'concurrent')
+# Listing requests spread over up to this many pages
+MAX_LIST_PAGES = 50
+
+
+def _request_args(url_name, event_ids, list_pages, sequence, run_id):
+    from django.urls import reverse
+
+    n = next(sequence)
+    event_id = event_ids[n % len(event_ids)]
+    if url_name == 'event-list':
+        return 'get', reverse('events:event-list'), {'data': {'page': n % list_pages + 1}}
+    if url_name == 'event-register':
+        return 'post', reverse('events:event-register', args=[event_id]), {
+            'data': {'name': f'Bench {n}', 'email': f'bench-{run_id}-{n}@example.com'},
+            'content_type': 'application/json',
+        }
+    return 'get', reverse(f'events:{url_name}', args=[event_id]), {}
+
+
+def run(endpoint, event_ids, list_pages, requests, concurrency):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from events.metrics import registry
+
+    url_name, overrides = ENDPOINTS[endpoint]
+    sequence = count()
+    run_id = uuid.uuid4().hex[:8]
+
+    def worker(n):
+        client = Client()
+        latencies, errors = [], 0
+        for _ in range(n):
+            method, url, kwargs = _request_args(url_name, event_ids, list_pages, sequence, run_id)
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+        if concurrency > 1:
+            connection.close()
+        return latencies, errors
+
+    with override_settings(**overrides):
+        cache.clear()
+        registry.reset()
+        shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(worker, shares))
+        elapsed = time.perf_counter() - started
+
+    summary = harness.summarize([l for lat, _ in results for l in lat], elapsed, sum(e for _, e in results))
+    method = 'POST' if url_name == 'event-register' else 'GET'
+    totals = registry.snapshot().get((f'events:{url_name}', method), {'requests': 0, 'db_queries': 0})
+    summary['queries_per_request'] = round(totals['db_queries'] / totals['requests'], 2) if totals['requests'] else None
+    return summary
+
+
+def _metadata(args, event_ids, list_pages):
+    from django.conf import settings
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'settings': os.environ.get('DJANGO_SETTINGS_MODULE'),
+        'api_stack': getattr(settings, 'EVENTS_API_STACK', 'sync'),
+        'events': len(event_ids),
+        'list_pages': list_pages,
+        'attendees_per_event': args.attendees,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+    }
+
+
+def compare(rows, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(row['endpoint'], row['mode']): row for row in json.load(f)['results']}
+    table = []
+    for row in rows:
+        before = baseline.get((row['endpoint'], row['mode']))
+        if before is None:
+            continue
+        table.append({
+            'endpoint': row['endpoint'],
+            'mode': row['mode'],
+            'rps': f"{before['rps']} -> {row['rps']} ({_change(before['rps'], row['rps'])})",
+            'p99_ms': f"{before['p99_ms']} -> {row['p99_ms']} ({_change(before['p99_ms'], row['p99_ms'])})",
+            'queries': f"{before['queries_per_request']} -> {row['queries_per_request']}",
+        })
+    print(f'\nCompared with {baseline_path}:')
+    harness.print_table(table, ['endpoint', 'mode', 'rps', 'p99_ms', 'queries'])
+
+
+def _change(before, after):
+    return f'{(after - before) / before * 100:+.1f}%' if before else 'n/a'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=10_000)
+    parser.add_argument('--attendees', type=int, default=100, help='attendees per event')
+    parser.add_argument('--reuse', action='store_true', help='keep the existing benchmark database')
+    parser.add_argument('--requests', type=int, default=2000, help='requests per endpoint and mode')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads in concurrent mode')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to compare against')
+    args = parser.parse_args()
+
+    harness.setup(fresh=not args.reuse)
+    from django.utils import timezone
+    from events.models import Event
+    from events.pagination import EventPagination
+
+    if not Event.objects.exists():
+        started = time.perf_counter()
+        attendees = harness.bulk_seed(events=args.events, attendees_per_event=args.attendees)
+        print(f'Seeded {args.events} events and {attendees} attendees in {time.perf_counter() - started:.1f}s')
+    # Upcoming events only, so detail and register hit the same rows as the listing
+    upcoming = Event.objects.filter(start_time__gt=timezone.now())
+    event_ids = list(upcoming.order_by('start_time').values_list('id', flat=True)[:1000])
+    # Only pages that exist, or small seeds would time 404s as listing requests
+    list_pages = max(min(math.ceil(upcoming.count() / EventPagination.page_size), MAX_LIST_PAGES), 1)
+
+    rows = []
+    for endpoint in args.endpoints:
+        for mode in MODES:
+            summary = run(endpoint, event_ids, list_pages, args.requests, args.concurrency if mode == 'concurrent' else 1)
+            rows.append({'endpoint': endpoint, 'mode': mode, **summary})
+
+    harness.print_table(
+        rows, ['endpoint', 'mode', 'requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request'],
+    )
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'meta': _metadata(args, event_ids, list_pages), 'results': rows}, f, indent=2)
+        print(f'\nResults written to {args.output}')
+    if args.compare:
+        compare(rows, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Time archiving finished events and compare the database before and after.
+
+    python -m benchmarks.archive --events 50000 --attendees 50 --finished 0.8
+
+Seeds ``--events`` events, moves the ``--finished`` fraction of them two years
+into the past, then times ``archive_events`` and reports the size of the live
+database (after VACUUM) and of the archive file. Live queries that should not
+care about old events are timed before and after: the ``has_seats`` listing
+and an attendee email lookup across events. Reading and restoring an archived
+event are timed last.
+"""
+import argparse
+import os
+import time
+from datetime import timedelta
+
+from benchmarks import harness
+
+
+def database_bytes(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA page_count')
+        pages = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        return pages * cursor.fetchone()[0]
+
+
+def per_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def live_queries(client, repeat):
+    from django.urls import reverse
+
+    listing = reverse('events:event-list')
+    lookup = reverse('events:attendee-registrations')
+    return {
+        'has_seats_ms': round(per_call(lambda: client.get(listing, {'has_seats': 'true'}), repeat), 3),
+        'email_lookup_ms': round(per_call(lambda: client.get(lookup, {'email': 'attendee7@example.com'}), repeat), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=50_000)
+    parser.add_argument('--attendees', type=int, default=50, help='attendees per event')
+    parser.add_argument('--finished', type=float, default=0.8, help='fraction of events that are long over')
+    parser.add_argument('--chunk-size', type=int, default=100, help='events per archive transaction')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    from benchmarks import settings
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(settings.ARCHIVE['PATH'] + suffix):
+            os.remove(settings.ARCHIVE['PATH'] + suffix)
+    harness.setup()
+    harness.bulk_seed(args.events, args.attendees)
+
+    from django.db import connection
+    from django.db.models import F
+    from django.test import Client
+    from django.test.utils import override_settings
+    from events.archive import archive_events, get_store, restore_events
+    from events.models import Event
+
+    finished = int(args.events * args.finished)
+    past = list(Event.objects.order_by('id').values_list('id', flat=True)[:finished])
+    for start in range(0, len(past), 10_000):
+        Event.objects.filter(pk__in=past[start:start + 10_000]).update(
+            start_time=F('start_time') - timedelta(days=730), end_time=F('end_time') - timedelta(days=730),
+        )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    client = Client()
+    rows = []
+    # Uncached listings, so every request reaches the database
+    with override_settings(EVENT_LIST_CACHE={'ALIAS': 'nocache'}):
+        before = live_queries(client, args.repeat)
+        rows.append({'stage': 'before', 'live_events': Event.objects.count(),
+                     'db_mb': round(database_bytes(connection) / 2**20, 1), 'archive_mb': 0, **before})
+
+        started = time.perf_counter()
+        events, attendees = archive_events(chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+            cursor.execute('ANALYZE')
+        after = live_queries(client, args.repeat)
+        rows.append({'stage': 'after', 'live_events': Event.objects.count(),
+                     'db_mb': round(database_bytes(connection) / 2**20, 1),
+                     'archive_mb': round(os.path.getsize(get_store().path) / 2**20, 1), **after})
+
+    print(f'Archived {events} events and {attendees} attendees in {elapsed:.1f}s '
+          f'({events / elapsed:.0f} events/s, {attendees / elapsed:.0f} attendees/s)\n')
+    harness.print_table(rows, ['stage', 'live_events', 'db_mb', 'archive_mb', 'has_seats_ms', 'email_lookup_ms'])
+
+    from django.urls import reverse
+    event_id = past[len(past) // 2]
+    detail = reverse('events:archived-event-detail', args=[event_id])
+    listing = reverse('events:archived-event-list')
+    print()
+    harness.print_table([
+        {'operation': 'GET archived event', 'ms': round(per_call(lambda: client.get(detail), args.repeat), 3)},
+        {'operation': 'GET archive listing', 'ms': round(
+            per_call(lambda: client.get(listing, {'location': 'Venue 7'}), args.repeat), 3)},
+        {'operation': 'restore one event', 'ms': round(per_call(lambda: restore_events([event_id]), 1), 3)},
+    ], ['operation', 'ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Compare the sync (WSGI) and async (ASGI) API stacks under concurrent clients.
+
+    python -m benchmarks.asgi_vs_wsgi --requests 2000 --concurrency 50
+
+Each stack runs in its own subprocess against a freshly seeded database, with
+``EVENTS_API_STACK`` set accordingly. Requests go through Django's in-process
+test clients (``Client`` on threads for WSGI, ``AsyncClient`` on one event loop
+for ASGI), so the numbers cover the full handler and view stack but no HTTP
+server or network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from benchmarks import harness
+
+ENDPOINTS = ('event-list', 'event-detail', 'event-attendees', 'event-register')
+
+
+def _request_args(endpoint, event_ids, sequence):
+    from django.urls import reverse
+
+    event_id = event_ids[next(sequence) % len(event_ids)]
+    if endpoint == 'event-list':
+        return 'get', reverse('events:event-list'), {'data': {'timezone': 'UTC'}}
+    if endpoint == 'event-register':
+        n = next(sequence)
+        return 'post', reverse('events:event-register', args=[event_id]), {
+            'data': {'name': f'Bench {n}', 'email': f'bench{n}@example.com'},
+            'content_type': 'application/json',
+        }
+    return 'get', reverse(f'events:{endpoint}', args=[event_id]), {}
+
+
+def run_wsgi(endpoint, event_ids, requests, concurrency):
+    from django.db import connection
+    from django.test import Client
+
+    sequence = count()
+
+    def worker(n):
+        client = Client()
+        latencies, errors = [], 0
+        for _ in range(n):
+            method, url, kwargs = _request_args(endpoint, event_ids, sequence)
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+        connection.close()
+        return latencies, errors
+
+    shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, shares))
+    elapsed = time.perf_counter() - started
+    return harness.summarize([l for lat, _ in results for l in lat], elapsed, sum(e for _, e in results))
+
+
+def run_asgi(endpoint, event_ids, requests, concurrency):
+    from django.test import AsyncClient
+
+    sequence = count()
+
+    async def worker(n):
+        client = AsyncClient()
+        latencies, errors = [], 0
+        for _ in range(n):
+            method, url, kwargs = _request_args(endpoint, event_ids, sequence)
+            started = time.perf_counter()
+            response = await getattr(client, method)(url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+        return latencies, errors
+
+    async def main():
+        shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        return await asyncio.gather(*(worker(n) for n in shares))
+
+    started = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    return harness.summarize([l for lat, _ in results for l in lat], elapsed, sum(e for _, e in results))
+
+
+def run_stack(args):
+    harness.setup()
+    event_ids = harness.seed(events=args.events, attendees_per_event=args.attendees)
+    runner = run_asgi if args.stack == 'async' else run_wsgi
+    results = []
+    for endpoint in ENDPOINTS:
+        if endpoint == 'event-list':
+            # Measure the handlers, not the listing cache
+            from django.core.cache import cache
+            cache.clear()
+        summary = runner(endpoint, event_ids, args.requests, args.concurrency)
+        results.append({'stack': args.stack, 'endpoint': endpoint, **summary})
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stack', choices=('sync', 'async'), help=argparse.SUPPRESS)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent clients')
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--attendees', type=int, default=50, help='attendees per event')
+    args = parser.parse_args()
+
+    if args.stack:
+        run_stack(args)
+        return
+
+    rows = []
+    for stack in ('sync', 'async'):
+        env = {**os.environ, 'EVENTS_API_STACK': stack, 'DJANGO_SETTINGS_MODULE': 'benchmarks.settings'}
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.asgi_vs_wsgi', '--stack', stack, *sys.argv[1:]],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        rows.extend(json.loads(output.strip().splitlines()[-1]))
+
+    rows.sort(key=lambda row: (ENDPOINTS.index(row['endpoint']), row['stack']))
+    harness.print_table(rows, ['endpoint', 'stack', 'requests', 'errors', 'rps', 'p50_ms', 'p99_ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Sustained door check-ins against one large event.
+
+    python -m benchmarks.checkin --attendees 100000 --scans 20000 --concurrency 8
+
+Seeds an event with ``--attendees`` registrations, then checks in distinct
+attendees through ``POST /api/events/<id>/checkin/``: serially, and from
+``--concurrency`` scanner threads (in-process ``Client``, no HTTP server).
+Finally it syncs offline scans through the batch endpoint, ``--batch-size``
+per request. Throughput is reported as check-ins per second.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import harness
+
+
+def scanners(event_id, tokens, concurrency):
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    url = reverse('events:event-checkin', args=[event_id])
+
+    def scanner(share):
+        client = Client()
+        latencies, errors = [], 0
+        for token in share:
+            started = time.perf_counter()
+            response = client.post(url, {'token': token}, content_type='application/json')
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code != 200
+        if concurrency > 1:
+            connection.close()
+        return latencies, errors
+
+    shares = [tokens[i::concurrency] for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(scanner, shares))
+    elapsed = time.perf_counter() - started
+    return harness.summarize([l for lat, _ in results for l in lat], elapsed, sum(e for _, e in results))
+
+
+def batches(event_id, tokens, batch_size):
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+
+    url = reverse('events:event-checkin-batch', args=[event_id])
+    client = Client()
+    scanned_at = timezone.now().isoformat()
+    latencies, errors, checked_in = [], 0, 0
+    started = time.perf_counter()
+    for start in range(0, len(tokens), batch_size):
+        scans = [{'token': token, 'scanned_at': scanned_at} for token in tokens[start:start + batch_size]]
+        request_started = time.perf_counter()
+        response = client.post(url, {'scans': scans}, content_type='application/json')
+        latencies.append(time.perf_counter() - request_started)
+        errors += response.status_code != 200
+        checked_in += response.json().get('checked_in', 0) if response.status_code == 200 else 0
+    elapsed = time.perf_counter() - started
+    return harness.summarize(latencies, elapsed, errors), checked_in, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attendees', type=int, default=100_000, help='registrations for the event')
+    parser.add_argument('--scans', type=int, default=20_000, help='check-ins per single-scan mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='scanner threads')
+    parser.add_argument('--batch-size', type=int, default=1000, help='scans per offline sync request')
+    args = parser.parse_args()
+    if args.scans * 2 > args.attendees:
+        parser.error('--attendees must be at least twice --scans, so every scan checks someone in')
+
+    harness.setup()
+    harness.bulk_seed(events=1, attendees_per_event=args.attendees)
+
+    from events.models import Attendee, Event
+
+    event_id = Event.objects.values_list('id', flat=True).get()
+    tokens = list(Attendee.objects.filter(event_id=event_id).order_by('?').values_list('checkin_token', flat=True))
+
+    rows = []
+    for mode, share, concurrency in (
+        ('serial', tokens[:args.scans], 1),
+        ('concurrent', tokens[args.scans:args.scans * 2], args.concurrency),
+    ):
+        summary = scanners(event_id, share, concurrency)
+        rows.append({'mode': mode, 'scanners': concurrency, 'checkins_per_s': summary['rps'], **summary})
+
+    summary, checked_in, elapsed = batches(event_id, tokens[args.scans * 2:], args.batch_size)
+    rows.append({'mode': f'batch x{args.batch_size}', 'scanners': 1,
+                 'checkins_per_s': round(checked_in / elapsed, 1), **summary})
+
+    harness.print_table(rows, ['mode', 'scanners', 'checkins_per_s', 'requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Time the /api/events/ filters against a large event table.
+
+    python -m benchmarks.event_search --events 1000000
+
+Seeds ``--events`` upcoming events spread over 500 venues and a year. Each
+filter runs as ``EventListCreate`` runs it (same filter backend and cursor
+ordering, first page of 10). The report shows median and p99 query time and
+the SQLite plan, so a missing index shows up as a SCAN.
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from benchmarks import harness
+
+FILTERS = {
+    'upcoming': {},
+    'location': {'location': 'Venue 42'},
+    'window': {'starts_after': '+30d', 'starts_before': '+37d'},
+    'location+window': {'location': 'Venue 42', 'starts_after': '+30d', 'starts_before': '+90d'},
+    'has_seats': {'has_seats': 'true'},
+    'text (rare)': {'q': 'quasar'},
+    'text (common)': {'q': 'summit'},
+    'text+location': {'q': 'summit', 'location': 'Venue 42'},
+}
+
+WORDS = ['Summit', 'Meetup', 'Conference', 'Workshop', 'Festival', 'Expo', 'Hackathon', 'Gala']
+
+
+def seed(n, batch_size=20000):
+    from django.utils import timezone
+    from events.models import Event
+
+    rng = random.Random(42)
+    now = timezone.now()
+    for start in range(0, n, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, n)):
+            begins = now + timedelta(minutes=rng.randrange(60, 365 * 24 * 60))
+            word = 'Quasar' if i % 100_000 == 0 else rng.choice(WORDS)
+            rows.append(Event(
+                name=f'{word} {i}',
+                location=f'Venue {rng.randrange(500)}',
+                start_time=begins,
+                end_time=begins + timedelta(hours=2),
+                max_capacity=100,
+                attendee_count=rng.choice((0, 50, 100)),
+            ))
+        Event.objects.bulk_create(rows)
+
+
+def resolve(params):
+    from django.utils import timezone
+
+    now = timezone.now()
+    return {
+        key: (now + timedelta(days=int(value[1:-1]))).isoformat() if value.startswith('+') else value
+        for key, value in params.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    harness.setup()
+    started = time.perf_counter()
+    seed(args.events)
+    print(f'Seeded {args.events} events in {time.perf_counter() - started:.1f}s')
+
+    from django.db import connection
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from events.filters import EventSearchFilter
+    from events.pagination import EventCursorPagination
+    from events.services import EventService
+
+    connection.cursor().execute('ANALYZE')
+    factory = APIRequestFactory()
+    rows = []
+    for label, params in FILTERS.items():
+        request = Request(factory.get('/api/events/', resolve(params)))
+        queryset = EventService.get_upcoming_events(starts_after=EventSearchFilter.starts_after(request))
+        queryset = EventSearchFilter().filter_queryset(request, queryset, None)
+        queryset = queryset.order_by(*EventCursorPagination.ordering)[:10]
+
+        timings = []
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            list(queryset._chain())
+            timings.append(time.perf_counter() - begin)
+
+        sql, sql_params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            plan = cursor.execute(f'EXPLAIN QUERY PLAN {sql}', sql_params).fetchall()
+        stats = harness.summarize(timings, sum(timings))
+        rows.append({
+            'filter': label,
+            'p50_ms': stats['p50_ms'],
+            'p99_ms': stats['p99_ms'],
+            'plan': ' | '.join(step[-1] for step in plan),
+        })
+
+    harness.print_table(rows, ['filter', 'p50_ms', 'p99_ms', 'plan'])
+
+
+if __name__ == '__main__':
+    main()
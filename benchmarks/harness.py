@@ -0,0 +1,143 @@
+"""Shared helpers: Django setup, data seeding and latency statistics."""
+import os
+import random
+import statistics
+
+import django
+
+
+def setup(settings_module='benchmarks.settings', fresh=True):
+    """Configure Django on the benchmark database and migrate it."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if fresh:
+        from benchmarks import settings
+        db_path = settings.DATABASES['default']['NAME']
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(f'{db_path}{suffix}'):
+                os.remove(f'{db_path}{suffix}')
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(events=100, attendees_per_event=100, capacity=None):
+    """Insert ``events`` upcoming events with ``attendees_per_event`` attendees each."""
+    from datetime import timedelta
+    from django.utils import timezone
+    from events.models import Attendee, Event
+
+    now = timezone.now()
+    created = Event.objects.bulk_create(
+        Event(
+            name=f'Benchmark Event {i}',
+            location=f'Venue {i % 50}',
+            start_time=now + timedelta(days=1, minutes=i),
+            end_time=now + timedelta(days=1, minutes=i, hours=2),
+            max_capacity=capacity or attendees_per_event * 10 + 100_000,
+        )
+        for i in range(events)
+    )
+    Attendee.objects.bulk_create(
+        (
+            Attendee(event=event, name=f'Attendee {n}', email=f'attendee{n}@example.com')
+            for event in created
+            for n in range(attendees_per_event)
+        ),
+        batch_size=5000,
+    )
+    return list(Event.objects.order_by('id').values_list('id', flat=True))
+
+
+ATTENDEE_INSERT = (
+    'INSERT INTO events_attendee (event_id, name, email, registered_at, checkin_token) '
+    'VALUES (%s, %s, %s, %s, lower(hex(randomblob(8))))'
+)
+
+
+def bulk_seed(events=1000, attendees_per_event=100, capacity=None, seed=42, batch_size=50_000):
+    """
+    Insert a large data set quickly: raw multi-row inserts in one transaction.
+
+    Events get random venues and start times over the next year and a correct
+    ``attendee_count``; attendees get unique emails per event. Returns the
+    number of attendees inserted. Meant for 10^5 events / 10^7 attendees, where
+    ``seed()`` and model ``bulk_create`` spend most of their time building
+    model instances.
+    """
+    from datetime import timedelta
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    rng = random.Random(seed)
+    adapt = connection.ops.adapt_datetimefield_value
+    now = timezone.now()
+    created_at = adapt(now)
+    capacity = capacity or attendees_per_event * 2 + 1000
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM events_event')
+        first_id = cursor.fetchone()[0] + 1
+
+        starts = []
+        for start in range(0, events, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, events)):
+                begins = now + timedelta(minutes=rng.randrange(60, 365 * 24 * 60), microseconds=i)
+                starts.append(begins)
+                rows.append((
+                    first_id + i, f'Seeded Event {first_id + i}', f'Venue {rng.randrange(500)}',
+                    adapt(begins), adapt(begins + timedelta(hours=2)), capacity, created_at,
+                    attendees_per_event, False, 0, 0, 0, created_at,
+                ))
+            cursor.executemany(
+                'INSERT INTO events_event (id, name, location, start_time, end_time, max_capacity, created_at, '
+                'attendee_count, waitlist_enabled, waitlist_head, waitlist_tail, version, updated_at) '
+                'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                rows,
+            )
+
+        rows = []
+        for i in range(events):
+            event_id = first_id + i
+            registered = starts[i] - timedelta(days=1)
+            for n in range(attendees_per_event):
+                rows.append((event_id, f'Attendee {n}', f'attendee{n}@example.com', adapt(registered + timedelta(seconds=n))))
+            if len(rows) >= batch_size:
+                cursor.executemany(
+                    ATTENDEE_INSERT, rows
+                )
+                rows = []
+        if rows:
+            cursor.executemany(
+                ATTENDEE_INSERT, rows
+            )
+    return events * attendees_per_event
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Throughput and latency percentiles (milliseconds) for one run."""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def print_table(rows, columns):
+    widths = {column: max(len(column), *(len(str(row.get(column, ''))) for row in rows)) for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(str(row.get(column, '')).ljust(widths[column]) for column in columns))
@@ -0,0 +1,83 @@
+"""
+Compare the model serializers with the ``.values()`` list serializers on one page.
+
+    python -m benchmarks.list_serializers --page-size 100 --repeat 500
+
+For each listing it times rendering one page from model instances
+(``EventSerializer``/``AttendeeSerializer``, as the views did before) and from
+``.values()`` rows (``EventListSerializer``/``AttendeeListSerializer``), both
+with the rows already fetched (``serialize``) and including the query
+(``fetch+serialize``). Both sides must render the same JSON, which is checked
+before timing.
+"""
+import argparse
+import time
+
+from benchmarks import harness
+
+
+def listings(page_size):
+    """``(name, model serializer, values serializer, page queryset)`` per list endpoint."""
+    from events.models import Attendee, Event
+    from events.serializers import AttendeeListSerializer, AttendeeSerializer, EventListSerializer, EventSerializer
+
+    first_event = Event.objects.order_by('id').values('id')[:1]
+    return [
+        ('events', EventSerializer, EventListSerializer, Event.objects.order_by('start_time')[:page_size]),
+        ('attendees', AttendeeSerializer, AttendeeListSerializer,
+         Attendee.objects.filter(event_id=first_event).order_by('registered_at')[:page_size]),
+    ]
+
+
+def per_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=500, help='timed renders per measurement')
+    args = parser.parse_args()
+
+    harness.setup()
+    harness.seed(events=args.page_size, attendees_per_event=args.page_size)
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    render = JSONRenderer().render
+    rows = []
+    # The listing renders in the client's timezone, so time it that way too
+    with timezone.override('America/New_York'):
+        for name, model_serializer, values_serializer, page in listings(args.page_size):
+            def model_page(instances=None):
+                return model_serializer(list(page.all()) if instances is None else instances, many=True).data
+
+            def values_page(value_rows=None):
+                if value_rows is None:
+                    value_rows = list(page.values(*values_serializer.columns()))
+                return values_serializer(value_rows).data
+
+            if render(model_page()) != render(values_page()):
+                raise SystemExit(f'{name}: the serializers disagree')
+            instances, value_rows = list(page.all()), list(page.values(*values_serializer.columns()))
+            for stage, model_fn, values_fn in (
+                ('serialize', lambda: model_page(instances), lambda: values_page(value_rows)),
+                ('fetch+serialize', model_page, values_page),
+            ):
+                model_ms = per_call(model_fn, args.repeat) * 1000
+                values_ms = per_call(values_fn, args.repeat) * 1000
+                rows.append({
+                    'listing': name, 'stage': stage, 'rows': args.page_size,
+                    'model_ms': round(model_ms, 3), 'values_ms': round(values_ms, 3),
+                    'speedup': f'{model_ms / values_ms:.1f}x',
+                })
+
+    harness.print_table(rows, ['listing', 'stage', 'rows', 'model_ms', 'values_ms', 'speedup'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure what ``RequestMetricsMiddleware`` adds to each request.
+
+    python -m benchmarks.metrics_overhead --requests 5000
+
+Runs the same sequential requests against each endpoint with and without the
+middleware (in-process ``Client``, no HTTP server), then times the bare
+registry update on its own.
+"""
+import argparse
+import time
+
+from benchmarks import harness
+
+ENDPOINTS = ('event-detail', 'event-attendees', 'event-list')
+MIDDLEWARE_PATH = 'events.middleware.RequestMetricsMiddleware'
+
+
+def run(endpoint, event_ids, requests, instrumented):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    middleware = [m for m in settings.MIDDLEWARE if m != MIDDLEWARE_PATH]
+    if instrumented:
+        middleware.insert(0, MIDDLEWARE_PATH)
+
+    with override_settings(MIDDLEWARE=middleware):
+        client = Client()
+        cache.clear()
+        latencies = []
+        started = time.perf_counter()
+        for n in range(requests):
+            if endpoint == 'event-list':
+                url = reverse('events:event-list')
+            else:
+                url = reverse(f'events:{endpoint}', args=[event_ids[n % len(event_ids)]])
+            request_started = time.perf_counter()
+            client.get(url)
+            latencies.append(time.perf_counter() - request_started)
+        return harness.summarize(latencies, time.perf_counter() - started)
+
+
+def time_observe(iterations):
+    from events.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    started = time.perf_counter()
+    for n in range(iterations):
+        registry.observe('events:event-detail', 'GET', 200, 0.0042, 2, 0.0007)
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='requests per endpoint and mode')
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--attendees', type=int, default=20, help='attendees per event')
+    args = parser.parse_args()
+
+    harness.setup()
+    event_ids = harness.seed(events=args.events, attendees_per_event=args.attendees)
+
+    rows = []
+    for endpoint in ENDPOINTS:
+        # Warm up imports, URL resolution and the connection before timing
+        run(endpoint, event_ids, 50, True)
+        baseline = run(endpoint, event_ids, args.requests, False)
+        instrumented = run(endpoint, event_ids, args.requests, True)
+        for mode, summary in (('off', baseline), ('on', instrumented)):
+            rows.append({'endpoint': endpoint, 'metrics': mode, **summary})
+        rows[-1]['overhead_us'] = round((instrumented['mean_ms'] - baseline['mean_ms']) * 1000, 1)
+
+    harness.print_table(rows, ['endpoint', 'metrics', 'requests', 'rps', 'mean_ms', 'p50_ms', 'p99_ms', 'overhead_us'])
+    print(f"\nregistry.observe: {time_observe(200_000) * 1e6:.2f} us per call")
+
+
+if __name__ == '__main__':
+    main()
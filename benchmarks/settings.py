@@ -0,0 +1,42 @@
+"""
+Settings for benchmark runs: a project settings profile on a scratch database.
+
+``BENCHMARK_PROFILE=production`` benchmarks ``omnify_eventora.settings_production``
+(tuned SQLite backend, persistent connections); anything else the default settings.
+"""
+import os
+import tempfile
+
+if os.environ.get('BENCHMARK_PROFILE') == 'production':
+    from omnify_eventora.settings_production import *  # noqa: F401,F403
+    from omnify_eventora.settings_production import ARCHIVE, CACHES, DATABASES, REST_FRAMEWORK
+else:
+    from omnify_eventora.settings import *  # noqa: F401,F403
+    from omnify_eventora.settings import ARCHIVE, CACHES, DATABASES, REST_FRAMEWORK
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': os.environ.get('BENCHMARK_DB', os.path.join(tempfile.gettempdir(), 'omnify_benchmark.sqlite3')),
+    }
+}
+
+# Archived events next to the scratch database, not in the project directory
+ARCHIVE = {**ARCHIVE, 'PATH': DATABASES['default']['NAME'] + '.archive'}
+
+# Benchmark clients share one address; measure the handlers, not the write limits
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+# Lets the suite measure uncached listings: EVENT_LIST_CACHE={'ALIAS': 'nocache'}
+CACHES = {
+    **CACHES,
+    'nocache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'root': {'level': 'CRITICAL'},
+}
@@ -0,0 +1,107 @@
+"""
+Load-test the register endpoint under the default and production SQLite setups.
+
+    python -m benchmarks.sqlite_profiles --workers 4 --threads 8 --requests 2000
+
+Like a multi-worker server, ``--workers`` processes each run ``--threads``
+clients that POST to ``/api/events/<pk>/register/`` on a shared database file.
+Each profile gets a fresh database. The report shows throughput, latency and
+how many requests failed with "database is locked".
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks import harness
+
+PROFILES = ('default', 'production')
+
+
+def _client_worker(event_ids, emails):
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client(raise_request_exception=False)
+    latencies, errors, locked = [], 0, 0
+    for n, email in enumerate(emails):
+        url = reverse('events:event-register', args=[event_ids[n % len(event_ids)]])
+        started = time.perf_counter()
+        response = client.post(url, {'name': 'Load Test', 'email': email}, content_type='application/json')
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors += 1
+            locked += b'locked' in response.content
+    connection.close()
+    return latencies, errors, locked
+
+
+def _process_worker(worker, event_ids, requests, threads):
+    harness.setup(fresh=False)
+    emails = [f'w{worker}t{t}n{n}@example.com' for t in range(threads) for n in range(requests // threads)]
+    chunks = [emails[t::threads] for t in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(_client_worker, [event_ids] * threads, chunks))
+
+
+def run_profile(args):
+    harness.setup()
+    event_ids = harness.seed(events=args.events, attendees_per_event=0)
+    from django.db import connection
+    connection.close()
+
+    per_worker = args.requests // args.workers
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(_process_worker, worker, event_ids, per_worker, args.threads)
+            for worker in range(args.workers)
+        ]
+        results = [result for future in futures for result in future.result()]
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for lat, _, _ in results for latency in lat]
+    locked = sum(lock for _, _, lock in results)
+    summary = harness.summarize(latencies, elapsed, sum(err for _, err, _ in results))
+    summary['locked'] = locked
+    summary['locked_pct'] = round(100 * locked / max(len(latencies), 1), 2)
+    print(json.dumps({'profile': args.profile, **summary}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    parser.add_argument('--workers', type=int, default=4, help='processes, like server workers')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent clients per worker')
+    parser.add_argument('--requests', type=int, default=2000, help='total register requests')
+    parser.add_argument('--events', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args)
+        return
+
+    rows = []
+    for profile in PROFILES:
+        env = {
+            **os.environ,
+            'BENCHMARK_PROFILE': profile,
+            'BENCHMARK_DB': os.path.join(tempfile.gettempdir(), f'omnify_benchmark_{profile}.sqlite3'),
+            'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        }
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_profiles', '--profile', profile, *sys.argv[1:]],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+
+    harness.print_table(rows, ['profile', 'requests', 'errors', 'locked', 'locked_pct', 'rps', 'p50_ms', 'p99_ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure what write throttling adds to each request.
+
+    python -m benchmarks.throttle_overhead --requests 2000
+
+Runs the same sequential registrations with no rates configured and with
+rates high enough never to reject (in-process ``Client``, no HTTP server),
+then times a bucket check and the load-shedding check on their own.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from benchmarks import harness
+
+RATES = {'register': '1000000/sec', 'register_event': '1000000/sec'}
+
+
+def run(event_ids, requests, rates, offset):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}):
+        client = Client()
+        cache.clear()
+        latencies = []
+        started = time.perf_counter()
+        for n in range(requests):
+            url = reverse('events:event-register', args=[event_ids[n % len(event_ids)]])
+            request_started = time.perf_counter()
+            client.post(url, {'name': 'Bench', 'email': f'throttle{offset + n}@example.com'},
+                        content_type='application/json')
+            latencies.append(time.perf_counter() - request_started)
+        return harness.summarize(latencies, time.perf_counter() - started)
+
+
+def time_calls(iterations):
+    from django.conf import settings
+    from django.test import override_settings
+    from events.throttling import RegisterClientThrottle, write_load
+
+    request = SimpleNamespace(method='POST', META={'REMOTE_ADDR': '10.0.0.1'})
+    throttle = RegisterClientThrottle()
+    with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES}):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            throttle.allow_request(request, None)
+        bucket = (time.perf_counter() - started) / iterations
+    started = time.perf_counter()
+    for _ in range(iterations):
+        write_load.overloaded()
+    shedding = (time.perf_counter() - started) / iterations
+    return bucket, shedding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='registrations per mode')
+    parser.add_argument('--events', type=int, default=200)
+    args = parser.parse_args()
+
+    harness.setup()
+    # Room for every registration, so all of them take the same write path
+    event_ids = harness.seed(events=args.events, attendees_per_event=0, capacity=args.requests * 3)
+
+    # Warm up imports, URL resolution and the connection before timing
+    run(event_ids, 50, RATES, offset=0)
+    baseline = run(event_ids, args.requests, {}, offset=args.requests)
+    throttled = run(event_ids, args.requests, RATES, offset=args.requests * 2)
+    rows = [{'throttling': 'off', **baseline}, {'throttling': 'on', **throttled}]
+    rows[-1]['overhead_us'] = round((throttled['mean_ms'] - baseline['mean_ms']) * 1000, 1)
+
+    harness.print_table(rows, ['throttling', 'requests', 'rps', 'mean_ms', 'p50_ms', 'p99_ms', 'overhead_us'])
+    bucket, shedding = time_calls(100_000)
+    print(f"\ntoken bucket check: {bucket * 1e6:.2f} us per call")
+    print(f"load-shedding check: {shedding * 1e6:.2f} us per call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Time venue double-booking checks at a venue with a long history.
+
+    python -m benchmarks.venue_conflicts --past 50000 --future 2000
+
+Books ``--past`` finished and ``--future`` upcoming two-hour events at one
+venue, then times ``EventService.find_conflicts`` for a free and a booked
+slot, and the ``/api/events/conflicts`` endpoint. Prints SQLite's plan for
+the check, which should search the ``(location, end_time, start_time)`` index.
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks import harness
+
+VENUE = 'Benchmark Arena'
+
+
+def book(past, future):
+    from django.utils import timezone
+    from events.models import Event
+
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    starts = [now - timedelta(hours=3 * (n + 1)) for n in range(past)]
+    starts += [now + timedelta(hours=3 * (n + 1)) for n in range(future)]
+    Event.objects.bulk_create(
+        (Event(name=f'Booking {n}', location=VENUE, start_time=start, end_time=start + timedelta(hours=2),
+               max_capacity=100) for n, start in enumerate(starts)),
+        batch_size=5000,
+    )
+    return now
+
+
+def per_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--past', type=int, default=50_000, help='finished events at the venue')
+    parser.add_argument('--future', type=int, default=2_000, help='upcoming events at the venue')
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    harness.setup()
+    now = book(args.past, args.future)
+
+    from django.test import Client
+    from django.urls import reverse
+    from events.services import EventService
+
+    # Upcoming events start every 3 hours and last 2: hour 2-3 of a slot is free
+    free = (now + timedelta(hours=5), now + timedelta(hours=6))
+    booked = (now + timedelta(hours=3, minutes=30), now + timedelta(hours=4))
+    last = (now + timedelta(hours=3 * args.future, minutes=30), now + timedelta(hours=3 * args.future + 1))
+    print(EventService.find_conflicts(VENUE, *free).explain(), '\n')
+
+    client = Client()
+    url = reverse('events:event-conflicts')
+    rows = []
+    for name, (start, end) in (('free slot', free), ('booked slot', booked), ('last booked slot', last)):
+        check_ms = per_call(lambda: list(EventService.find_conflicts(VENUE, start, end)), args.repeat) * 1000
+        params = {'location': VENUE, 'start': start.isoformat(), 'end': end.isoformat()}
+        endpoint_ms = per_call(lambda: client.get(url, params), args.repeat // 10) * 1000
+        rows.append({
+            'window': name, 'conflicts': len(EventService.find_conflicts(VENUE, start, end)),
+            'check_ms': round(check_ms, 3), 'endpoint_ms': round(endpoint_ms, 3),
+        })
+    harness.print_table(rows, ['window', 'conflicts', 'check_ms', 'endpoint_ms'])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,102 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Sum
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from .models import Event, Attendee
 
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Skips ``COUNT(*)`` over the whole attendee table, which scans every row on SQLite.
+
+    Unfiltered changelists are counted by summing the events' stored
+    ``attendee_count``: one pass over the far smaller event table. The counter
+    follows registrations, deletions and archiving, and ``recount_attendees``
+    repairs drift. Filtered changelists are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if query.where:
+            return super().count
+        return Event.objects.aggregate(n=Sum('attendee_count'))['n'] or 0
+
+
+class RecentAttendeeFormSet(BaseInlineFormSet):
+    def get_queryset(self):
+        if not hasattr(self, '_recent'):
+            self._recent = super().get_queryset().order_by('-registered_at', '-id')[:AttendeeInline.max_rows]
+        return self._recent
+
+
 class AttendeeInline(admin.TabularInline):
+    """The latest registrations only; the event page links to the paginated attendee list for the rest."""
     model = Attendee
+    formset = RecentAttendeeFormSet
+    max_rows = 20
+    verbose_name_plural = f'Latest {max_rows} attendees'
     extra = 0
-    readonly_fields = ['name', 'email', 'registered_at']
+    fields = readonly_fields = ['name', 'email', 'registered_at']
     can_delete = False
     show_change_link = False
 
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
+    # attendee_count is stored on the event, so rows need no per-event COUNT
     list_display = ('name', 'location', 'start_time', 'end_time', 'max_capacity', 'current_attendee_count')
     list_filter = ('location', 'start_time')
     search_fields = ('name', 'location')
     inlines = [AttendeeInline]
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'attendee_count', 'all_attendees')
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index instead of unindexed icontains over name/location
+        return queryset.search(search_term), False
 
     def current_attendee_count(self, obj):
-        return obj.attendees.count()
+        return obj.attendee_count
     current_attendee_count.short_description = 'Attendees'
+    current_attendee_count.admin_order_field = 'attendee_count'
+
+    def all_attendees(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:events_attendee_changelist')
+        return format_html('<a href="{}?event__id__exact={}">View all {} attendees</a>', url, obj.pk, obj.attendee_count)
+    all_attendees.short_description = 'Attendee list'
+
 
 @admin.register(Attendee)
 class AttendeeAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'event', 'registered_at')
-    list_filter = ('event', 'registered_at')
+    # Filter by event from the event page link (?event__id__exact=<id>);
+    # a list_filter on event would render every event as a choice
+    list_filter = ('registered_at',)
     search_fields = ('name', 'email', 'event__name')
+    autocomplete_fields = ('event',)
     readonly_fields = ('registered_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # An email is looked up on the (email, ...) index; other terms scan
+        term = search_term.strip()
+        if '@' in term and ' ' not in term:
+            return queryset.filter(email=term.lower()), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def get_ordering(self, request):
+        # Newest first in an order an index serves: (event, registered_at, id)
+        # within one event, the primary key across all of them
+        if 'event__id__exact' in request.GET:
+            return ('-registered_at', '-id')
+        return ('-id',)
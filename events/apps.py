@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from . import signals  # noqa: F401
+        from .fts import on_post_migrate
+        from .middleware import install_query_timer
+
+        post_migrate.connect(on_post_migrate, sender=self)
+        connection_created.connect(install_query_timer)
@@ -0,0 +1,315 @@
+"""
+Cold storage for finished events.
+
+``archive_events`` moves events that ended more than
+``ARCHIVE['RETENTION_DAYS']`` days ago, with their attendees, out of the live
+tables into a separate SQLite file (``ARCHIVE['PATH']``). Each event becomes
+one row there: the fields used for lookups in plain indexed columns, and the
+whole event plus its attendee list as zlib-compressed JSON. Attendees are
+stored column-wise, so field names are not repeated for every row.
+
+Events move in chunks. A chunk is read while holding the live write lock,
+written to the archive and committed there, and only then deleted from the
+live tables in the same live transaction. A crash at any point leaves each
+event live, archived or both, never neither; running again picks up whatever
+is still live and overwrites its archive row. Waitlists of archived events
+are dropped.
+
+``restore_events`` puts archived events back with their original ids, and
+``ArchiveStore.list_events`` / ``get_event`` read the archive in place.
+"""
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .cache import invalidate_event_listings
+from .exports import format_datetime
+from .models import Attendee, Event, delete_event_dependents
+from .occupancy import occupancy_index
+from .throttling import write_load
+
+
+def _config():
+    return {
+        'PATH': settings.BASE_DIR / 'archive.sqlite3',
+        'RETENTION_DAYS': 90,
+        'CHUNK_SIZE': 100,
+        **getattr(settings, 'ARCHIVE', {}),
+    }
+
+
+def _stamp(value):
+    """Fixed-width UTC ISO 8601, so archived timestamps compare correctly as text."""
+    if not isinstance(value, datetime):
+        raise TypeError(f'{type(value).__name__} is not JSON serializable')
+    return value.astimezone(dt_timezone.utc).isoformat(timespec='microseconds')
+
+
+def _fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _pack(event, attendee_fields, attendees):
+    data = {'event': event, 'attendee_fields': attendee_fields, 'attendees': attendees}
+    return zlib.compress(json.dumps(data, default=_stamp, separators=(',', ':')).encode())
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+class ArchiveStore:
+    """Archived events in their own SQLite file, one row and one compressed blob per event."""
+
+    def __init__(self, path=None):
+        self.path = str(path or _config()['PATH'])
+        self._local = threading.local()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS archived_event (
+                id INTEGER PRIMARY KEY, name TEXT NOT NULL, location TEXT NOT NULL,
+                start_time TEXT NOT NULL, end_time TEXT NOT NULL, attendee_count INTEGER NOT NULL,
+                archived_at TEXT NOT NULL, data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS archived_event_start ON archived_event (start_time, id);
+            CREATE INDEX IF NOT EXISTS archived_event_location ON archived_event (location, start_time, id);
+        """)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    def put(self, rows):
+        """Store ``(event dict, attendee fields, attendee rows)`` triples, replacing earlier copies."""
+        archived_at = _stamp(timezone.now())
+        with self._db() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO archived_event VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (event['id'], event['name'], event['location'], _stamp(event['start_time']),
+                     _stamp(event['end_time']), len(attendees), archived_at, _pack(event, fields, attendees))
+                    for event, fields, attendees in rows
+                ],
+            )
+
+    def list_events(self, location=None, starts_after=None, starts_before=None, after=None, limit=100):
+        """
+        Archived events without their attendees, ordered by ``(start_time, id)``.
+
+        ``after`` is the ``(start_time, id)`` of the last event of the previous
+        page. Filters are served by the ``start_time`` and ``location`` indexes.
+        """
+        conditions, params = [], []
+        if location:
+            conditions.append('location = ?')
+            params.append(location)
+        if starts_after:
+            conditions.append('start_time >= ?')
+            params.append(_stamp(starts_after))
+        if starts_before:
+            conditions.append('start_time < ?')
+            params.append(_stamp(starts_before))
+        if after:
+            conditions.append('(start_time, id) > (?, ?)')
+            params.extend((_stamp(after[0]), after[1]))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._db().execute(
+            'SELECT id, name, location, start_time, end_time, attendee_count, archived_at FROM archived_event '
+            f'{where} ORDER BY start_time, id LIMIT ?', (*params, limit),
+        )
+        return [
+            {'id': event_id, 'name': name, 'location': location, 'start_time': parse_datetime(start),
+             'end_time': parse_datetime(end), 'attendee_count': count, 'archived_at': parse_datetime(archived_at)}
+            for event_id, name, location, start, end, count, archived_at in rows
+        ]
+
+    def get_event(self, event_id):
+        """The archived event with its attendees, as stored, or ``None``."""
+        row = self._db().execute(
+            'SELECT archived_at, data FROM archived_event WHERE id = ?', (event_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        data = _unpack(row[1])
+        data['archived_at'] = parse_datetime(row[0])
+        return data
+
+    def delete(self, event_ids):
+        with self._db() as db:
+            db.executemany('DELETE FROM archived_event WHERE id = ?', [(event_id,) for event_id in event_ids])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != str(_config()['PATH']):
+            _store = ArchiveStore()
+        return _store
+
+
+def _render(value):
+    return None if value is None else format_datetime(parse_datetime(value) if isinstance(value, str) else value)
+
+
+def public_summary(row):
+    """A ``list_events`` row for API responses, datetimes rendered like the live endpoints."""
+    return {**row, **{field: _render(row[field]) for field in ('start_time', 'end_time', 'archived_at')}}
+
+
+def public_event(data):
+    """A ``get_event`` result for API responses, without check-in tokens."""
+    event = data['event']
+    attendees = [dict(zip(data['attendee_fields'], row)) for row in data['attendees']]
+    return {
+        'id': event['id'],
+        'name': event['name'],
+        'location': event['location'],
+        'start_time': _render(event['start_time']),
+        'end_time': _render(event['end_time']),
+        'max_capacity': event['max_capacity'],
+        'attendee_count': len(attendees),
+        'archived_at': _render(data['archived_at']),
+        'attendees': [
+            {'id': attendee['id'], 'name': attendee['name'], 'email': attendee['email'],
+             'registered_at': _render(attendee['registered_at']),
+             'checked_in_at': _render(attendee.get('checked_in_at'))}
+            for attendee in attendees
+        ],
+    }
+
+
+def archivable_events(cutoff):
+    """Events that ended before ``cutoff``, oldest first; seeks the ``(start_time, id)`` index."""
+    # Events end after they start, so the start_time bound only narrows the scan
+    return Event.objects.filter(start_time__lt=cutoff, end_time__lt=cutoff).order_by('start_time', 'id')
+
+
+def _delete_events(ids):
+    # Raw, like delete_event_dependents: the Event post_delete receivers would
+    # queue callbacks per event that archive_chunk registers once per chunk
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {connection.ops.quote_name(Event._meta.db_table)} WHERE id IN ({placeholders})', ids)
+
+
+def archive_chunk(event_ids, cutoff, store):
+    """Archive those of ``event_ids`` that ended before ``cutoff``; returns ``(events, attendees)`` moved."""
+    event_fields, attendee_fields = _fields(Event), _fields(Attendee)
+    with write_load.track(), transaction.atomic():
+        # A no-op write first takes the write lock, so nothing registers for
+        # or edits these events between reading and deleting them
+        Event.objects.filter(pk__in=event_ids).update(attendee_count=F('attendee_count'))
+        events = list(Event.objects.filter(pk__in=event_ids, end_time__lt=cutoff).values(*event_fields))
+        if not events:
+            return 0, 0
+        ids = [event['id'] for event in events]
+        attendees = {event_id: [] for event_id in ids}
+        event_column = attendee_fields.index('event_id')
+        rows = Attendee.objects.filter(event_id__in=ids).order_by('id').values_list(*attendee_fields)
+        for row in rows.iterator(chunk_size=2000):
+            attendees[row[event_column]].append(row)
+
+        store.put((event, attendee_fields, attendees[event['id']]) for event in events)
+        delete_event_dependents(ids)
+        _delete_events(ids)
+        transaction.on_commit(invalidate_event_listings)
+        transaction.on_commit(lambda: occupancy_index.discard(*ids))
+    return len(ids), sum(len(rows) for rows in attendees.values())
+
+
+def archive_cutoff(older_than_days=None):
+    """Events that ended before this are archived; ``ARCHIVE['RETENTION_DAYS']`` ago by default."""
+    if older_than_days is None:
+        older_than_days = _config()['RETENTION_DAYS']
+    return timezone.now() - timedelta(days=older_than_days)
+
+
+def archive_events(older_than_days=None, chunk_size=None, limit=None, store=None, progress=None):
+    """
+    Move events that ended more than ``older_than_days`` days ago into the archive.
+
+    At most ``limit`` events are moved, ``chunk_size`` per transaction.
+    Returns ``(events, attendees)`` archived. Safe to interrupt and rerun.
+    """
+    chunk_size = chunk_size or _config()['CHUNK_SIZE']
+    store = store or get_store()
+    cutoff = archive_cutoff(older_than_days)
+
+    moved_events = moved_attendees = 0
+    while limit is None or moved_events < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - moved_events)
+        ids = list(archivable_events(cutoff).values_list('id', flat=True)[:size])
+        if not ids:
+            break
+        events, attendees = archive_chunk(ids, cutoff, store)
+        moved_events += events
+        moved_attendees += attendees
+        if progress:
+            progress(moved_events, moved_attendees)
+    return moved_events, moved_attendees
+
+
+def _insert_rows(model, fields, rows):
+    """INSERT rows given as ``{attname: value}`` as stored in the archive, ids included."""
+    model_fields = model._meta.concrete_fields
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in model_fields)
+    placeholders = ', '.join(['%s'] * len(model_fields))
+    values = [
+        [
+            field.get_db_prep_save(field.to_python(row[field.attname]) if field.attname in row else field.get_default(),
+                                   connection)
+            for field in model_fields
+        ]
+        for row in (dict(zip(fields, values)) for values in rows)
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})', values
+        )
+
+
+def restore_events(event_ids, store=None):
+    """
+    Move archived events back into the live tables with their original ids.
+
+    Returns ``(restored, failed)`` id lists. Events missing from the archive
+    are ignored; ones already live are only removed from the archive. An event
+    that clashes with a live one (same name, location and start) fails and
+    stays archived.
+    """
+    store = store or get_store()
+    restored, failed, live = [], [], set(Event.objects.filter(pk__in=event_ids).values_list('id', flat=True))
+    with write_load.track(), transaction.atomic():
+        for event_id in event_ids:
+            data = None if event_id in live else store.get_event(event_id)
+            if data is None:
+                continue
+            event = data['event']
+            # The waitlist was not archived; restore it empty
+            event['waitlist_head'] = event['waitlist_tail']
+            event['attendee_count'] = len(data['attendees'])
+            try:
+                with transaction.atomic():
+                    _insert_rows(Event, list(event), [list(event.values())])
+                    _insert_rows(Attendee, data['attendee_fields'], data['attendees'])
+            except IntegrityError:
+                failed.append(event_id)
+            else:
+                restored.append(event_id)
+        transaction.on_commit(invalidate_event_listings)
+        transaction.on_commit(lambda: occupancy_index.discard(*restored))
+    store.delete([*restored, *live])
+    return restored, failed
@@ -0,0 +1,224 @@
+"""
+Async (ASGI) variants of the read and registration endpoints.
+
+Selected with ``EVENTS_API_STACK = 'async'``; see ``events/urls.py``. Reads use
+the async ORM directly. Responses are rendered with DRF's ``JSONRenderer`` so
+both stacks return the same bytes. Methods these views don't implement (event
+create, update and delete) are handed to the sync DRF views in a worker thread.
+"""
+from asgiref.sync import sync_to_async
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .cache import (
+    acache_listing,
+    aget_cached_listing,
+    etag_matches,
+    event_validators,
+    not_modified,
+    stamp_current_time,
+)
+from .filters import EventSearchFilter
+from .models import Attendee, Event
+from .pagination import select_paginator
+from .queueing import QUEUED, enqueue_registration, queue_enabled
+from .serializers import (
+    AttendeeListSerializer,
+    EventListSerializer,
+    EventSerializer,
+    RegisteredAttendeeSerializer,
+    RegistrationSerializer,
+    WaitlistEntrySerializer,
+)
+from .services import EventService, RegistrationService, WaitlistService, EventFull
+from .throttling import REGISTER_THROTTLES, Overloaded, check_throttles, retry_after
+from .timezones import DEFAULT_TIMEZONE, resolve_timezone
+from . import views
+import logging
+
+logger = logging.getLogger(__name__)
+
+_sync_event_list = sync_to_async(views.EventListCreate.as_view())
+_sync_event_detail = sync_to_async(views.EventRetrieveUpdateDestroy.as_view())
+_sync_register_attendee = sync_to_async(views.register_attendee)
+_sync_attendee_list = sync_to_async(views.AttendeeList.as_view())
+
+
+def _json(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, headers=headers, content_type='application/json'
+    )
+
+
+def _error(message, status=status.HTTP_400_BAD_REQUEST):
+    logger.error(f"ErrorResponse: {message}")
+    return _json({"error": message}, status=status)
+
+
+def _not_found():
+    return _json({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+
+def _api_exception(exc):
+    # Retry-After as DRF's exception handler sets it for throttling
+    headers = {'Retry-After': '%d' % exc.wait} if getattr(exc, 'wait', None) else None
+    return _json(
+        {"detail": exc.detail} if isinstance(exc.detail, str) else exc.detail, status=exc.status_code, headers=headers
+    )
+
+
+def _drf_request(request):
+    return Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES])
+
+
+async def event_list(request):
+    if request.method != 'GET':
+        return await _sync_event_list(request)
+
+    request = _drf_request(request)
+    timezone_str = request.query_params.get('timezone', DEFAULT_TIMEZONE)
+    logger.info(f"Listing events with timezone: {timezone_str}")
+
+    tz = resolve_timezone(timezone_str)
+    if tz is None:
+        logger.warning("Invalid timezone provided")
+        return _error('Invalid timezone provided')
+
+    cached = await aget_cached_listing(request)
+    if cached is None:
+        try:
+            queryset = EventService.get_upcoming_events(starts_after=EventSearchFilter.starts_after(request))
+            for backend in views.EventListCreate.filter_backends:
+                queryset = backend().filter_queryset(request, queryset, None)
+            queryset = queryset.values(*EventListSerializer.columns())
+            paginator = select_paginator(request, views.EventListCreate.pagination_modes)
+            page = await paginator.apaginate_queryset(queryset, request)
+        except APIException as exc:
+            return _api_exception(exc)
+        with timezone.override(tz):
+            events = EventListSerializer(page).data
+        data = paginator.get_paginated_response({
+            'current_time': None,
+            'timezone': timezone_str,
+            'events': events
+        }).data
+        next_start_time = await EventService.get_upcoming_events().values_list('start_time', flat=True).afirst()
+        cached = await acache_listing(request, data, next_start_time)
+    else:
+        logger.info("Event list served from cache")
+
+    etag, data = cached
+    if etag_matches(request, etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return _json(stamp_current_time(data, tz), headers={'ETag': etag})
+
+
+async def event_detail(request, pk):
+    if request.method != 'GET':
+        return await _sync_event_detail(request, pk=pk)
+
+    logger.info(f"Retrieving event with ID: {pk}")
+    try:
+        event = await Event.objects.aget(pk=pk)
+    except Event.DoesNotExist:
+        return _not_found()
+    etag, last_modified = event_validators(event.version, event.updated_at)
+    headers = {'ETag': etag, 'Last-Modified': last_modified}
+    if not_modified(request, etag, last_modified):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return _json(EventSerializer(event).data, headers=headers)
+
+
+async def register_attendee(request, pk):
+    if request.method != 'POST':
+        return await _sync_register_attendee(request, pk=pk)
+
+    logger.info(f"Registering attendee for event ID: {pk}")
+    try:
+        await sync_to_async(check_throttles)(request, REGISTER_THROTTLES, {'pk': pk})
+        serializer = RegistrationSerializer(data=_drf_request(request).data)
+    except APIException as exc:
+        return _api_exception(exc)
+    if not serializer.is_valid():
+        return _json(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    if queue_enabled():
+        return await queue_registration(pk, serializer.validated_data)
+
+    try:
+        attendee = await RegistrationService.aregister_attendee(pk, serializer.validated_data)
+    except EventFull:
+        return await join_waitlist(pk, serializer.validated_data)
+    except Event.DoesNotExist:
+        return _not_found()
+    except OperationalError:
+        logger.exception("Attendee registration failed")
+        return _api_exception(Overloaded(wait=retry_after()))
+    except Exception as e:
+        logger.exception("Attendee registration failed")
+        return _error(str(e))
+    logger.info(f"Attendee registered: {attendee}")
+    return _json(RegisteredAttendeeSerializer(attendee).data, status=status.HTTP_201_CREATED)
+
+
+async def queue_registration(pk, attendee_data):
+    if not await Event.objects.filter(pk=pk).aexists():
+        return _not_found()
+    ticket = await sync_to_async(enqueue_registration)(pk, attendee_data)
+    logger.info(f"Registration for event {pk} queued as ticket {ticket}")
+    return _json(
+        {'ticket': ticket, 'status': QUEUED},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': reverse('events:registration-ticket', args=[ticket])},
+    )
+
+
+async def join_waitlist(pk, attendee_data):
+    try:
+        entry = await sync_to_async(WaitlistService.join)(pk, attendee_data)
+    except OperationalError:
+        logger.exception("Joining waitlist failed")
+        return _api_exception(Overloaded(wait=retry_after()))
+    except Exception as e:
+        logger.exception("Joining waitlist failed")
+        return _error(str(e))
+    if isinstance(entry, Attendee):
+        logger.info(f"Attendee registered from the waitlist: {entry}")
+        return _json(RegisteredAttendeeSerializer(entry).data, status=status.HTTP_201_CREATED)
+    logger.info(f"Attendee waitlisted: {entry}")
+    return _json(WaitlistEntrySerializer(entry).data, status=status.HTTP_202_ACCEPTED)
+
+
+async def attendee_list(request, pk):
+    if request.method != 'GET':
+        return await _sync_attendee_list(request, pk=pk)
+
+    logger.info(f"Fetching attendees for event ID: {pk}")
+    validators = await Event.objects.filter(pk=pk).values_list('version', 'updated_at').afirst()
+    if validators is None:
+        return _not_found()
+    etag, last_modified = event_validators(*validators)
+    headers = {'ETag': etag, 'Last-Modified': last_modified}
+    if not_modified(request, etag, last_modified):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    request = _drf_request(request)
+    try:
+        paginator = select_paginator(request, views.AttendeeList.pagination_modes)
+        queryset = RegistrationService.get_attendees_for_event(pk).values(*AttendeeListSerializer.columns())
+        page = await paginator.apaginate_queryset(queryset, request)
+    except APIException as exc:
+        return _api_exception(exc)
+    return _json(paginator.get_paginated_response(AttendeeListSerializer(page).data).data, headers=headers)
+
+
+# Like DRF's api_view and APIView.as_view, which the sync stack uses for these
+# endpoints. Set directly because Django 4.2's csrf_exempt wrapper hides that
+# the view is a coroutine function.
+for _view in (event_list, event_detail, register_attendee, attendee_list):
+    _view.csrf_exempt = True
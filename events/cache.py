@@ -0,0 +1,122 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.utils.encoders import JSONEncoder
+
+VERSION_KEY = 'events:list:version'
+
+
+def _config():
+    return {'ALIAS': 'default', 'TIMEOUT': 60, **getattr(settings, 'EVENT_LIST_CACHE', {})}
+
+
+def _cache():
+    return caches[_config()['ALIAS']]
+
+
+def _version():
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+async def _aversion():
+    cache = _cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, 1, timeout=None)
+        version = await cache.aget(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_event_listings():
+    """Retire every cached listing page by moving to a new key version."""
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def _key(request, version):
+    # Links in the payload are absolute, so the host is part of the key
+    params = sorted(request.query_params.lists())
+    raw = json.dumps([request.get_host(), params])
+    return f'events:list:{version}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def _entry(data, next_start_time):
+    """``((etag, data), timeout)`` to store for a listing payload."""
+    # Plain JSON types for the cache, in the serializer's field order; the
+    # ETag hashes a key-sorted dump so it only depends on the content
+    data = json.loads(json.dumps(data, cls=JSONEncoder))
+    body = json.dumps(data, sort_keys=True)
+    entry = (f'"{hashlib.md5(body.encode()).hexdigest()}"', data)
+
+    timeout = _config()['TIMEOUT']
+    if next_start_time is not None:
+        timeout = max(min(timeout, (next_start_time - timezone.now()).total_seconds()), 1)
+    return entry, timeout
+
+
+def get_cached_listing(request):
+    """Return ``(etag, data)`` for this listing request, or ``None`` on a miss."""
+    return _cache().get(_key(request, _version()))
+
+
+async def aget_cached_listing(request):
+    """``get_cached_listing`` for async views, without blocking the event loop on the cache."""
+    return await _cache().aget(_key(request, await _aversion()))
+
+
+def cache_listing(request, data, next_start_time=None):
+    """
+    Store a listing payload and return its ``(etag, data)``.
+
+    The entry expires no later than ``next_start_time``: once the soonest
+    upcoming event starts it drops out of the listing and every page shifts.
+    """
+    entry, timeout = _entry(data, next_start_time)
+    _cache().set(_key(request, _version()), entry, timeout=timeout)
+    return entry
+
+
+async def acache_listing(request, data, next_start_time=None):
+    """``cache_listing`` for async views."""
+    entry, timeout = _entry(data, next_start_time)
+    await _cache().aset(_key(request, await _aversion()), entry, timeout=timeout)
+    return entry
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match', '')
+    return header.strip() == '*' or etag in [tag.strip() for tag in header.split(',')]
+
+
+def stamp_current_time(data, tz):
+    """Fill in ``current_time``, which is left out of cached payloads and their ETag."""
+    envelope = data.get('results', data)
+    envelope['current_time'] = timezone.now().astimezone(tz).isoformat()
+    return data
+
+
+def event_validators(version, updated_at):
+    """``(etag, last_modified)`` for an event's detail and attendee list at ``Event.version``."""
+    return f'"v{version}"', http_date(updated_at.timestamp())
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Whether the client's copy is current. ``If-None-Match`` takes precedence
+    over ``If-Modified-Since``, which only has one-second resolution.
+    """
+    if 'If-None-Match' in request.headers:
+        return etag_matches(request, etag)
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and since >= parse_http_date_safe(last_modified)
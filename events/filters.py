@@ -0,0 +1,70 @@
+from datetime import datetime, time
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+TRUE_VALUES = ('true', '1', 'yes')
+FALSE_VALUES = ('false', '0', 'no')
+
+
+def parse_bound(param, value):
+    """Parse an ISO 8601 datetime or date query parameter into an aware datetime."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({param: 'Enter a valid ISO 8601 date or datetime.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class EventSearchFilter(BaseFilterBackend):
+    """
+    Filters for the event listing, each served by an index:
+
+    - ``location``: exact match, ``(location, start_time)`` index
+    - ``starts_after`` / ``starts_before``: start_time window, ``(start_time, id)`` index
+    - ``has_seats``: ``true`` or ``false``, from the stored ``attendee_count``
+    - ``q``: words matched by prefix against name and location (FTS5)
+
+    ``starts_after`` is not applied here. Views pass ``starts_after(request)`` to
+    ``EventService.get_upcoming_events`` instead. SQLite seeks the index on the
+    first lower bound in the WHERE clause, so a second ``start_time >=`` after
+    the "upcoming" one would scan from now onwards.
+    """
+
+    @staticmethod
+    def starts_after(request):
+        value = request.query_params.get('starts_after')
+        return parse_bound('starts_after', value) if value else None
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        location = params.get('location')
+        if location:
+            queryset = queryset.filter(location=location)
+
+        starts_before = params.get('starts_before')
+        if starts_before:
+            queryset = queryset.filter(start_time__lt=parse_bound('starts_before', starts_before))
+
+        has_seats = params.get('has_seats', '').lower()
+        if has_seats in TRUE_VALUES:
+            queryset = queryset.filter(attendee_count__lt=F('max_capacity'))
+        elif has_seats in FALSE_VALUES:
+            queryset = queryset.filter(attendee_count__gte=F('max_capacity'))
+        elif has_seats:
+            raise ValidationError({'has_seats': 'Must be true or false.'})
+
+        text = params.get('q', '').strip()
+        if text:
+            queryset = queryset.search(text)
+        return queryset
@@ -0,0 +1,64 @@
+"""
+Upkeep for the ``events_event_fts`` full-text index (created in migration 0004).
+
+SQLite migrations that alter ``events_event`` rebuild the table, and that
+drops the triggers keeping the index in sync. ``ensure_event_search_index``
+runs after every ``migrate`` to put back any missing trigger and reindex.
+"""
+from django.db import connections
+
+TRIGGERS = {
+    'events_event_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS events_event_fts_ai AFTER INSERT ON events_event BEGIN
+            INSERT INTO events_event_fts(rowid, name, location) VALUES (new.id, new.name, new.location);
+        END
+    """,
+    'events_event_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS events_event_fts_ad AFTER DELETE ON events_event BEGIN
+            INSERT INTO events_event_fts(events_event_fts, rowid, name, location)
+            VALUES ('delete', old.id, old.name, old.location);
+        END
+    """,
+    'events_event_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS events_event_fts_au AFTER UPDATE OF name, location ON events_event BEGIN
+            INSERT INTO events_event_fts(events_event_fts, rowid, name, location)
+            VALUES ('delete', old.id, old.name, old.location);
+            INSERT INTO events_event_fts(rowid, name, location) VALUES (new.id, new.name, new.location);
+        END
+    """,
+}
+
+
+def ensure_event_search_index(using='default'):
+    """Recreate missing sync triggers and reindex; returns the names recreated."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'events_event_fts%'")
+        existing = {row[0] for row in cursor.fetchall()}
+        if 'events_event_fts' not in existing:
+            return []
+        missing = [name for name in TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+        if missing:
+            cursor.execute("INSERT INTO events_event_fts(events_event_fts) VALUES ('rebuild')")
+    return missing
+
+
+def on_post_migrate(sender, using='default', **kwargs):
+    ensure_event_search_index(using)
+
+
+def drop_event_search_triggers(using='default'):
+    """
+    Drop the sync triggers, e.g. before a bulk load; ``ensure_event_search_index``
+    puts them back and reindexes in one pass.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
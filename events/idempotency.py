@@ -0,0 +1,165 @@
+"""
+``Idempotency-Key`` support for POST endpoints.
+
+The first request with a given key runs the view; its response (status, body
+and content type) is stored for ``TTL`` seconds and replayed to retries that
+carry the same key and body, with an ``Idempotent-Replayed: true`` header.
+Server errors and transient refusals (``TRANSIENT_STATUSES``, e.g. a throttled
+``429``) are not stored: the key is released so a retry runs the view again.
+Concurrent requests with the same key wait for the first one to finish rather
+than running the view again.
+
+Entries live in the cache named by ``IDEMPOTENCY['ALIAS']``, which should not
+be shared with caches that churn: an evicted entry lets a retry run the view
+twice. With several worker processes it must be a shared cache (set
+``REDIS_URL``): local memory only collapses retries that reach the same process.
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+
+PENDING = 'pending'
+DONE = 'done'
+
+# Outcomes a later retry may not repeat: timeouts, conflicts, locks, throttling
+TRANSIENT_STATUSES = {408, 409, 423, 425, 429}
+
+
+class IdempotencyError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def _config():
+    # TTL: how long a response is replayed. LOCK_TIMEOUT: how long a crashed
+    # request can hold its key. WAIT: how long a concurrent retry waits.
+    return {'ALIAS': 'default', 'TTL': 24 * 60 * 60, 'LOCK_TIMEOUT': 30, 'WAIT': 10,
+            **getattr(settings, 'IDEMPOTENCY', {})}
+
+
+def _cache():
+    return caches[_config()['ALIAS']]
+
+
+def cache_key(path, key):
+    return f"idempotency:{hashlib.sha256(f'{path} {key}'.encode()).hexdigest()}"
+
+
+def _request_key(request):
+    """``(cache key, body fingerprint)``, or ``None`` if the request is not keyed."""
+    key = request.headers.get(HEADER)
+    if request.method != 'POST' or key is None:
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(f'{HEADER} must be 1 to {MAX_KEY_LENGTH} characters', 400)
+    return cache_key(request.path, key), hashlib.sha256(request.body).hexdigest()
+
+
+def _check(entry, fingerprint, deadline):
+    """The stored response to replay, or ``None`` to keep waiting."""
+    state, stored_fingerprint, *response = entry
+    if stored_fingerprint != fingerprint:
+        raise IdempotencyError(f'This {HEADER} was already used with a different request body', 422)
+    if state == DONE:
+        return response
+    if time.monotonic() >= deadline:
+        raise IdempotencyError(f'A request with this {HEADER} is still in progress', 409)
+    return None
+
+
+def _replay(status, content, content_type):
+    response = HttpResponse(content, status=status, content_type=content_type)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _entry(fingerprint, response):
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()
+    return (DONE, fingerprint, response.status_code, response.content, response['Content-Type'])
+
+
+def _storable(response):
+    return response.status_code < 500 and response.status_code not in TRANSIENT_STATUSES
+
+
+def _error(exc):
+    return JsonResponse({'error': str(exc)}, status=exc.status)
+
+
+def idempotent(view):
+    """Wrap a Django view, sync or async, to honour ``Idempotency-Key`` on POST."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            try:
+                keyed = _request_key(request)
+                if keyed is None:
+                    return await view(request, *args, **kwargs)
+                key, fingerprint = keyed
+                config = _config()
+                cache = _cache()
+                deadline = time.monotonic() + config['WAIT']
+                while not await cache.aadd(key, (PENDING, fingerprint), timeout=config['LOCK_TIMEOUT']):
+                    entry = await cache.aget(key)
+                    stored = entry and _check(entry, fingerprint, deadline)
+                    if stored:
+                        return _replay(*stored)
+                    await asyncio.sleep(POLL_INTERVAL)
+            except IdempotencyError as exc:
+                return _error(exc)
+
+            try:
+                response = await view(request, *args, **kwargs)
+            except BaseException:
+                await cache.adelete(key)
+                raise
+            if not _storable(response):
+                await cache.adelete(key)
+            else:
+                await cache.aset(key, _entry(fingerprint, response), timeout=config['TTL'])
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            keyed = _request_key(request)
+            if keyed is None:
+                return view(request, *args, **kwargs)
+            key, fingerprint = keyed
+            config = _config()
+            cache = _cache()
+            deadline = time.monotonic() + config['WAIT']
+            while not cache.add(key, (PENDING, fingerprint), timeout=config['LOCK_TIMEOUT']):
+                entry = cache.get(key)
+                stored = entry and _check(entry, fingerprint, deadline)
+                if stored:
+                    return _replay(*stored)
+                time.sleep(POLL_INTERVAL)
+        except IdempotencyError as exc:
+            return _error(exc)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            cache.delete(key)
+            raise
+        if not _storable(response):
+            cache.delete(key)
+        else:
+            cache.set(key, _entry(fingerprint, response), timeout=config['TTL'])
+        return response
+
+    return wrapper
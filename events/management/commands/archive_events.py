@@ -0,0 +1,55 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from events.archive import archivable_events, archive_cutoff, archive_events, get_store
+
+
+class Command(BaseCommand):
+    help = 'Move finished events and their attendees into the compressed archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            help='Archive events that ended more than this many days ago (default: ARCHIVE RETENTION_DAYS)',
+        )
+        parser.add_argument('--chunk-size', type=int, help='Events per transaction (default: ARCHIVE CHUNK_SIZE)')
+        parser.add_argument('--limit', type=int, help='Stop after this many events, e.g. to fit a maintenance window')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many events would be archived')
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM the SQLite database afterwards to shrink the file')
+
+    def handle(self, *args, **options):
+        days = options['older_than_days']
+        if days is not None and days < 0:
+            raise CommandError('--older-than-days must not be negative')
+        if (options['chunk_size'] is not None and options['chunk_size'] < 1) or (
+                options['limit'] is not None and options['limit'] < 1):
+            raise CommandError('--chunk-size and --limit must be at least 1')
+
+        cutoff = archive_cutoff(days)
+        if options['dry_run']:
+            count = archivable_events(cutoff).count()
+            self.stdout.write(f"{count} event(s) ended before {cutoff:%Y-%m-%d %H:%M %Z}.")
+            return
+
+        store = get_store()
+        self.stdout.write(f"Archiving events that ended before {cutoff:%Y-%m-%d %H:%M %Z} into {store.path}")
+        started = time.perf_counter()
+
+        def progress(events, attendees):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {events} events, {attendees} attendees")
+
+        events, attendees = archive_events(
+            older_than_days=days,
+            chunk_size=options['chunk_size'],
+            limit=options['limit'],
+            store=store,
+            progress=progress,
+        )
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {events} events and {attendees} attendees in {time.perf_counter() - started:.1f}s."
+        ))
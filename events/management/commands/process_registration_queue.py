@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from events.queueing import drain, get_queue
+
+
+class Command(BaseCommand):
+    help = 'Drain the queued registration backend in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--batch-size', type=int, help='Registrations per transaction (default: BATCH_SIZE setting)')
+
+    def handle(self, *args, **options):
+        backend = get_queue(start_worker=False)
+        self.stdout.write(f"Processing registrations from {type(backend).__name__}")
+        while True:
+            handled = drain(backend, options['batch_size'], timeout=0 if options['once'] else 1)
+            close_old_connections()
+            if handled:
+                self.stdout.write(f"Processed {handled} registration(s)")
+            if options['once']:
+                break
+        self.stdout.write(self.style.SUCCESS("Registration queue drained."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Audit or rebuild the denormalized Event.attendee_count column'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report events whose count has drifted; exit non-zero if any have',
+        )
+
+    def handle(self, *args, **options):
+        stale = list(
+            Event.objects.with_stale_attendee_count()
+            .values_list('id', 'name', 'attendee_count', 'actual_attendee_count')
+        )
+
+        for event_id, name, stored, actual in stale:
+            self.stdout.write(f"Event {event_id} ({name}): stored {stored}, actual {actual}")
+
+        if options['check']:
+            if stale:
+                raise CommandError(f"{len(stale)} event(s) have a stale attendee_count")
+            self.stdout.write(self.style.SUCCESS("All attendee counts are up to date."))
+            return
+
+        updated = Event.objects.recount_attendees()
+        self.stdout.write(self.style.SUCCESS(f"Recounted attendees for {updated} event(s), {len(stale)} corrected."))
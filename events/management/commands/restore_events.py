@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from events.archive import restore_events
+
+
+class Command(BaseCommand):
+    help = 'Move archived events and their attendees back into the live tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='+', type=int, help='Ids of the archived events')
+
+    def handle(self, *args, **options):
+        restored, failed = restore_events(list(dict.fromkeys(options['event_ids'])))
+        if restored:
+            self.stdout.write(self.style.SUCCESS(f"Restored event(s) {', '.join(map(str, restored))}."))
+        if failed:
+            raise CommandError(
+                f"Event(s) {', '.join(map(str, failed))} clash with a live event (same name, location and start time)"
+            )
+        if not restored:
+            self.stdout.write("Nothing to restore.")
@@ -0,0 +1,47 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from events.seeding import seed
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load deterministic demo events and attendees'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=5, help='Number of events to add')
+        parser.add_argument('--attendees-per-event', type=int, default=10, help='Attendees registered to each event')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument(
+            '--drop-indexes',
+            action='store_true',
+            help='Drop secondary indexes and search triggers during the load and rebuild them afterwards',
+        )
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating rows (inserts stay serial)')
+
+    def handle(self, *args, **options):
+        if options['events'] < 0 or options['attendees_per_event'] < 0:
+            raise CommandError('--events and --attendees-per-event must not be negative')
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be at least 1')
+
+        self.stdout.write(
+            f"Adding {options['events']} events with {options['attendees_per_event']} attendees each..."
+        )
+        started = time.perf_counter()
+
+        def progress(events, attendees):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {events} events, {attendees} attendees")
+
+        events, attendees = seed(
+            options['events'],
+            options['attendees_per_event'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            drop_indexes=options['drop_indexes'],
+            workers=options['workers'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {events} events and {attendees} attendees in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,102 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+Each worker process keeps its own registry. With several gunicorn workers,
+each scrape of ``/metrics`` sees one worker, so aggregate by instance or run
+a single worker per scrape target.
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Series:
+    __slots__ = ('statuses', 'buckets', 'latency_sum', 'count', 'db_queries', 'db_seconds')
+
+    def __init__(self):
+        self.statuses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, method, status, seconds, db_queries=0, db_seconds=0.0):
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            series = self._series.get((view, method))
+            if series is None:
+                series = self._series[(view, method)] = _Series()
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            series.buckets[bucket] += 1
+            series.latency_sum += seconds
+            series.count += 1
+            series.db_queries += db_queries
+            series.db_seconds += db_seconds
+
+    def snapshot(self):
+        """Per ``(view, method)`` totals: requests, SQL queries and SQL seconds."""
+        with self._lock:
+            return {
+                key: {'requests': series.count, 'db_queries': series.db_queries, 'db_seconds': series.db_seconds}
+                for key, series in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """The registry in Prometheus text exposition format 0.0.4."""
+        with self._lock:
+            snapshot = sorted(self._series.items())
+            lines = [
+                '# HELP eventora_http_requests_total HTTP requests by view, method and status.',
+                '# TYPE eventora_http_requests_total counter',
+            ]
+            for (view, method), series in snapshot:
+                for status, count in sorted(series.statuses.items()):
+                    lines.append(
+                        f'eventora_http_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}'
+                    )
+
+            lines += [
+                '# HELP eventora_http_request_duration_seconds Request latency by view and method.',
+                '# TYPE eventora_http_request_duration_seconds histogram',
+            ]
+            for (view, method), series in snapshot:
+                labels = f'view="{view}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, series.buckets):
+                    cumulative += count
+                    lines.append(f'eventora_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'eventora_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+                lines.append(f'eventora_http_request_duration_seconds_sum{{{labels}}} {series.latency_sum:.6f}')
+                lines.append(f'eventora_http_request_duration_seconds_count{{{labels}}} {series.count}')
+
+            lines += [
+                '# HELP eventora_db_queries_total SQL queries run while handling requests.',
+                '# TYPE eventora_db_queries_total counter',
+            ]
+            for (view, method), series in snapshot:
+                lines.append(f'eventora_db_queries_total{{view="{view}",method="{method}"}} {series.db_queries}')
+
+            lines += [
+                '# HELP eventora_db_query_duration_seconds_total Time spent in SQL queries while handling requests.',
+                '# TYPE eventora_db_query_duration_seconds_total counter',
+            ]
+            for (view, method), series in snapshot:
+                lines.append(
+                    f'eventora_db_query_duration_seconds_total{{view="{view}",method="{method}"}} {series.db_seconds:.6f}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
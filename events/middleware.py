@@ -0,0 +1,99 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .metrics import registry
+
+request_logger = logging.getLogger('events.requests')
+
+# A context variable rather than a per-request execute_wrapper: async views run
+# their queries through sync_to_async on other threads, whose connection
+# objects differ from the event loop's but which inherit its context.
+_query_timer = ContextVar('request_query_timer', default=None)
+
+
+class _QueryTimer:
+    __slots__ = ('queries', 'seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper, installed on every connection, feeding the current request's timer."""
+    timer = _query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.seconds += time.perf_counter() - started
+        timer.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver; reconnects reuse the wrapper object, so guard against duplicates."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-view request count, latency histogram, SQL query count and SQL
+    time into ``events.metrics.registry``.
+
+    Set ``METRICS_LOG_REQUESTS = True`` to also log one JSON line per request
+    on the ``events.requests`` logger. Queries run while a streaming response
+    is consumed happen after this middleware returns and are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.log_requests = getattr(settings, 'METRICS_LOG_REQUESTS', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = _QueryTimer()
+        token = _query_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_timer.reset(token)
+        self._record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = _QueryTimer()
+        token = _query_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_timer.reset(token)
+        self._record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def _record(self, request, response, seconds, timer):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        registry.observe(view, request.method, response.status_code, seconds, timer.queries, timer.seconds)
+        if self.log_requests:
+            request_logger.info(json.dumps({
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(seconds * 1000, 3),
+                'db_queries': timer.queries,
+                'db_ms': round(timer.seconds * 1000, 3),
+            }))
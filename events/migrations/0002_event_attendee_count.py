@@ -0,0 +1,38 @@
+# Generated by Django 4.2.11 on 2026-10-18 15:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_attendee_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Attendee = apps.get_model('events', 'Attendee')
+    counts = (
+        Attendee.objects.filter(event=OuterRef('pk'))
+        .order_by()
+        .values('event')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    Event.objects.update(attendee_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attendee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_attendee_count, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(fields=('name', 'location', 'start_time'), name='unique_event_schedule'),
+        ),
+    ]
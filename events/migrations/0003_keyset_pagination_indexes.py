@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_attendee_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['event', 'registered_at', 'id'], name='events_atte_event_i_dcbc0d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'id'], name='events_even_start_t_5d3f7d_idx'),
+        ),
+    ]
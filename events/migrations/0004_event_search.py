@@ -0,0 +1,64 @@
+# Generated by Django 4.2.11 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+# External-content FTS5 index over Event.name/location. The triggers keep it
+# in sync with events_event; updates that touch other columns skip it.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE events_event_fts USING fts5(
+        name, location, content='events_event', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER events_event_fts_ai AFTER INSERT ON events_event BEGIN
+        INSERT INTO events_event_fts(rowid, name, location) VALUES (new.id, new.name, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_ad AFTER DELETE ON events_event BEGIN
+        INSERT INTO events_event_fts(events_event_fts, rowid, name, location)
+        VALUES ('delete', old.id, old.name, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_au AFTER UPDATE OF name, location ON events_event BEGIN
+        INSERT INTO events_event_fts(events_event_fts, rowid, name, location)
+        VALUES ('delete', old.id, old.name, old.location);
+        INSERT INTO events_event_fts(rowid, name, location) VALUES (new.id, new.name, new.location);
+    END
+    """,
+    "INSERT INTO events_event_fts(events_event_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS events_event_fts_au",
+    "DROP TRIGGER IF EXISTS events_event_fts_ad",
+    "DROP TRIGGER IF EXISTS events_event_fts_ai",
+    "DROP TABLE IF EXISTS events_event_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'start_time'], name='events_even_locatio_6be83f_idx'),
+        ),
+        migrations.RunPython(run_on_sqlite(CREATE_FTS), run_on_sqlite(DROP_FTS)),
+    ]
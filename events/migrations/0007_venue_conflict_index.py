@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'end_time', 'start_time'], name='events_even_locatio_4064b4_idx'),
+        ),
+    ]
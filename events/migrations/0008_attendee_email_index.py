@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_venue_conflict_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendee',
+            index=models.Index(fields=['email', 'registered_at', 'id'], name='events_atte_email_89656c_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:16
+
+import secrets
+from django.db import migrations, models
+import events.models
+
+
+def backfill_tokens(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        # Same format as new_checkin_token, in one statement
+        schema_editor.execute(
+            "UPDATE events_attendee SET checkin_token = lower(hex(randomblob(8))) WHERE checkin_token IS NULL"
+        )
+        return
+    Attendee = apps.get_model('events', 'Attendee')
+    pending = Attendee.objects.filter(checkin_token__isnull=True).only('pk')
+    for attendee in pending.iterator(chunk_size=2000):
+        attendee.checkin_token = secrets.token_hex(8)
+        attendee.save(update_fields=['checkin_token'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_attendee_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendee',
+            name='checked_in_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        # The default is applied by Django, not the database. Leaving it out of
+        # the schema lets SQLite add the column without copying the table.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AddField(
+                    model_name='attendee',
+                    name='checkin_token',
+                    field=models.CharField(editable=False, max_length=16, null=True),
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='attendee',
+                    name='checkin_token',
+                    field=models.CharField(default=events.models.new_checkin_token, editable=False, max_length=16, null=True),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_tokens, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendee',
+            constraint=models.UniqueConstraint(fields=('event', 'checkin_token'), name='unique_event_checkin_token'),
+        ),
+    ]
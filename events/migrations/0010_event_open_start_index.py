@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_attendee_checkin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('attendee_count__lt', models.F('max_capacity'))), fields=['start_time', 'id'], name='event_open_start_idx'),
+        ),
+    ]
@@ -1,7 +1,63 @@
-from django.db import models
+import secrets
+from collections import Counter
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-import pytz
+from .cache import invalidate_event_listings
+from .occupancy import occupancy_index
+from .timezones import resolve_timezone
+
+class EventQuerySet(models.QuerySet):
+    def search(self, text):
+        """
+        Events whose name or location contains every word of ``text`` as a prefix.
+
+        On SQLite this is answered by the ``events_event_fts`` FTS5 index, which
+        triggers keep in sync with the table; other databases fall back to
+        ``icontains``.
+        """
+        terms = text.split()
+        if not terms:
+            return self
+        if connections[self.db].vendor != 'sqlite':
+            condition = Q()
+            for term in terms:
+                condition &= Q(name__icontains=term) | Q(location__icontains=term)
+            return self.filter(condition)
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        return self.filter(pk__in=RawSQL(
+            'SELECT rowid FROM events_event_fts WHERE events_event_fts MATCH %s', (match,)
+        ))
+
+    def with_actual_attendee_count(self):
+        return self.annotate(actual_attendee_count=Count('attendees'))
+
+    def with_stale_attendee_count(self):
+        """Events whose stored ``attendee_count`` disagrees with their attendee rows."""
+        return self.with_actual_attendee_count().exclude(attendee_count=F('actual_attendee_count'))
+
+    def delete(self):
+        # Attendees first, in bulk; see delete_event_dependents
+        with transaction.atomic(using=self.db):
+            delete_event_dependents(list(self.values_list('pk', flat=True)), using=self.db)
+            return super().delete()
+
+    def recount_attendees(self):
+        """Rebuild ``attendee_count`` from the attendee table in a single UPDATE."""
+        counts = (
+            Attendee.objects.filter(event=OuterRef('pk'))
+            .order_by()
+            .values('event')
+            .annotate(n=Count('pk'))
+            .values('n')
+        )
+        updated = self.update(attendee_count=Coalesce(Subquery(counts), 0), **Event.changed())
+        transaction.on_commit(invalidate_event_listings, using=self.db)
+        return updated
+
 
 class Event(models.Model):
     name = models.CharField(max_length=255)
@@ -9,7 +65,18 @@ class Event(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     max_capacity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    attendee_count = models.PositiveIntegerField(default=0, editable=False)
+    waitlist_enabled = models.BooleanField(default=False)
+    # Positions of the last promoted and the last queued waitlist entry
+    waitlist_head = models.PositiveIntegerField(default=0, editable=False)
+    waitlist_tail = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every write that changes the event's detail or attendee list;
+    # the conditional GET validators of those endpoints
+    version = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = EventQuerySet.as_manager()
     
     class Meta:
         ordering = ['start_time']
@@ -23,42 +90,169 @@ class Event(models.Model):
                 name='unique_event_schedule'
             )
         ]
+        indexes = [
+            models.Index(fields=['start_time', 'id']),
+            models.Index(fields=['location', 'start_time']),
+            # Venue double-booking checks; see EventService.find_conflicts
+            models.Index(fields=['location', 'end_time', 'start_time']),
+            # Upcoming events with seats left (?has_seats=true); full events
+            # are not in it, and archival keeps finished ones out of the table
+            models.Index(
+                fields=['start_time', 'id'],
+                condition=Q(attendee_count__lt=F('max_capacity')),
+                name='event_open_start_idx',
+            ),
+        ]
     def __str__(self):
         return f"{self.name} at {self.location}"
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        # In the database, so an edit racing a registration cannot reuse a version
+        self.version, self.updated_at = F('version') + 1, timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'updated_at'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(Event, instance=self)
+        with transaction.atomic(using=using):
+            delete_event_dependents([self.pk], using=using)
+            return super().delete(using=using, keep_parents=keep_parents)
+
+    @staticmethod
+    def changed():
+        """``update()`` arguments that record a change, for writes made without ``save()``."""
+        return {'version': F('version') + 1, 'updated_at': timezone.now()}
     
     @property
     def current_attendee_count(self):
-        return self.attendees.count()
+        return self.attendee_count
+
+    @property
+    def seats_left(self):
+        return max(self.max_capacity - self.attendee_count, 0)
     
+    @property
+    def waitlist_length(self):
+        return self.waitlist_tail - self.waitlist_head
+
     def is_full(self):
         return self.current_attendee_count >= self.max_capacity
     
     def convert_timezone(self, timezone_str):
         """More robust timezone conversion"""
-        try:
-            tz = pytz.timezone(timezone_str)
-            return {
-                'start_time': self.start_time.astimezone(tz).isoformat(),
-                'end_time': self.end_time.astimezone(tz).isoformat()
-            }
-        except pytz.UnknownTimeZoneError:
+        tz = resolve_timezone(timezone_str)
+        if tz is None:
             return {
                 'start_time': self.start_time.isoformat(),
                 'end_time': self.end_time.isoformat()
             }
+        return {
+            'start_time': self.start_time.astimezone(tz).isoformat(),
+            'end_time': self.end_time.astimezone(tz).isoformat()
+        }
+
+class AttendeeQuerySet(models.QuerySet):
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False, **kwargs):
+        """
+        ``bulk_create`` skips ``post_save``, so bump the event counters here.
+
+        With ``ignore_conflicts`` the database does not say which rows went in,
+        so the affected events are recounted instead of incremented.
+        """
+        objs = super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts, **kwargs)
+        if ignore_conflicts or kwargs.get('update_conflicts'):
+            event_ids = {obj.event_id for obj in objs}
+            Event.objects.filter(pk__in=event_ids).recount_attendees()
+            transaction.on_commit(lambda: occupancy_index.discard(*event_ids), using=self.db)
+        else:
+            added_per_event = Counter(obj.event_id for obj in objs)
+            for event_id, added in added_per_event.items():
+                Event.objects.filter(pk=event_id).update(attendee_count=F('attendee_count') + added, **Event.changed())
+            transaction.on_commit(lambda: occupancy_index.adjust(added_per_event), using=self.db)
+            transaction.on_commit(invalidate_event_listings, using=self.db)
+        return objs
+
+
+def new_checkin_token():
+    """64 random bits as 16 hex digits, short enough for a QR code on a badge."""
+    return secrets.token_hex(8)
+
 
 class Attendee(models.Model):
     event = models.ForeignKey(Event, related_name='attendees', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     email = models.EmailField()
     registered_at = models.DateTimeField(auto_now_add=True)
+    # Issued on creation; nullable only so existing rows could be backfilled
+    # without rebuilding the table
+    checkin_token = models.CharField(max_length=16, null=True, default=new_checkin_token, editable=False)
+    checked_in_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = AttendeeQuerySet.as_manager()
     
     class Meta:
         unique_together = ['event', 'email']
         ordering = ['registered_at']
+        constraints = [
+            # Also the index door scanners resolve tokens with
+            models.UniqueConstraint(fields=['event', 'checkin_token'], name='unique_event_checkin_token'),
+        ]
         indexes = [
             models.Index(fields=['event', 'email']),
+            models.Index(fields=['event', 'registered_at', 'id']),
+            # One person's registrations across events; emails are stored lowercased
+            models.Index(fields=['email', 'registered_at', 'id']),
         ]
     
     def __str__(self):
-        return f"{self.name} ({self.email})"
\ No newline at end of file
+        return f"{self.name} ({self.email})"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A registration queued while its event was full.
+
+    ``position`` is assigned from ``Event.waitlist_tail`` and never changes.
+    Entries leave strictly from the head, so the place in the queue is
+    ``position - event.waitlist_head`` with no counting.
+    """
+    event = models.ForeignKey(Event, related_name='waitlist', on_delete=models.CASCADE)
+    name = models.CharField(max_length=255)
+    email = models.EmailField()
+    position = models.PositiveIntegerField()
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'position'], name='unique_waitlist_position'),
+            models.UniqueConstraint(fields=['event', 'email'], name='unique_waitlist_email'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.email}) #{self.position}"
+
+
+def delete_event_dependents(event_ids, using='default', chunk_size=900):
+    """
+    Delete the attendees and waitlist entries of ``event_ids``, one DELETE per table and chunk.
+
+    Cascading through the ORM would fetch every attendee and send each a
+    ``post_delete``, adjusting counters and promoting the waitlist of an event
+    that is about to go anyway. Callers delete the events next, in the same
+    transaction.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for start in range(0, len(event_ids), chunk_size):
+            chunk = event_ids[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            for model in (WaitlistEntry, Attendee):
+                cursor.execute(
+                    f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} '
+                    f'WHERE {connection.ops.quote_name("event_id")} IN ({placeholders})', chunk,
+                )
@@ -0,0 +1,84 @@
+"""
+Process-local index of event occupancy (``max_capacity`` and ``attendee_count``).
+
+Serves ``GET /api/events/occupancy/`` without a query per event. The index is
+warmed with all upcoming events when a server worker starts (and on first use
+otherwise). Registrations and deletions made by this process adjust it after
+commit. Writes from other processes are picked up by reconciliation: an entry
+older than ``OCCUPANCY_INDEX['MAX_AGE']`` seconds is treated as a miss, and all
+misses in a request are reloaded with a single query. A count can be off by
+a registration racing a reload, but never for longer than ``MAX_AGE``.
+"""
+import threading
+import time
+from django.conf import settings
+from django.utils import timezone
+
+MAX_IDS = 500
+
+
+def _max_age():
+    return {'MAX_AGE': 5, **getattr(settings, 'OCCUPANCY_INDEX', {})}['MAX_AGE']
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # event id -> [max_capacity, attendee_count, loaded at (monotonic)]
+        self._entries = {}
+        self.warmed = False
+
+    def warm(self):
+        """Load every upcoming event, replacing the current contents."""
+        from .models import Event
+
+        rows = Event.objects.filter(start_time__gt=timezone.now()).values_list('id', 'max_capacity', 'attendee_count')
+        loaded_at = time.monotonic()
+        entries = {event_id: [capacity, count, loaded_at] for event_id, capacity, count in rows.iterator()}
+        with self._lock:
+            self._entries = entries
+            self.warmed = True
+        return len(entries)
+
+    def get_many(self, ids):
+        """``{id: (max_capacity, attendee_count)}`` for the ids that exist, in one query at most."""
+        from .models import Event
+
+        if not self.warmed:
+            self.warm()
+        oldest = time.monotonic() - _max_age()
+        found, misses = {}, []
+        with self._lock:
+            for event_id in ids:
+                entry = self._entries.get(event_id)
+                if entry is not None and entry[2] >= oldest:
+                    found[event_id] = (entry[0], entry[1])
+                else:
+                    misses.append(event_id)
+        if misses:
+            rows = Event.objects.filter(pk__in=misses).values_list('id', 'max_capacity', 'attendee_count')
+            loaded_at = time.monotonic()
+            with self._lock:
+                for event_id, capacity, count in rows:
+                    self._entries[event_id] = [capacity, count, loaded_at]
+                    found[event_id] = (capacity, count)
+                for event_id in set(misses) - found.keys():
+                    self._entries.pop(event_id, None)
+        return found
+
+    def adjust(self, deltas):
+        """Apply committed attendee count changes, given as ``{event_id: delta}``, to indexed events."""
+        with self._lock:
+            for event_id, delta in deltas.items():
+                entry = self._entries.get(event_id)
+                if entry is not None:
+                    entry[1] = max(entry[1] + delta, 0)
+
+    def discard(self, *event_ids):
+        """Forget events, so their next read goes to the database."""
+        with self._lock:
+            for event_id in event_ids:
+                self._entries.pop(event_id, None)
+
+
+occupancy_index = OccupancyIndex()
@@ -0,0 +1,240 @@
+import base64
+import json
+from types import SimpleNamespace
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .models import Event
+
+
+def count_disabled(request, param='count'):
+    return request.query_params.get(param, '').lower() in ('false', '0', 'no')
+
+
+class EventPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'start_time'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.skip_count = count_disabled(request, self.count_query_param)
+        if not self.skip_count:
+            return super().paginate_queryset(queryset, request, view)
+        return self._finish_uncounted(list(self._uncounted_slice(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, evaluated with the async ORM."""
+        self.skip_count = count_disabled(request, self.count_query_param)
+        if self.skip_count:
+            return self._finish_uncounted([row async for row in self._uncounted_slice(queryset, request)])
+
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        bottom = (number - 1) * paginator.per_page
+        rows = [row async for row in queryset[bottom:bottom + paginator.per_page]]
+        self.page = paginator._get_page(rows, number, paginator)
+        return rows
+
+    def _uncounted_slice(self, queryset, request):
+        # Without the COUNT(*) there is no page total; fetching one extra row
+        # is enough to know whether a next page exists.
+        self.request = request
+        self.current_page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param), message='Invalid page.'
+            ))
+        offset = (self.page_number - 1) * self.current_page_size
+        return queryset[offset:offset + self.current_page_size + 1]
+
+    def _finish_uncounted(self, rows):
+        self.has_next = len(rows) > self.current_page_size
+        return rows[:self.current_page_size]
+
+    def get_next_link(self):
+        if not self.skip_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.skip_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only cursor pagination on a unique composite ordering.
+
+    Each page is ``WHERE (a, b) > (last_a, last_b) ORDER BY a, b LIMIT n`` so
+    deep pages cost the same as the first one and no total is ever counted.
+    ``ordering`` must end in a unique field and be backed by an index.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._finish(list(self._page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, evaluated with the async ORM."""
+        return self._finish([row async for row in self._page_queryset(queryset, request)])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.fields = [queryset.model._meta.get_field(name) for name in self.ordering]
+        self.current_page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        return queryset[:self.current_page_size + 1]
+
+    def _finish(self, rows):
+        self.has_next = len(rows) > self.current_page_size
+        self.page = rows[:self.current_page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def after(self, position):
+        """
+        ``(f1, f2, ...) > (v1, v2, ...)`` spelled out as an OR of prefixes.
+
+        The redundant ``f1 >= v1`` gives the planner a range to seek on the index.
+        """
+        condition = Q()
+        for depth, (field, value) in enumerate(zip(self.fields, position)):
+            prefix = Q(**{f.attname: v for f, v in zip(self.fields[:depth], position)})
+            condition |= prefix & Q(**{f'{field.attname}__gt': value})
+        return Q(**{f'{self.fields[0].attname}__gte': position[0]}) & condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj):
+        if isinstance(obj, dict):
+            # A row from .values()
+            obj = SimpleNamespace(**obj)
+        values = [field.value_to_string(obj) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class EventCursorPagination(KeysetPagination):
+    ordering = ('start_time', 'id')
+
+
+class AttendeeCursorPagination(KeysetPagination):
+    ordering = ('registered_at', 'id')
+
+
+class RegistrationCursorPagination(KeysetPagination):
+    ordering = ('email', 'registered_at', 'id')
+
+
+class ArchiveCursorPagination(KeysetPagination):
+    """``KeysetPagination`` over ``ArchiveStore.list_events`` instead of a queryset."""
+    ordering = ('start_time', 'id')
+
+    def paginate_archive(self, store, request, **filters):
+        self.request = request
+        self.fields = [Event._meta.get_field(name) for name in self.ordering]
+        self.current_page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        return self._finish(store.list_events(after=position, limit=self.current_page_size + 1, **filters))
+
+
+class SelectablePaginationMixin:
+    """
+    Lets the client pick a paginator with ``?pagination=<mode>``.
+
+    Views list their modes in ``pagination_modes`` and choose the one used when
+    the client does not ask with ``default_pagination_mode``. Sending a
+    ``cursor`` implies cursor mode.
+    """
+    pagination_query_param = 'pagination'
+    pagination_modes = {}
+    default_pagination_mode = 'page'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = select_paginator(
+                self.request, self.pagination_modes, self.default_pagination_mode, self.pagination_query_param
+            )
+        return self._paginator
+
+
+def select_paginator(request, modes, default_mode='page', param='pagination'):
+    """Instantiate the paginator the request asks for out of ``modes``."""
+    mode = request.query_params.get(param)
+    if mode is None:
+        mode = 'cursor' if 'cursor' in request.query_params and 'cursor' in modes else default_mode
+    if mode not in modes:
+        raise ValidationError({param: f"Must be one of: {', '.join(modes)}"})
+    return modes[mode]()
@@ -0,0 +1,333 @@
+"""
+Write-behind registration queue.
+
+With ``REGISTRATION_QUEUE['ENABLED']`` the register endpoint validates the
+request, enqueues it and answers ``202`` with a ticket instead of taking the
+database write lock itself. A worker drains the queue in batches and commits
+each batch in one transaction through ``RegistrationService.bulk_register``,
+so capacity is enforced per batch and a burst costs one writer per batch
+rather than one per request. ``GET /api/registrations/<ticket>/`` reports the
+outcome.
+
+The backend is swappable via ``REGISTRATION_QUEUE['BACKEND']``:
+``MemoryQueue`` keeps everything in this process (single-process servers,
+tests); ``SQLiteQueue`` uses a separate SQLite file that several web workers
+and a ``process_registration_queue`` worker can share. Delivery is at most
+once: a batch taken by a worker that then crashes leaves its tickets queued.
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+from .models import Attendee, Event
+from .services import RegistrationService, WaitlistService, EventFull
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+WAITLISTED = 'waitlisted'
+FAILED = 'failed'
+
+
+class QueueBackend:
+    """Interface for registration queue backends."""
+
+    def put(self, ticket, payload):
+        """Enqueue ``payload`` and record ``ticket`` as queued."""
+        raise NotImplementedError
+
+    def take(self, limit, timeout):
+        """Remove and return up to ``limit`` ``(ticket, payload)`` pairs, waiting up to ``timeout`` seconds for one."""
+        raise NotImplementedError
+
+    def set_results(self, results):
+        """Record outcomes, given as ``{ticket: result dict}``."""
+        raise NotImplementedError
+
+    def get_result(self, ticket):
+        """The ticket's latest result dict, or ``None`` if unknown."""
+        raise NotImplementedError
+
+
+class MemoryQueue(QueueBackend):
+    def __init__(self, max_results=100_000):
+        self._queue = queue.SimpleQueue()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_results = max_results
+
+    def put(self, ticket, payload):
+        self.set_results({ticket: {'status': QUEUED}})
+        self._queue.put((ticket, payload))
+
+    def take(self, limit, timeout):
+        try:
+            items = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def set_results(self, results):
+        with self._lock:
+            for ticket, result in results.items():
+                self._results[ticket] = result
+                self._results.move_to_end(ticket)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def get_result(self, ticket):
+        with self._lock:
+            return self._results.get(ticket)
+
+
+class SQLiteQueue(QueueBackend):
+    """Queue and results in their own SQLite file, so they never wait on the main database's lock."""
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, path=None, result_ttl=24 * 60 * 60):
+        self.path = str(path or settings.BASE_DIR / 'registration_queue.sqlite3')
+        self.result_ttl = result_ttl
+        self._local = threading.local()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS registration_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, ticket TEXT NOT NULL, payload TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS registration_result (
+                ticket TEXT PRIMARY KEY, result TEXT NOT NULL, updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS registration_result_updated ON registration_result (updated_at);
+        """)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def _connect(self):
+        return _Transaction(self._db())
+
+    def put(self, ticket, payload):
+        with self._connect() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO registration_result VALUES (?, ?, ?)',
+                (ticket, json.dumps({'status': QUEUED}), time.time()),
+            )
+            db.execute('INSERT INTO registration_queue (ticket, payload) VALUES (?, ?)', (ticket, json.dumps(payload)))
+
+    def take(self, limit, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._connect() as db:
+                rows = db.execute(
+                    'SELECT id, ticket, payload FROM registration_queue ORDER BY id LIMIT ?', (limit,)
+                ).fetchall()
+                if rows:
+                    db.execute('DELETE FROM registration_queue WHERE id <= ?', (rows[-1][0],))
+                    return [(ticket, json.loads(payload)) for _, ticket, payload in rows]
+            if time.monotonic() >= deadline:
+                return []
+            time.sleep(self.POLL_INTERVAL)
+
+    def set_results(self, results):
+        now = time.time()
+        with self._connect() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO registration_result VALUES (?, ?, ?)',
+                [(ticket, json.dumps(result), now) for ticket, result in results.items()],
+            )
+            db.execute('DELETE FROM registration_result WHERE updated_at < ?', (now - self.result_ttl,))
+
+    def get_result(self, ticket):
+        row = self._db().execute(
+            'SELECT result FROM registration_result WHERE ticket = ?', (ticket,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` on an autocommit sqlite3 connection."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _config():
+    return {
+        'ENABLED': False,
+        'BACKEND': 'events.queueing.MemoryQueue',
+        'OPTIONS': {},
+        'BATCH_SIZE': 500,
+        'WORKER': 'thread',
+        **getattr(settings, 'REGISTRATION_QUEUE', {}),
+    }
+
+
+def queue_enabled():
+    return _config()['ENABLED']
+
+
+_backend = None
+_worker = None
+_setup_lock = threading.Lock()
+
+
+def get_queue(start_worker=True):
+    """
+    The configured backend. Unless ``start_worker`` is false, also starts the
+    in-process worker when ``WORKER`` is ``'thread'``.
+    """
+    global _backend, _worker
+    if _backend is None or (start_worker and _worker is None and _config()['WORKER'] == 'thread'):
+        with _setup_lock:
+            config = _config()
+            if _backend is None:
+                _backend = import_string(config['BACKEND'])(**config['OPTIONS'])
+            if start_worker and _worker is None and config['WORKER'] == 'thread':
+                _worker = RegistrationWorker(_backend, config['BATCH_SIZE'])
+                _worker.start()
+    return _backend
+
+
+def reset_queue():
+    """Drop the backend and stop the worker, e.g. after changing settings in tests."""
+    global _backend, _worker
+    with _setup_lock:
+        if _worker is not None:
+            _worker.stop()
+        _backend = _worker = None
+
+
+def enqueue_registration(event_id, attendee_data):
+    """Queue a validated registration and return its ticket id."""
+    ticket = uuid.uuid4().hex
+    get_queue().put(ticket, {'event_id': event_id, **attendee_data})
+    return ticket
+
+
+def get_ticket(ticket):
+    result = get_queue().get_result(ticket)
+    return None if result is None else {'ticket': ticket, **result}
+
+
+def process_batch(items):
+    """
+    Register a batch of queued ``(ticket, payload)`` items; returns ``{ticket: result}``.
+
+    All events in the batch are registered in one transaction, each in its own
+    savepoint so a failing event does not undo the others. Rows that miss out
+    on capacity join the event's waitlist if it has one.
+    """
+    by_event = defaultdict(list)
+    for ticket, payload in items:
+        by_event[payload['event_id']].append((ticket, payload))
+
+    results = {}
+    with transaction.atomic():
+        for event_id, entries in by_event.items():
+            rows = [{'name': payload['name'], 'email': payload['email']} for _, payload in entries]
+            detail = None
+            try:
+                with transaction.atomic():
+                    statuses = RegistrationService.bulk_register(event_id, rows)
+            except Event.DoesNotExist:
+                statuses, detail = [FAILED] * len(rows), 'Event not found'
+            except ValidationError as e:
+                statuses, detail = [FAILED] * len(rows), ' '.join(e.messages)
+            for (ticket, _), row, state in zip(entries, rows, statuses):
+                results[ticket] = {'status': state, 'event': event_id, 'email': row['email']}
+                if detail:
+                    results[ticket]['detail'] = detail
+
+    for event_id, entries in by_event.items():
+        accepted = [results[ticket]['email'] for ticket, _ in entries
+                    if results[ticket]['status'] == RegistrationService.ACCEPTED]
+        if accepted:
+            tokens = RegistrationService.get_checkin_tokens(event_id, accepted)
+            for ticket, _ in entries:
+                if results[ticket]['status'] == RegistrationService.ACCEPTED:
+                    results[ticket]['checkin_token'] = tokens[results[ticket]['email']]
+
+    for ticket, result in results.items():
+        if result['status'] != RegistrationService.OVER_CAPACITY:
+            continue
+        name = next(payload['name'] for t, payload in items if t == ticket)
+        try:
+            entry = WaitlistService.join(result['event'], {'name': name, 'email': result['email']})
+        except EventFull:
+            continue
+        except ValidationError as e:
+            result.update(status=FAILED, detail=' '.join(e.messages))
+        else:
+            if isinstance(entry, Attendee):
+                result.update(status=RegistrationService.ACCEPTED, checkin_token=entry.checkin_token)
+            else:
+                result.update(status=WAITLISTED, position=entry.queue_position)
+    return results
+
+
+def drain(backend=None, batch_size=None, timeout=0):
+    """
+    Process batches in this thread until the queue stays empty for ``timeout``
+    seconds; returns the number of registrations handled.
+    """
+    backend = backend or get_queue(start_worker=False)
+    batch_size = batch_size or _config()['BATCH_SIZE']
+    handled = 0
+    while True:
+        items = backend.take(batch_size, timeout)
+        if not items:
+            return handled
+        backend.set_results(process_batch(items))
+        handled += len(items)
+
+
+class RegistrationWorker(threading.Thread):
+    POLL_TIMEOUT = 0.5
+
+    def __init__(self, backend, batch_size):
+        super().__init__(name='registration-queue-worker', daemon=True)
+        self.backend = backend
+        self.batch_size = batch_size
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            items = self.backend.take(self.batch_size, self.POLL_TIMEOUT)
+            if not items:
+                continue
+            try:
+                results = process_batch(items)
+            except Exception as e:
+                logger.exception("Registration batch failed")
+                results = {ticket: {'status': FAILED, 'detail': str(e)} for ticket, _ in items}
+            finally:
+                close_old_connections()
+            self.backend.set_results(results)
+            logger.info(f"Processed {len(items)} queued registrations")
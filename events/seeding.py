@@ -0,0 +1,151 @@
+"""
+Deterministic bulk generation of demo and load-testing data.
+
+Rows are generated in chunks of events, each from its own RNG seeded by
+``(seed, chunk index)``, so the output does not depend on how many processes
+generate it. Names, cities and phrases come from Faker pools built once per
+process, rather than one Faker call per field.
+"""
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import lru_cache
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+from .fts import drop_event_search_triggers, ensure_event_search_index
+from .models import Attendee, Event
+
+POOL_SIZE = 1000
+EVENTS_PER_CHUNK = 1000
+DOMAINS = ('example.com', 'example.org', 'example.net')
+
+
+@lru_cache(maxsize=4)
+def _pools(seed):
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        'phrases': [fake.catch_phrase() for _ in range(POOL_SIZE)],
+        'cities': [fake.city() for _ in range(POOL_SIZE // 4)],
+        'first_names': [fake.first_name() for _ in range(POOL_SIZE)],
+        'last_names': [fake.last_name() for _ in range(POOL_SIZE)],
+    }
+
+
+def generate_chunk(seed, chunk, events, attendees_per_event, number_from=0):
+    """
+    Plain tuples for events ``[chunk * EVENTS_PER_CHUNK, ...)``, picklable for
+    a process pool: ``[(name, location, start_offset_minutes, hours, capacity,
+    [(name, email), ...]), ...]``. Event names are numbered from ``number_from``.
+    """
+    pools = _pools(seed)
+    rng = random.Random(seed * 1_000_003 + chunk)
+    first = chunk * EVENTS_PER_CHUNK
+    rows = []
+    for i in range(first, min(first + EVENTS_PER_CHUNK, events)):
+        attendees = []
+        for n in range(attendees_per_event):
+            first_name = rng.choice(pools['first_names'])
+            last_name = rng.choice(pools['last_names'])
+            email = f'{first_name}.{last_name}{n}@{rng.choice(DOMAINS)}'.lower()
+            attendees.append((f'{first_name} {last_name}', email))
+        rows.append((
+            f"{rng.choice(pools['phrases'])} {number_from + i}",
+            rng.choice(pools['cities']),
+            rng.randrange(60, 60 * 24 * 90),
+            rng.randint(1, 3),
+            attendees_per_event + rng.randint(0, max(attendees_per_event, 10)),
+            attendees,
+        ))
+    return rows
+
+
+def _generate(chunk_args, pool, workers):
+    """``generate_chunk`` over ``chunk_args`` in order, at most ``2 * workers`` chunks ahead of the consumer."""
+    if pool is None:
+        yield from (generate_chunk(*args) for args in chunk_args)
+        return
+    pending = deque()
+    for args in chunk_args:
+        pending.append(pool.submit(generate_chunk, *args))
+        if len(pending) > 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _secondary_indexes():
+    # Meta.indexes only: the unique indexes enforce the data model
+    return [(model, index) for model in (Event, Attendee) for index in model._meta.indexes]
+
+
+def _run_index_sql(statement, indexes):
+    # Plain statements rather than ``with schema_editor()``, which SQLite
+    # refuses inside a transaction
+    editor = connection.schema_editor()
+    with connection.cursor() as cursor:
+        for model, index in indexes:
+            cursor.execute(str(getattr(index, statement)(model, editor)))
+
+
+def seed(events, attendees_per_event, seed=0, batch_size=5000, drop_indexes=False, workers=1, progress=None):
+    """
+    Insert ``events`` upcoming events with ``attendees_per_event`` attendees
+    each, in one transaction. Returns ``(events, attendees)`` inserted.
+
+    Start times are offsets from today's midnight, so on an empty database a
+    given seed produces the same data set all day; later runs number their
+    events after the existing ones so they can be added on top. ``drop_indexes`` removes the secondary indexes
+    and full-text triggers for the load and rebuilds them at the end.
+    ``workers > 1`` generates chunks in a process pool; inserts stay in this
+    process, as SQLite has a single writer.
+    """
+    anchor = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    number_from = Event.objects.count()
+    chunk_args = [
+        (seed, chunk, events, attendees_per_event, number_from)
+        for chunk in range((events + EVENTS_PER_CHUNK - 1) // EVENTS_PER_CHUNK)
+    ]
+    inserted_events = inserted_attendees = 0
+
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as pool, transaction.atomic():
+        if drop_indexes:
+            _run_index_sql('remove_sql', _secondary_indexes())
+            drop_event_search_triggers(connection.alias)
+
+        for rows in _generate(chunk_args, pool, workers):
+            created = Event.objects.bulk_create(
+                [
+                    Event(
+                        name=name,
+                        location=location,
+                        start_time=anchor + timedelta(days=1, minutes=offset),
+                        end_time=anchor + timedelta(days=1, minutes=offset, hours=hours),
+                        max_capacity=capacity,
+                    )
+                    for name, location, offset, hours, capacity, _ in rows
+                ],
+                batch_size=batch_size,
+            )
+            # AttendeeQuerySet.bulk_create keeps Event.attendee_count in step
+            Attendee.objects.bulk_create(
+                [
+                    Attendee(event_id=event.pk, name=name, email=email)
+                    for event, row in zip(created, rows)
+                    for name, email in row[5]
+                ],
+                batch_size=batch_size,
+            )
+            inserted_events += len(created)
+            inserted_attendees += sum(len(row[5]) for row in rows)
+            if progress:
+                progress(inserted_events, inserted_attendees)
+
+        if drop_indexes:
+            _run_index_sql('create_sql', _secondary_indexes())
+            ensure_event_search_index(connection.alias)
+
+    return inserted_events, inserted_attendees
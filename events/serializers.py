@@ -1,11 +1,20 @@
-from rest_framework import serializers
-from .models import Event, Attendee
+from django.conf import settings
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import Event, Attendee, WaitlistEntry
 from django.utils import timezone
 
 class EventSerializer(serializers.ModelSerializer):
+    seats_left = serializers.IntegerField(read_only=True)
+    waitlist_length = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Event
-        fields = ['id', 'name', 'location', 'start_time', 'end_time', 'max_capacity']
+        fields = [
+            'id', 'name', 'location', 'start_time', 'end_time', 'max_capacity',
+            'attendee_count', 'seats_left', 'waitlist_enabled', 'waitlist_length',
+        ]
+        read_only_fields = ['attendee_count']
     
     def validate(self, data):
         if data['start_time'] >= data['end_time']:
@@ -29,9 +38,149 @@ class AttendeeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid email address")
         return value.lower()
 
+class RegisteredAttendeeSerializer(AttendeeSerializer):
+    """The registration response: the attendee and the token their badge carries for check-in."""
+    class Meta(AttendeeSerializer.Meta):
+        fields = AttendeeSerializer.Meta.fields + ['checkin_token']
+
 class RegistrationSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=255)
     email = serializers.EmailField()
     
     def validate_email(self, value):
-        return AttendeeSerializer().validate_email(value)
\ No newline at end of file
+        return AttendeeSerializer().validate_email(value)
+
+class CheckinSerializer(serializers.Serializer):
+    token = serializers.CharField(max_length=16)
+
+    def validate_token(self, value):
+        return value.strip().lower()
+
+class CheckinScanSerializer(CheckinSerializer):
+    scanned_at = serializers.DateTimeField()
+
+class EventSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Event
+        fields = ['id', 'name', 'location', 'start_time', 'end_time']
+
+class AttendeeRegistrationSerializer(serializers.ModelSerializer):
+    event = EventSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Attendee
+        fields = ['id', 'name', 'email', 'registered_at', 'event']
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    position = serializers.IntegerField(source='queue_position', read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ['id', 'name', 'email', 'position', 'joined_at']
+
+
+def _format_datetime(value, tz):
+    # DateTimeField.to_representation with the default ISO 8601 format
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class ValuesListSerializer:
+    """
+    Read-only ``many=True`` rendering of ``.values()`` rows.
+
+    Produces the same output as ``model_serializer`` would for the model
+    instances, but picks a formatter per field once, when the class is first
+    used, instead of running DRF's field machinery for every row. Fields that
+    are not columns are computed from the row by ``derived``; list the columns
+    they read in ``extra_columns``. Nested serializers of related objects read
+    ``<field>__<column>`` from the same row, so one joined query fills them.
+    """
+    model_serializer = None
+    derived = {}
+    extra_columns = ()
+
+    _plan = None
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def columns(cls):
+        """Column names to pass to ``.values()``."""
+        return cls._compile()[0]
+
+    @classmethod
+    def _compile(cls):
+        if cls.__dict__.get('_plan') is None:
+            columns, plan = cls._build(cls.model_serializer().fields, '')
+            cls._plan = ([*cls.extra_columns, *columns], plan)
+        return cls._plan
+
+    @classmethod
+    def _build(cls, fields, prefix):
+        columns, plan = [], []
+        for name, field in fields.items():
+            if isinstance(field, serializers.BaseSerializer):
+                nested_columns, nested_plan = cls._build(field.fields, f'{prefix}{field.source}__')
+                columns.extend(nested_columns)
+                plan.append((name, None, None, None, False, nested_plan))
+                continue
+            derive = None if prefix else cls.derived.get(name)
+            if derive is None:
+                columns.append(prefix + field.source)
+            plan.append((name, prefix + field.source, derive, *cls._formatter(field), None))
+        return columns, plan
+
+    @staticmethod
+    def _formatter(field):
+        """``(function, takes_timezone)`` matching ``field.to_representation`` for non-null values."""
+        if (isinstance(field, serializers.DateTimeField) and settings.USE_TZ and not hasattr(field, 'timezone')
+                and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601):
+            return _format_datetime, True
+        if isinstance(field, serializers.IntegerField):
+            return int, False
+        if isinstance(field, serializers.CharField):
+            return str, False
+        return field.to_representation, False
+
+    @property
+    def data(self):
+        _, plan = self._compile()
+        # Resolved per call, like DRF: views override it to localise listings
+        tz = timezone.get_current_timezone()
+        return [self._render(row, plan, tz) for row in self.rows]
+
+    @staticmethod
+    def _render(row, plan, tz):
+        item = {}
+        for name, column, derive, fmt, takes_timezone, nested in plan:
+            if nested is not None:
+                item[name] = ValuesListSerializer._render(row, nested, tz)
+                continue
+            value = derive(row) if derive else row[column]
+            if value is None:
+                item[name] = None
+            elif takes_timezone:
+                item[name] = fmt(value, tz)
+            else:
+                item[name] = fmt(value)
+        return item
+
+
+class EventListSerializer(ValuesListSerializer):
+    model_serializer = EventSerializer
+    # Same as the Event.seats_left and Event.waitlist_length properties
+    derived = {
+        'seats_left': lambda row: max(row['max_capacity'] - row['attendee_count'], 0),
+        'waitlist_length': lambda row: row['waitlist_tail'] - row['waitlist_head'],
+    }
+    extra_columns = ('waitlist_head', 'waitlist_tail')
+
+
+class AttendeeListSerializer(ValuesListSerializer):
+    model_serializer = AttendeeSerializer
+
+
+class AttendeeRegistrationListSerializer(ValuesListSerializer):
+    model_serializer = AttendeeRegistrationSerializer
@@ -1,39 +1,369 @@
-from .models import Event, Attendee
+from asgiref.sync import sync_to_async
+from .models import Event, Attendee, WaitlistEntry
+from .throttling import write_load
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+class EventFull(ValidationError):
+    def __init__(self, message="Event is full"):
+        super().__init__(message)
+
+
+class VenueConflict(ValidationError):
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        ids = ', '.join(str(event.id) for event in conflicts)
+        super().__init__(f"The venue is already booked at this time by event(s) {ids}")
+
 
 class EventService:
+    MAX_CONFLICTS = 100
+
     @staticmethod
     def create_event(event_data):
         event = Event(**event_data)
         try:
             event.full_clean()
-            event.save()
+            with write_load.track(), transaction.atomic():
+                # Insert first: the write lock makes concurrent bookings of
+                # the venue check one after the other
+                event.save()
+                EventService.check_venue(event)
             return event
         except IntegrityError:
             raise ValidationError("An event with the same name, location, and start time already exists.")
+
+    @staticmethod
+    def find_conflicts(location, start, end, exclude=None):
+        """
+        Events at ``location`` overlapping ``[start, end)``, at most ``MAX_CONFLICTS``.
+
+        Served by the ``(location, end_time, start_time)`` index: seeking on
+        ``end_time > start`` skips every event that ended before the window,
+        so a venue's history costs nothing, and ``start_time`` is checked
+        within the index. Ordering by ``end_time`` keeps SQLite on that index.
+        """
+        conflicts = Event.objects.filter(location=location, end_time__gt=start, start_time__lt=end)
+        if exclude is not None:
+            conflicts = conflicts.exclude(pk=exclude)
+        return conflicts.order_by('end_time', 'start_time')[:EventService.MAX_CONFLICTS]
+
+    @staticmethod
+    def check_venue(event):
+        """Raise ``VenueConflict`` if another event at the location overlaps ``event``."""
+        conflicts = list(EventService.find_conflicts(event.location, event.start_time, event.end_time, exclude=event.pk))
+        if conflicts:
+            raise VenueConflict(conflicts)
     
     @staticmethod
-    def get_upcoming_events():
-        return Event.objects.filter(start_time__gt=timezone.now()).order_by('start_time')
+    def get_upcoming_events(starts_after=None):
+        now = timezone.now()
+        if starts_after is not None and starts_after > now:
+            return Event.objects.filter(start_time__gte=starts_after).order_by('start_time')
+        return Event.objects.filter(start_time__gt=now).order_by('start_time')
 
 class RegistrationService:
+    ACCEPTED = 'accepted'
+    DUPLICATE = 'duplicate'
+    OVER_CAPACITY = 'over_capacity'
+
+    # Keeps each ``email IN (...)`` lookup under SQLite's bound-parameter limit
+    LOOKUP_CHUNK_SIZE = 900
+    MAX_RESERVATION_ATTEMPTS = 5
+
     @staticmethod
     def register_attendee(event_id, attendee_data):
-        event = Event.objects.get(pk=event_id)
-        
-        if event.is_full():
-            raise ValidationError("This event has reached maximum capacity")
-        
-        if Attendee.objects.filter(event=event, email=attendee_data['email']).exists():
+        """
+        Admit one attendee: reserve a seat and insert the row in one transaction.
+
+        The seat is taken with a conditional ``UPDATE ... WHERE attendee_count <
+        max_capacity``. As the first statement of the transaction it also takes
+        the write lock, so concurrent registrations queue behind it instead of
+        all passing a stale capacity check. Duplicate emails are rejected by the
+        ``(event, email)`` unique constraint, which rolls the reservation back.
+        """
+        attendee = Attendee(event_id=event_id, **attendee_data)
+        attendee.full_clean(exclude=['event'], validate_unique=False, validate_constraints=False)
+        attendee._seat_reserved = True
+
+        try:
+            with write_load.track(), transaction.atomic():
+                reserved = Event.objects.filter(
+                    pk=event_id, attendee_count__lt=F('max_capacity')
+                ).update(attendee_count=F('attendee_count') + 1, **Event.changed())
+                if not reserved:
+                    if not Event.objects.filter(pk=event_id).exists():
+                        raise Event.DoesNotExist(f"Event {event_id} does not exist")
+                    raise EventFull()
+                attendee.save(force_insert=True)
+        except IntegrityError:
             raise ValidationError("This email is already registered for the event")
-        
-        attendee = Attendee(event=event, **attendee_data)
-        attendee.full_clean()
-        attendee.save()
         return attendee
     
+    @classmethod
+    async def aregister_attendee(cls, event_id, attendee_data):
+        """
+        Async entry point for ``register_attendee``.
+
+        The async ORM has no transaction API yet, so the reservation runs as
+        the sync code in a worker thread rather than as separate awaited queries.
+        """
+        return await sync_to_async(cls.register_attendee)(event_id, attendee_data)
+
+    @classmethod
+    def bulk_register(cls, event_id, attendees_data, batch_size=1000):
+        """
+        Register many attendees at once and return one status per input row.
+
+        Emails repeated in the batch or already registered are ``duplicate``;
+        rows beyond the remaining capacity are ``over_capacity``. Capacity is
+        read once, and the inserts are committed together with a
+        compare-and-swap on ``attendee_count`` so a concurrent registration in
+        between makes the batch re-plan instead of overselling.
+        """
+        statuses = [None] * len(attendees_data)
+        first_seen = {}
+        for index, data in enumerate(attendees_data):
+            if data['email'] in first_seen:
+                statuses[index] = cls.DUPLICATE
+            else:
+                first_seen[data['email']] = index
+
+        for _ in range(cls.MAX_RESERVATION_ATTEMPTS):
+            event = Event.objects.only('max_capacity', 'attendee_count').get(pk=event_id)
+            emails = list(first_seen)
+            registered = set()
+            for start in range(0, len(emails), cls.LOOKUP_CHUNK_SIZE):
+                registered.update(
+                    Attendee.objects.filter(
+                        event_id=event_id, email__in=emails[start:start + cls.LOOKUP_CHUNK_SIZE]
+                    ).values_list('email', flat=True)
+                )
+            fresh = [email for email in emails if email not in registered]
+            admitted = fresh[:max(event.max_capacity - event.attendee_count, 0)]
+
+            try:
+                with write_load.track(), transaction.atomic():
+                    # A no-op write that only succeeds if nobody registered since
+                    # capacity was read; it also holds the write lock to commit.
+                    unchanged = Event.objects.filter(
+                        pk=event_id, attendee_count=event.attendee_count
+                    ).update(attendee_count=F('attendee_count'))
+                    if not unchanged:
+                        continue
+                    Attendee.objects.bulk_create(
+                        [Attendee(event_id=event_id, **attendees_data[first_seen[email]]) for email in admitted],
+                        batch_size=batch_size,
+                    )
+            except IntegrityError:
+                continue
+            break
+        else:
+            raise ValidationError("Event is receiving too many registrations, please retry")
+
+        admitted = set(admitted)
+        for email, index in first_seen.items():
+            if email in registered:
+                statuses[index] = cls.DUPLICATE
+            elif email in admitted:
+                statuses[index] = cls.ACCEPTED
+            else:
+                statuses[index] = cls.OVER_CAPACITY
+        return statuses
+
     @staticmethod
     def get_attendees_for_event(event_id):
-        return Attendee.objects.filter(event_id=event_id).select_related('event').order_by('registered_at')
\ No newline at end of file
+        return Attendee.objects.filter(event_id=event_id).select_related('event').order_by('registered_at')
+
+    @staticmethod
+    def get_checkin_tokens(event_id, emails):
+        """``{email: checkin_token}`` for the event's attendees among ``emails``."""
+        tokens = {}
+        for start in range(0, len(emails), RegistrationService.LOOKUP_CHUNK_SIZE):
+            tokens.update(
+                Attendee.objects.filter(
+                    event_id=event_id, email__in=emails[start:start + RegistrationService.LOOKUP_CHUNK_SIZE]
+                ).values_list('email', 'checkin_token')
+            )
+        return tokens
+
+    @staticmethod
+    def get_registrations_for_emails(emails):
+        """Registrations of any of ``emails`` (lowercase), with their events joined in."""
+        return Attendee.objects.filter(email__in=emails).select_related('event').order_by('email', 'registered_at', 'id')
+
+class WaitlistService:
+    @staticmethod
+    def join(event_id, attendee_data):
+        """
+        Queue a registration for a full event that has its waitlist enabled.
+
+        Returns the ``WaitlistEntry`` with its ``queue_position``, or the new
+        ``Attendee`` if a seat had freed up and the entry was promoted at once.
+        Raises ``EventFull`` when the event has no waitlist.
+        """
+        try:
+            with write_load.track(), transaction.atomic():
+                queued = Event.objects.filter(pk=event_id, waitlist_enabled=True).update(
+                    waitlist_tail=F('waitlist_tail') + 1, **Event.changed()
+                )
+                if not queued:
+                    raise EventFull()
+                # The capacity check fails before the (event, email) constraint
+                # would; checked under the write lock the update above took
+                if Attendee.objects.filter(event_id=event_id, email=attendee_data['email']).exists():
+                    raise ValidationError("This email is already registered for the event")
+                tail = Event.objects.filter(pk=event_id).values_list('waitlist_tail', flat=True).get()
+                entry = WaitlistEntry.objects.create(event_id=event_id, position=tail, **attendee_data)
+        except IntegrityError:
+            raise ValidationError("This email is already on the waitlist")
+
+        # A seat may have freed up between the capacity check and joining
+        WaitlistService.promote(event_id)
+        entry.queue_position = WaitlistService.get_position(event_id, entry.email)
+        if entry.queue_position is None:
+            # Promoted already, by the call above or a concurrent one
+            attendee = Attendee.objects.filter(event_id=event_id, email=entry.email).first()
+            if attendee is not None:
+                return attendee
+        return entry
+
+    @staticmethod
+    def get_position(event_id, email):
+        """1-based place in the queue, or ``None`` if the email is not waiting."""
+        row = (
+            WaitlistEntry.objects.filter(event_id=event_id, email=email)
+            .values_list('position', 'event__waitlist_head')
+            .first()
+        )
+        return row[0] - row[1] if row else None
+
+    @staticmethod
+    def promote(event_id):
+        """
+        Move entries from the head of the waitlist into free seats, in one transaction.
+
+        Each seat is reserved with the same conditional UPDATE used for
+        registrations, which also does nothing when the queue is empty. Returns
+        the new attendees.
+        """
+        promoted = []
+        with transaction.atomic():
+            while Event.objects.filter(
+                pk=event_id,
+                attendee_count__lt=F('max_capacity'),
+                waitlist_head__lt=F('waitlist_tail'),
+            ).update(attendee_count=F('attendee_count') + 1, **Event.changed()):
+                entry = WaitlistEntry.objects.filter(event_id=event_id).order_by('position').first()
+                if entry is None:
+                    # Counters ahead of the table: give the seat back and close the gap
+                    Event.objects.filter(pk=event_id).update(
+                        attendee_count=F('attendee_count') - 1, waitlist_head=F('waitlist_tail'), **Event.changed()
+                    )
+                    break
+
+                attendee = Attendee(event_id=event_id, name=entry.name, email=entry.email)
+                attendee._seat_reserved = True
+                try:
+                    with transaction.atomic():
+                        attendee.save(force_insert=True)
+                    promoted.append(attendee)
+                except IntegrityError:
+                    # Registered directly in the meantime; the seat goes to the next entry
+                    Event.objects.filter(pk=event_id).update(attendee_count=F('attendee_count') - 1, **Event.changed())
+
+                entry.delete()
+                Event.objects.filter(pk=event_id).update(waitlist_head=entry.position, **Event.changed())
+        return promoted
+
+
+class CheckinService:
+    CHECKED_IN = 'checked_in'
+    DUPLICATE = 'duplicate'
+    UNKNOWN = 'unknown'
+
+    LOOKUP_CHUNK_SIZE = 900
+
+    @staticmethod
+    def check_in(event_id, token):
+        """
+        Check in the attendee holding ``token``; returns ``(status, attendee)``.
+
+        One lookup on the ``(event, checkin_token)`` unique index, then one
+        conditional UPDATE that only the first of two racing scans wins.
+        ``attendee`` is a dict of ``id``, ``name``, ``email`` and
+        ``checked_in_at``, or ``None`` for an unknown token.
+        """
+        attendee = (
+            Attendee.objects.filter(event_id=event_id, checkin_token=token)
+            .values('id', 'name', 'email', 'checked_in_at')
+            .first()
+        )
+        if attendee is None:
+            return CheckinService.UNKNOWN, None
+        if attendee['checked_in_at'] is not None:
+            return CheckinService.DUPLICATE, attendee
+
+        now = timezone.now()
+        with write_load.track():
+            updated = Attendee.objects.filter(pk=attendee['id'], checked_in_at__isnull=True).update(checked_in_at=now)
+        if not updated:
+            # Another scanner got there first
+            attendee['checked_in_at'] = Attendee.objects.values_list('checked_in_at', flat=True).get(pk=attendee['id'])
+            return CheckinService.DUPLICATE, attendee
+        attendee['checked_in_at'] = now
+        return CheckinService.CHECKED_IN, attendee
+
+    @staticmethod
+    def check_in_batch(event_id, scans):
+        """
+        Apply scans queued by an offline device, in one transaction.
+
+        ``scans`` are dicts with ``token`` and ``scanned_at``; attendees are
+        checked in at the time they were scanned. Returns one ``(status,
+        checked_in_at)`` per scan. A token scanned more than once counts at its
+        earliest scan and the others are ``duplicate``, as are scans of
+        attendees who were already checked in.
+        """
+        earliest = {}
+        for index, scan in enumerate(scans):
+            first = earliest.get(scan['token'])
+            if first is None or scan['scanned_at'] < scans[first]['scanned_at']:
+                earliest[scan['token']] = index
+
+        tokens = list(earliest)
+        with write_load.track(), transaction.atomic():
+            # A no-op write first: it takes the write lock, so no other scan
+            # can land between the reads below and the update
+            if not Event.objects.filter(pk=event_id).update(attendee_count=F('attendee_count')):
+                raise Event.DoesNotExist(f"Event {event_id} does not exist")
+            found = {}
+            for start in range(0, len(tokens), CheckinService.LOOKUP_CHUNK_SIZE):
+                for token, attendee_id, checked_in_at in Attendee.objects.filter(
+                    event_id=event_id, checkin_token__in=tokens[start:start + CheckinService.LOOKUP_CHUNK_SIZE]
+                ).values_list('checkin_token', 'id', 'checked_in_at'):
+                    found[token] = (attendee_id, checked_in_at)
+
+            checked_in = {}
+            for token, index in earliest.items():
+                if token in found and found[token][1] is None:
+                    checked_in[token] = scans[index]['scanned_at']
+            Attendee.objects.bulk_update(
+                [Attendee(pk=found[token][0], checked_in_at=at) for token, at in checked_in.items()],
+                ['checked_in_at'],
+                batch_size=500,
+            )
+
+        results = []
+        for index, scan in enumerate(scans):
+            token = scan['token']
+            if token not in found:
+                results.append((CheckinService.UNKNOWN, None))
+            elif token in checked_in and earliest[token] == index:
+                results.append((CheckinService.CHECKED_IN, checked_in[token]))
+            else:
+                results.append((CheckinService.DUPLICATE, checked_in.get(token) or found[token][1]))
+        return results
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Event, Attendee
+from .cache import invalidate_event_listings
+from .occupancy import occupancy_index
+from .services import WaitlistService
+
+
+@receiver(post_save, sender=Attendee)
+def increment_attendee_count(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    transaction.on_commit(lambda: occupancy_index.adjust({instance.event_id: 1}))
+    # Listings show attendee_count and seats_left
+    transaction.on_commit(invalidate_event_listings)
+    # RegistrationService already took the seat when it admitted this attendee
+    if not getattr(instance, '_seat_reserved', False):
+        Event.objects.filter(pk=instance.event_id).update(attendee_count=F('attendee_count') + 1, **Event.changed())
+
+
+@receiver(post_delete, sender=Attendee)
+def decrement_attendee_count(sender, instance, **kwargs):
+    Event.objects.filter(pk=instance.event_id, attendee_count__gt=0).update(
+        attendee_count=F('attendee_count') - 1, **Event.changed()
+    )
+    transaction.on_commit(lambda: occupancy_index.adjust({instance.event_id: -1}))
+    transaction.on_commit(invalidate_event_listings)
+    # Not sent when the event itself is deleted: Event.delete removes its
+    # attendees in bulk first (see delete_event_dependents)
+    transaction.on_commit(lambda: WaitlistService.promote(instance.event_id))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_listings(sender, instance, **kwargs):
+    # After commit, so a concurrent reader cannot re-cache the old rows
+    transaction.on_commit(invalidate_event_listings)
+    # Capacity may have changed; the next occupancy read reloads the event
+    transaction.on_commit(lambda: occupancy_index.discard(instance.pk))
@@ -1,15 +1,55 @@
-from django.test import TestCase
-from django.urls import reverse
+from django.test import TestCase, TransactionTestCase, SimpleTestCase, Client, AsyncRequestFactory, override_settings
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.core.management import call_command, CommandError
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import clear_url_caches, reverse
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient,APITestCase
+from rest_framework.renderers import JSONRenderer
 from rest_framework import status
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
+import asyncio
+import csv
+import importlib
 import json
-from .models import Event, Attendee
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+from urllib.parse import urlencode
+from io import StringIO
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from .models import Event, Attendee, WaitlistEntry
+from .services import CheckinService, EventFull, EventService, RegistrationService, WaitlistService
+from .admin import AttendeeInline, EstimatedCountPaginator
+from .serializers import (
+    AttendeeListSerializer,
+    AttendeeRegistrationListSerializer,
+    AttendeeRegistrationSerializer,
+    AttendeeSerializer,
+    EventListSerializer,
+    EventSerializer,
+)
+from .seeding import generate_chunk
+from .queueing import drain, process_batch, reset_queue
+from .occupancy import occupancy_index
+from .archive import archive_events, get_store as get_archive, restore_events
+from .throttling import RegisterClientThrottle, write_load
+from .idempotency import cache_key as idempotency_cache_key, idempotent
+from .metrics import registry
+from . import async_views
 
 
 class EventAPITestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         self.event = Event.objects.create(
             name="Test Event",
             location="Test Location",
@@ -120,3 +160,1550 @@ class EventAPITestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
+
+
+class RegistrationCapacityTestCase(TransactionTestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Flash Sale",
+            location="Arena",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=5,
+        )
+
+    def test_register_attendee_counts_seat(self):
+        RegistrationService.register_attendee(self.event.id, {"name": "A", "email": "a@example.com"})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertEqual(self.event.attendees.count(), 1)
+
+    def test_duplicate_email_releases_seat(self):
+        RegistrationService.register_attendee(self.event.id, {"name": "A", "email": "a@example.com"})
+        with self.assertRaises(ValidationError):
+            RegistrationService.register_attendee(self.event.id, {"name": "A", "email": "a@example.com"})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_register_unknown_event_returns_404(self):
+        url = reverse("events:event-register", args=[self.event.id + 100])
+        response = self.client.post(url, {"name": "A", "email": "a@example.com"}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_concurrent_registrations_do_not_oversell(self):
+        url = reverse("events:event-register", args=[self.event.id])
+
+        def register(i):
+            try:
+                return Client().post(
+                    url, {"name": f"User {i}", "email": f"user{i}@example.com"}, content_type='application/json'
+                ).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            codes = list(pool.map(register, range(100)))
+
+        # The in-memory test database can reject some writers outright with
+        # "table is locked"; what must never happen is admitting past capacity
+        # or the counter drifting from the real rows.
+        admitted = codes.count(status.HTTP_201_CREATED)
+        self.event.refresh_from_db()
+        self.assertLessEqual(admitted, self.event.max_capacity)
+        self.assertEqual(self.event.attendees.count(), admitted)
+        self.assertEqual(self.event.attendee_count, admitted)
+
+
+class AttendeeCountTestCase(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Meetup",
+            location="Hall",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=10,
+        )
+
+    def test_count_follows_create_bulk_create_and_delete(self):
+        Attendee.objects.create(event=self.event, name="A", email="a@example.com")
+        Attendee.objects.bulk_create([
+            Attendee(event=self.event, name="B", email="b@example.com"),
+            Attendee(event=self.event, name="C", email="c@example.com"),
+        ])
+        Attendee.objects.bulk_create(
+            [Attendee(event=self.event, name="C", email="c@example.com")], ignore_conflicts=True
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 3)
+
+        Attendee.objects.filter(email="a@example.com").delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 2)
+        self.assertEqual(self.event.seats_left, 8)
+
+    def test_recount_command_repairs_drift(self):
+        Attendee.objects.create(event=self.event, name="A", email="a@example.com")
+        Event.objects.filter(pk=self.event.pk).update(attendee_count=7)
+
+        with self.assertRaises(CommandError):
+            call_command("recount_attendees", "--check", stdout=StringIO())
+        call_command("recount_attendees", stdout=StringIO())
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_event_delete_removes_attendees_in_bulk(self):
+        other = Event.objects.create(
+            name="Other", location="Hall", start_time=self.event.start_time, end_time=self.event.end_time,
+            max_capacity=10,
+        )
+        for event in (self.event, other):
+            Attendee.objects.bulk_create(
+                [Attendee(event=event, name="A", email=f"a{n}@example.com") for n in range(50)]
+            )
+        WaitlistEntry.objects.create(event=self.event, name="W", email="w@example.com", position=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.event.delete()
+        self.assertLess(len(queries), 10)
+        with CaptureQueriesContext(connection) as queries:
+            Event.objects.filter(pk=other.pk).delete()
+        self.assertLess(len(queries), 10)
+        self.assertFalse(Attendee.objects.exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_event_detail_exposes_occupancy(self):
+        Attendee.objects.create(event=self.event, name="A", email="a@example.com")
+        response = self.client.get(reverse("events:event-detail", args=[self.event.id]))
+        self.assertEqual(response.data["attendee_count"], 1)
+        self.assertEqual(response.data["seats_left"], 9)
+
+
+class BulkRegistrationTestCase(APITestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Partner Import",
+            location="Expo",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=3,
+        )
+        Attendee.objects.create(event=self.event, name="Existing", email="existing@example.com")
+
+    def test_bulk_register_reports_row_status(self):
+        url = reverse("events:event-register-bulk", args=[self.event.id])
+        payload = [
+            {"name": "A", "email": "a@example.com"},
+            {"name": "A again", "email": "A@example.com"},
+            {"name": "Existing", "email": "existing@example.com"},
+            {"name": "B", "email": "b@example.com"},
+            {"name": "C", "email": "c@example.com"},
+        ]
+        response = self.client.post(url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [row["status"] for row in response.data["results"]],
+            ["accepted", "duplicate", "duplicate", "accepted", "over_capacity"],
+        )
+        self.assertEqual(response.data["accepted"], 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 3)
+        self.assertEqual(self.event.attendees.count(), 3)
+
+    def test_bulk_register_rejects_invalid_rows(self):
+        url = reverse("events:event-register-bulk", args=[self.event.id])
+        response = self.client.post(url, [{"name": "A", "email": "not-an-email"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.event.attendees.count(), 1)
+
+    def test_bulk_register_ten_thousand_attendees(self):
+        Event.objects.filter(pk=self.event.pk).update(max_capacity=20000)
+        rows = [{"name": f"User {i}", "email": f"user{i}@example.com"} for i in range(10000)]
+        statuses = RegistrationService.bulk_register(self.event.id, rows)
+        self.assertEqual(statuses.count(RegistrationService.ACCEPTED), 10000)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 10001)
+
+
+class PaginationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        start = timezone.now() + timedelta(days=1)
+        # Pairs of events share a start_time so the id tie-breaker matters
+        self.events = [
+            Event.objects.create(
+                name=f"Event {i}",
+                location="Venue",
+                start_time=start + timedelta(hours=i // 2),
+                end_time=start + timedelta(hours=i // 2 + 1),
+                max_capacity=5,
+            )
+            for i in range(7)
+        ]
+
+    def collect(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            results = response.data["results"]
+            if isinstance(results, dict):
+                results = results["events"]
+            seen.extend(row["id"] for row in results)
+            url = response.data["next"]
+        return seen
+
+    def test_event_cursor_pagination_walks_every_event_once(self):
+        url = reverse("events:event-list") + "?pagination=cursor&page_size=2&timezone=UTC"
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"]["timezone"], "UTC")
+        self.assertEqual(self.collect(url), [event.id for event in self.events])
+
+    def test_attendee_cursor_pagination(self):
+        event = self.events[0]
+        attendees = [
+            Attendee.objects.create(event=event, name=f"A{i}", email=f"a{i}@example.com") for i in range(5)
+        ]
+        url = reverse("events:event-attendees", args=[event.id]) + "?pagination=cursor&page_size=2"
+        self.assertEqual(self.collect(url), [attendee.id for attendee in attendees])
+
+    def test_page_pagination_without_count(self):
+        url = reverse("events:event-list") + "?count=false&page_size=3"
+        self.assertEqual(self.collect(url), [event.id for event in self.events])
+
+    def test_invalid_cursor_and_mode(self):
+        url = reverse("events:event-list")
+        self.assertEqual(self.client.get(url + "?cursor=garbage").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url + "?pagination=offset").status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EventListCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("events:event-list")
+        self.event = Event.objects.create(
+            name="Cached",
+            location="Venue",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=1),
+            max_capacity=5,
+        )
+
+    def test_repeat_listing_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertEqual(first.data["results"]["events"], second.data["results"]["events"])
+        self.assertIsNotNone(second.data["results"]["current_time"])
+
+    def test_cached_listing_keeps_field_order(self):
+        for response in (self.client.get(self.url), self.client.get(self.url)):
+            envelope = response.json()["results"]
+            self.assertEqual(list(envelope), ["current_time", "timezone", "events"])
+            self.assertEqual(list(envelope["events"][0]), list(EventSerializer(self.event).data))
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_event_writes_invalidate_listing(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {
+                "name": "New",
+                "location": "Venue",
+                "start_time": timezone.now() + timedelta(days=2),
+                "end_time": timezone.now() + timedelta(days=2, hours=1),
+                "max_capacity": 5,
+            }, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]["events"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("events:event-detail", args=[self.event.id]))
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"]["events"]), 1)
+
+    def test_registration_invalidates_listing(self):
+        self.event.max_capacity = 1
+        self.event.save()
+        first = self.client.get(self.url, {"has_seats": "true"})
+        self.assertEqual(len(first.data["results"]["events"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("events:event-register", args=[self.event.id]),
+                {"name": "Ann", "email": "ann@example.com"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(self.url, {"has_seats": "true"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"]["events"], [])
+
+
+class TimezoneListingTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Event.objects.create(
+            name="Global",
+            location="Online",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=1),
+            max_capacity=5,
+        )
+
+    def test_event_times_follow_requested_timezone(self):
+        url = reverse("events:event-list")
+        utc = self.client.get(url + "?timezone=UTC").data["results"]["events"][0]
+        tokyo = self.client.get(url + "?timezone=Asia/Tokyo").data["results"]["events"][0]
+        self.assertTrue(utc["start_time"].endswith("Z") or utc["start_time"].endswith("+00:00"))
+        self.assertTrue(tokyo["start_time"].endswith("+09:00"))
+        self.assertEqual(
+            datetime.fromisoformat(utc["start_time"].replace("Z", "+00:00")),
+            datetime.fromisoformat(tokyo["start_time"]),
+        )
+
+    def test_unknown_timezone_rejected_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("events:event-list") + "?timezone=Mars/Olympus")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncViewsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.event = Event.objects.create(
+            name="Async",
+            location="Cloud",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=1),
+            max_capacity=2,
+        )
+        Attendee.objects.create(event=self.event, name="A", email="a@example.com")
+
+    async def test_reads_match_sync_stack(self):
+        cases = [
+            (async_views.event_detail, "events:event-detail", "", True),
+            (async_views.attendee_list, "events:event-attendees", "", True),
+            (async_views.attendee_list, "events:event-attendees", "?pagination=cursor", True),
+            (async_views.event_list, "events:event-list", "?timezone=UTC", False),
+        ]
+        for view, name, query, takes_pk in cases:
+            args = [self.event.id] if takes_pk else []
+            url = reverse(name, args=args) + query
+            expected = await sync_to_async(self.client.get)(url)
+            await sync_to_async(cache.clear)()
+            kwargs = {"pk": self.event.id} if takes_pk else {}
+            response = await view(self.factory.get(url), **kwargs)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            actual, wanted = json.loads(response.content), expected.json()
+            if name == "events:event-list":
+                actual["results"].pop("current_time")
+                wanted["results"].pop("current_time")
+            self.assertEqual(actual, wanted)
+
+    async def test_register_and_capacity(self):
+        url = reverse("events:event-register", args=[self.event.id])
+        request = self.factory.post(url, {"name": "B", "email": "b@example.com"}, content_type="application/json")
+        response = await async_views.register_attendee(request, pk=self.event.id)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        request = self.factory.post(url, {"name": "C", "email": "c@example.com"}, content_type="application/json")
+        response = await async_views.register_attendee(request, pk=self.event.id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Event is full", json.loads(response.content)["error"])
+
+    async def test_locked_database_is_503(self):
+        url = reverse("events:event-register", args=[self.event.id])
+        request = self.factory.post(url, {"name": "B", "email": "b@example.com"}, content_type="application/json")
+        locked = OperationalError("database is locked")
+        with mock.patch.object(RegistrationService, "aregister_attendee", side_effect=locked):
+            response = await async_views.register_attendee(request, pk=self.event.id)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("Retry-After", response)
+
+    async def test_listing_cache_is_not_called_on_the_event_loop(self):
+        blocking = []
+
+        def watch(name):
+            original = getattr(LocMemCache, name)
+
+            def call(cache, *args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    blocking.append(name)
+                except RuntimeError:
+                    pass
+                return original(cache, *args, **kwargs)
+            return mock.patch.object(LocMemCache, name, call)
+
+        url = reverse("events:event-list")
+        with watch("get"), watch("set"), watch("add"):
+            for _ in range(2):
+                response = await async_views.event_list(self.factory.get(url))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(blocking, [])
+
+    async def test_missing_event_is_404(self):
+        response = await async_views.event_detail(self.factory.get("/"), pk=self.event.id + 100)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def use_async_stack(self):
+        def load_urls():
+            # The root urlconf holds resolvers built from the old events.urls
+            for module in ("events.urls", "omnify_eventora.urls"):
+                importlib.reload(importlib.import_module(module))
+            clear_url_caches()
+
+        with self.settings(EVENTS_API_STACK="async"):
+            load_urls()
+        self.addCleanup(load_urls)
+
+    def test_writes_pass_csrf_checks(self):
+        self.use_async_stack()
+        client = APIClient(enforce_csrf_checks=True)
+        start = timezone.now() + timedelta(days=3)
+        data = {"name": "Launch", "location": "Online", "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(), "max_capacity": 10}
+
+        response = client.post(reverse("events:event-list"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        url = reverse("events:event-detail", args=[Event.objects.get(name="Launch").id])
+        response = client.put(url, {**data, "name": "Relaunch"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Event.objects.filter(name__in=["Launch", "Relaunch"]).exists())
+
+
+class SQLiteBackendTestCase(SimpleTestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        from omnify_eventora.sqlite_backend.base import DatabaseWrapper
+
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper({
+                **connection.settings_dict,
+                "NAME": os.path.join(directory, "pragmas.sqlite3"),
+                "OPTIONS": {"pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"}},
+            })
+            try:
+                with wrapper.cursor() as cursor:
+                    self.assertEqual(cursor.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                    self.assertEqual(cursor.execute("PRAGMA synchronous").fetchone()[0], 1)
+            finally:
+                wrapper.close()
+
+
+class EventSearchTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        start = timezone.now() + timedelta(days=1)
+        self.jazz = Event.objects.create(
+            name="Jazz Night", location="Kochi", start_time=start,
+            end_time=start + timedelta(hours=2), max_capacity=1,
+        )
+        self.rock = Event.objects.create(
+            name="Rock Festival", location="Kochi", start_time=start + timedelta(days=5),
+            end_time=start + timedelta(days=5, hours=2), max_capacity=10,
+        )
+        self.expo = Event.objects.create(
+            name="Tech Expo", location="Bengaluru", start_time=start + timedelta(days=2),
+            end_time=start + timedelta(days=2, hours=2), max_capacity=10,
+        )
+        Attendee.objects.create(event=self.jazz, name="A", email="a@example.com")
+
+    def ids(self, query):
+        response = self.client.get(reverse("events:event-list") + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event["id"] for event in response.data["results"]["events"]]
+
+    def test_filters(self):
+        self.assertEqual(self.ids("?location=Kochi"), [self.jazz.id, self.rock.id])
+        window = urlencode({
+            "starts_after": (self.jazz.start_time + timedelta(hours=1)).isoformat(),
+            "starts_before": self.rock.start_time.isoformat(),
+        })
+        self.assertEqual(self.ids(f"?{window}"), [self.expo.id])
+        self.assertEqual(self.ids("?has_seats=true"), [self.expo.id, self.rock.id])
+        self.assertEqual(self.ids("?has_seats=false"), [self.jazz.id])
+
+    def test_text_search_follows_edits(self):
+        self.assertEqual(self.ids("?q=fest"), [self.rock.id])
+        self.assertEqual(self.ids("?q=kochi%20jazz"), [self.jazz.id])
+
+        Event.objects.filter(pk=self.rock.pk).update(name="Metal Gig")
+        self.expo.delete()
+        cache.clear()
+        self.assertEqual(self.ids("?q=fest"), [])
+        self.assertEqual(self.ids("?q=metal"), [self.rock.id])
+        self.assertEqual(self.ids("?q=expo"), [])
+
+    def test_invalid_filter_values(self):
+        url = reverse("events:event-list")
+        self.assertEqual(self.client.get(url + "?starts_after=tomorrow").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url + "?has_seats=maybe").status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class WaitlistTestCase(APITestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Sold Out",
+            location="Club",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=1,
+            waitlist_enabled=True,
+        )
+        self.register_url = reverse("events:event-register", args=[self.event.id])
+        self.client.post(self.register_url, {"name": "First", "email": "first@example.com"}, format="json")
+
+    def join(self, email):
+        return self.client.post(self.register_url, {"name": email, "email": email}, format="json")
+
+    def test_full_event_queues_with_position(self):
+        response = self.join("w1@example.com")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["position"], 1)
+        self.assertEqual(self.join("w2@example.com").data["position"], 2)
+        self.assertEqual(self.join("w2@example.com").status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse("events:event-waitlist", args=[self.event.id])
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"email": "w2@example.com"})
+        self.assertEqual(response.data["position"], 2)
+
+    def test_registered_email_is_not_queued(self):
+        response = self.join("first@example.com")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already registered", response.data["error"])
+        self.assertFalse(self.event.waitlist.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.waitlist_tail, 0)
+
+    def test_seat_freed_while_joining_registers(self):
+        def full_then_freed(event_id, data):
+            # The seat frees up after the capacity check; the delete's own
+            # promotion only runs on commit
+            Attendee.objects.filter(email="first@example.com").delete()
+            raise EventFull()
+
+        with mock.patch.object(RegistrationService, "register_attendee", side_effect=full_then_freed):
+            response = self.join("w1@example.com")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["email"], "w1@example.com")
+        attendee = Attendee.objects.get(event=self.event, email="w1@example.com")
+        self.assertEqual(response.data["checkin_token"], attendee.checkin_token)
+        self.assertFalse(self.event.waitlist.exists())
+
+    def test_deleting_attendee_promotes_head(self):
+        self.join("w1@example.com")
+        self.join("w2@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendee.objects.get(email="first@example.com").delete()
+
+        self.assertTrue(Attendee.objects.filter(event=self.event, email="w1@example.com").exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertEqual(self.event.waitlist_length, 1)
+        self.assertEqual(WaitlistService.get_position(self.event.id, "w2@example.com"), 1)
+
+    def test_raising_capacity_promotes_in_order(self):
+        for n in range(3):
+            self.join(f"w{n}@example.com")
+        response = self.client.patch(
+            reverse("events:event-detail", args=[self.event.id]),
+            {
+                "name": self.event.name, "location": self.event.location,
+                "start_time": self.event.start_time, "end_time": self.event.end_time,
+                "max_capacity": 3,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(self.event.attendees.values_list("email", flat=True)),
+            ["first@example.com", "w0@example.com", "w1@example.com"],
+        )
+        self.assertEqual(WaitlistService.get_position(self.event.id, "w2@example.com"), 1)
+
+    def test_without_waitlist_full_event_rejects(self):
+        Event.objects.filter(pk=self.event.pk).update(waitlist_enabled=False)
+        response = self.join("w1@example.com")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Event is full", response.data["error"])
+
+
+class AttendeeExportTestCase(APITestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Check-in Day",
+            location="Hall",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=10,
+        )
+        Attendee.objects.create(event=self.event, name="Ann, Jr.", email="ann@example.com")
+        Attendee.objects.create(event=self.event, name="Bob", email="bob@example.com")
+        self.url = reverse("events:event-attendees-export", args=[self.event.id])
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export_matches_api_fields(self):
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.reader(StringIO(self.content(response))))
+        listed = self.client.get(reverse("events:event-attendees", args=[self.event.id])).data["results"]
+        self.assertEqual(rows[0], ["id", "name", "email", "registered_at"])
+        self.assertEqual(rows[1:], [[str(a["id"]), a["name"], a["email"], a["registered_at"]] for a in listed])
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([line["email"] for line in lines], ["ann@example.com", "bob@example.com"])
+
+    def test_bad_format_and_missing_event(self):
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, status.HTTP_400_BAD_REQUEST)
+        missing = reverse("events:event-attendees-export", args=[self.event.id + 100])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RequestMetricsTestCase(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.event = Event.objects.create(
+            name="Metrics Meetup",
+            location="Hall",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=10,
+        )
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse("events:event-detail", args=[self.event.id]))
+        self.client.get(reverse("events:event-detail", args=[self.event.id + 100]))
+        body = self.client.get(reverse("events:metrics")).content.decode()
+        labels = 'view="events:event-detail",method="GET"'
+        self.assertIn(f'eventora_http_requests_total{{{labels},status="200"}} 1', body)
+        self.assertIn(f'eventora_http_requests_total{{{labels},status="404"}} 1', body)
+        self.assertIn(f'eventora_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f'eventora_http_request_duration_seconds_count{{{labels}}} 2', body)
+
+    def test_query_count_is_recorded(self):
+        url = reverse("events:event-detail", args=[self.event.id])
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        body = registry.render()
+        self.assertIn('eventora_db_queries_total{view="events:event-detail",method="GET"} 1', body)
+
+    async def test_async_requests_count_queries(self):
+        # Under ASGI the middleware runs on the event loop and the queries on a worker thread
+        await self.async_client.get(reverse("events:event-detail", args=[self.event.id]))
+        self.assertIn('eventora_db_queries_total{view="events:event-detail",method="GET"} 1', registry.render())
+
+    def test_unmatched_paths_share_one_series(self):
+        self.client.get("/no/such/path/")
+        self.assertIn('view="unmatched",method="GET",status="404"', registry.render())
+
+    def test_json_request_log(self):
+        with self.settings(METRICS_LOG_REQUESTS=True), self.assertLogs("events.requests") as logs:
+            # Middleware reads the setting at load time, so use a fresh client
+            APIClient().get(reverse("events:event-detail", args=[self.event.id]))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line["view"], line["status"], line["db_queries"]), ("events:event-detail", 200, 1))
+
+
+class SeedDemoTestCase(TestCase):
+    def seed(self, **options):
+        call_command("seed_demo", stdout=StringIO(), **options)
+
+    def test_seeds_events_with_counted_attendees(self):
+        self.seed(events=3, attendees_per_event=4, seed=1)
+        self.assertEqual(Event.objects.count(), 3)
+        self.assertEqual(Attendee.objects.count(), 12)
+        self.assertEqual(set(Event.objects.values_list("attendee_count", flat=True)), {4})
+        self.assertFalse(Event.objects.with_stale_attendee_count().exists())
+
+    def test_same_seed_gives_same_data(self):
+        self.assertEqual(generate_chunk(5, 0, 10, 3), generate_chunk(5, 0, 10, 3))
+        self.assertNotEqual(generate_chunk(5, 0, 10, 3), generate_chunk(6, 0, 10, 3))
+
+    def test_reseeding_adds_on_top(self):
+        self.seed(events=2, attendees_per_event=1, seed=1)
+        self.seed(events=2, attendees_per_event=1, seed=1)
+        self.assertEqual(Event.objects.count(), 4)
+
+    def test_drop_indexes_restores_indexes_and_search(self):
+        def indexes():
+            with connection.cursor() as cursor:
+                return {
+                    name
+                    for model in (Event, Attendee)
+                    for name, info in connection.introspection.get_constraints(cursor, model._meta.db_table).items()
+                    if info["index"]
+                }
+
+        before = indexes()
+        self.seed(events=3, attendees_per_event=2, drop_indexes=True)
+        self.assertEqual(indexes(), before)
+        name = Event.objects.first().name.split()[0]
+        self.assertTrue(Event.objects.search(name).exists())
+
+
+class IdempotencyTestCase(APITestCase):
+    def setUp(self):
+        for store in caches.all():
+            store.clear()
+        self.event = Event.objects.create(
+            name="Retry Conf",
+            location="Hall",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=5,
+        )
+        self.url = reverse("events:event-register", args=[self.event.id])
+
+    def register(self, key, email="ann@example.com"):
+        return self.client.post(
+            self.url, {"name": "Ann", "email": email}, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.register("key-1")
+        retry = self.register("key-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((retry.status_code, retry.content), (first.status_code, first.content))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(self.event.attendees.count(), 1)
+
+    def test_records_survive_listing_cache_churn(self):
+        first = self.register("key-1")
+        # More listing pages than the default cache holds
+        for n in range(1000):
+            cache.set(f"listing-{n}", n)
+        retry = self.register("key-1")
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, first.content)
+
+    def test_key_reused_with_other_body(self):
+        self.register("key-1")
+        response = self.register("key-1", email="bob@example.com")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self.client.post(self.url, {"name": "Ann", "email": "ann@example.com"}, format="json")
+        response = self.client.post(self.url, {"name": "Ann", "email": "ann@example.com"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_event_create_replay(self):
+        data = {
+            "name": "Once", "location": "Hall",
+            "start_time": (timezone.now() + timedelta(days=2)).isoformat(),
+            "end_time": (timezone.now() + timedelta(days=2, hours=1)).isoformat(),
+            "max_capacity": 10,
+        }
+        url = reverse("events:event-list")
+        for _ in range(2):
+            response = self.client.post(url, data, format="json", HTTP_IDEMPOTENCY_KEY="create-1")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Event.objects.filter(name="Once").count(), 1)
+
+    def test_throttled_response_is_not_replayed(self):
+        with self.settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"register": "1/min"}}):
+            self.register("key-0", email="first@example.com")
+            self.assertEqual(self.register("key-1").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # The bucket has refilled by the time the client retries
+        with self.settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {}}):
+            response = self.register("key-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_locked_database_is_retryable(self):
+        locked = OperationalError("database is locked")
+        with mock.patch.object(RegistrationService, "register_attendee", side_effect=locked):
+            response = self.register("key-1")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("Retry-After", response)
+
+        response = self.register("key-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+        with mock.patch.object(RegistrationService, "bulk_register", side_effect=locked):
+            response = self.client.post(
+                reverse("events:event-register-bulk", args=[self.event.id]),
+                [{"name": "Bob", "email": "bob@example.com"}],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_concurrent_retry_waits_for_first_request(self):
+        self.register("key-1")
+        cache_key = idempotency_cache_key(self.url, "key-1")
+        store = caches["idempotency"]
+        done = store.get(cache_key)
+        store.set(cache_key, ("pending", done[1]))
+
+        with self.settings(IDEMPOTENCY={"ALIAS": "idempotency", "WAIT": 0.2}):
+            self.assertEqual(self.register("key-1").status_code, status.HTTP_409_CONFLICT)
+            # The first request finishes while the retry is waiting
+            threading.Timer(0.05, store.set, args=(cache_key, done)).start()
+            response = self.register("key-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+
+    async def test_async_view_replay(self):
+        view = idempotent(async_views.register_attendee)
+        factory = AsyncRequestFactory()
+        responses = []
+        for _ in range(2):
+            request = factory.post(
+                self.url, {"name": "Ann", "email": "ann@example.com"},
+                content_type="application/json", headers={"Idempotency-Key": "async-1"},
+            )
+            responses.append(await view(request, pk=self.event.id))
+        self.assertEqual(responses[0].status_code, status.HTTP_201_CREATED)
+        self.assertEqual(responses[1].content, responses[0].content)
+        self.assertEqual(await self.event.attendees.acount(), 1)
+
+
+@override_settings(REGISTRATION_QUEUE={"ENABLED": True, "WORKER": "command"})
+class QueuedRegistrationTestCase(APITestCase):
+    def setUp(self):
+        reset_queue()
+        self.addCleanup(reset_queue)
+        self.event = Event.objects.create(
+            name="Flash Sale",
+            location="Arena",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=2,
+        )
+
+    def register(self, email, event_id=None):
+        url = reverse("events:event-register", args=[event_id or self.event.id])
+        return self.client.post(url, {"name": "Fan", "email": email}, format="json")
+
+    def ticket(self, response):
+        return self.client.get(response["Location"]).data
+
+    def test_registration_is_accepted_later(self):
+        response = self.register("a@example.com")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.ticket(response)["status"], "queued")
+        self.assertFalse(self.event.attendees.exists())
+
+        self.assertEqual(drain(), 1)
+        self.assertEqual(self.ticket(response)["status"], "accepted")
+        self.assertEqual(list(self.event.attendees.values_list("email", flat=True)), ["a@example.com"])
+
+    def test_capacity_is_enforced_per_batch(self):
+        responses = [self.register(email) for email in ("a@example.com", "a@example.com", "b@example.com", "c@example.com")]
+        drain()
+        self.assertEqual(
+            [self.ticket(response)["status"] for response in responses],
+            ["accepted", "duplicate", "accepted", "over_capacity"],
+        )
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.attendee_count, self.event.attendees.count()), (2, 2))
+
+    def test_overflow_joins_waitlist(self):
+        Event.objects.filter(pk=self.event.pk).update(waitlist_enabled=True)
+        responses = [self.register(f"{n}@example.com") for n in range(3)]
+        drain()
+        self.assertEqual(self.ticket(responses[2]), {
+            "ticket": responses[2].data["ticket"], "status": "waitlisted",
+            "event": self.event.id, "email": "2@example.com", "position": 1,
+        })
+
+    def test_unknown_event_and_ticket(self):
+        self.assertEqual(self.register("a@example.com", event_id=self.event.id + 100).status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse("events:registration-ticket", args=["nope"])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sqlite_backend_with_worker_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "queue.sqlite3")
+            config = {"ENABLED": True, "WORKER": "command", "BACKEND": "events.queueing.SQLiteQueue",
+                      "OPTIONS": {"path": path}}
+            with self.settings(REGISTRATION_QUEUE=config):
+                reset_queue()
+                responses = [self.register(f"{n}@example.com") for n in range(3)]
+                call_command("process_registration_queue", once=True, stdout=StringIO())
+                statuses = [self.ticket(response)["status"] for response in responses]
+                reset_queue()
+        self.assertEqual(statuses, ["accepted", "accepted", "over_capacity"])
+
+
+class EventOccupancyTestCase(APITestCase):
+    def setUp(self):
+        self.events = [
+            Event.objects.create(
+                name=f"Dashboard {n}",
+                location="Hall",
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                max_capacity=3,
+            )
+            for n in range(3)
+        ]
+        Attendee.objects.create(event=self.events[0], name="Ann", email="ann@example.com")
+        occupancy_index.warm()
+        self.url = reverse("events:event-occupancy")
+
+    def occupancy(self, ids):
+        return self.client.get(self.url, {"ids": ",".join(map(str, ids))})
+
+    def test_occupancy_for_many_events_from_index(self):
+        ids = [event.id for event in self.events] + [999]
+        with self.assertNumQueries(1):
+            # Only the unknown id goes to the database
+            response = self.occupancy(ids)
+        self.assertEqual(response.data["results"][0], {
+            "id": self.events[0].id, "max_capacity": 3, "attendee_count": 1, "seats_left": 2,
+        })
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertEqual(response.data["missing"], [999])
+
+    def test_registration_and_deletion_update_index(self):
+        event = self.events[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            RegistrationService.register_attendee(event.id, {"name": "Bob", "email": "bob@example.com"})
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendee.objects.bulk_create([Attendee(event=event, name="Cy", email="cy@example.com")])
+        with self.assertNumQueries(0):
+            self.assertEqual(occupancy_index.get_many([event.id]), {event.id: (3, 2)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.attendees.get(email="bob@example.com").delete()
+        self.assertEqual(occupancy_index.get_many([event.id]), {event.id: (3, 1)})
+
+    def test_capacity_change_and_stale_entries_reload(self):
+        event = self.events[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            event.max_capacity = 10
+            event.save()
+        self.assertEqual(occupancy_index.get_many([event.id]), {event.id: (10, 0)})
+
+        # A write from another process, seen once the entry is older than MAX_AGE
+        Event.objects.filter(pk=event.pk).update(attendee_count=4)
+        self.assertEqual(occupancy_index.get_many([event.id]), {event.id: (10, 0)})
+        with self.settings(OCCUPANCY_INDEX={"MAX_AGE": 0}), self.assertNumQueries(1):
+            self.assertEqual(occupancy_index.get_many([event.id]), {event.id: (10, 4)})
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"ids": "1,x"}).status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = self.occupancy(range(1, 502))
+        self.assertEqual(too_many.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ThrottlingTestCase(APITestCase):
+    def setUp(self):
+        for store in caches.all():
+            store.clear()
+        self.addCleanup(self.reset_write_load)
+        self.event = Event.objects.create(
+            name="Popular",
+            location="Stadium",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=100,
+        )
+        self.url = reverse("events:event-register", args=[self.event.id])
+
+    @staticmethod
+    def reset_write_load():
+        write_load.in_flight, write_load.latency, write_load.updated_at = 0, 0.0, 0.0
+
+    def rates(self, **rates):
+        return self.settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": rates})
+
+    def register(self, n, client_ip="10.0.0.1"):
+        return self.client.post(
+            self.url, {"name": "Fan", "email": f"fan{n}@example.com"}, format="json", REMOTE_ADDR=client_ip
+        )
+
+    def test_client_bucket(self):
+        with self.rates(register="2/min"):
+            self.assertEqual([self.register(n).status_code for n in range(3)], [201, 201, 429])
+            self.assertEqual(self.register(3)["Retry-After"], "30")
+            self.assertEqual(self.register(4, client_ip="10.0.0.2").status_code, status.HTTP_201_CREATED)
+
+    def test_event_bucket_is_shared_by_clients(self):
+        with self.rates(register_event="3/sec"):
+            codes = [self.register(n, client_ip=f"10.0.0.{n}").status_code for n in range(4)]
+        self.assertEqual(codes, [201, 201, 201, 429])
+
+    def test_reads_are_not_throttled(self):
+        with self.rates(event_create="1/min"):
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse("events:event-list")).status_code, status.HTTP_200_OK)
+
+    def test_token_bucket_refills(self):
+        throttle = RegisterClientThrottle()
+        request = SimpleNamespace(method="POST", META={"REMOTE_ADDR": "10.0.0.9"})
+        with self.rates(register="1/sec"):
+            self.assertTrue(throttle.allow_request(request, None))
+            self.assertFalse(throttle.allow_request(request, None))
+            caches["throttle"].set("throttle:register:10.0.0.9", (0.0, time.time() - 1))
+            self.assertTrue(throttle.allow_request(request, None))
+
+    def test_sheds_writes_when_database_is_busy(self):
+        with self.settings(LOAD_SHEDDING={"MAX_WRITES_IN_FLIGHT": 0, "RETRY_AFTER": 2}):
+            response = self.register(1)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "2")
+
+        write_load.latency, write_load.updated_at = 5.0, time.monotonic()
+        self.assertEqual(self.register(2).status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        # The latency signal expires once no writes have been seen for a while
+        write_load.updated_at -= 10
+        self.assertEqual(self.register(3).status_code, status.HTTP_201_CREATED)
+
+    async def test_async_view_is_throttled(self):
+        factory = AsyncRequestFactory()
+        codes = []
+        with self.rates(register="1/min"):
+            for n in range(2):
+                request = factory.post(self.url, {"name": "Fan", "email": f"a{n}@example.com"}, content_type="application/json")
+                response = await async_views.register_attendee(request, pk=self.event.id)
+                codes.append((response.status_code, response.get("Retry-After")))
+        self.assertEqual(codes, [(201, None), (429, "60")])
+
+
+class ValuesListSerializerTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        start = timezone.now().replace(microsecond=0) + timedelta(days=2)
+        self.full = Event.objects.create(
+            name="Späti Night", location="Berlin", start_time=start, end_time=start + timedelta(hours=3),
+            max_capacity=1, waitlist_enabled=True,
+        )
+        self.open = Event.objects.create(
+            name="Quiz", location="Pub", start_time=start + timedelta(microseconds=123456),
+            end_time=start + timedelta(hours=1), max_capacity=50,
+        )
+        RegistrationService.register_attendee(self.full.id, {"name": "Ann", "email": "ann@example.com"})
+        WaitlistService.join(self.full.id, {"name": "Bob", "email": "bob@example.com"})
+        RegistrationService.register_attendee(self.open.id, {"name": "Zoë", "email": "zoe@example.com"})
+        RegistrationService.register_attendee(self.open.id, {"name": "Yan", "email": "yan@example.com"})
+
+    def assertSameJSON(self, fast, slow):
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(slow))
+
+    def test_event_rows_render_like_event_serializer(self):
+        queryset = Event.objects.order_by('id')
+        for tz in ('UTC', 'Asia/Kolkata', 'America/St_Johns'):
+            with timezone.override(tz):
+                self.assertSameJSON(
+                    EventListSerializer(queryset.values(*EventListSerializer.columns())).data,
+                    EventSerializer(queryset, many=True).data,
+                )
+
+    def test_attendee_rows_render_like_attendee_serializer(self):
+        queryset = Attendee.objects.order_by('id')
+        self.assertSameJSON(
+            AttendeeListSerializer(queryset.values(*AttendeeListSerializer.columns())).data,
+            AttendeeSerializer(queryset, many=True).data,
+        )
+
+    def test_listings_use_rows(self):
+        response = self.client.get(reverse("events:event-list"), {"timezone": "America/New_York"})
+        with timezone.override("America/New_York"):
+            expected = EventSerializer(Event.objects.order_by("start_time"), many=True).data
+        # Cached listings are stored with sorted keys, so compare as data
+        self.assertEqual(json.loads(response.content)["results"]["events"], json.loads(JSONRenderer().render(expected)))
+
+        url = reverse("events:event-attendees", args=[self.open.id])
+        first = self.client.get(url, {"pagination": "cursor", "page_size": 1})
+        second = self.client.get(first.data["next"])
+        self.assertSameJSON(
+            first.data["results"] + second.data["results"],
+            AttendeeSerializer(self.open.attendees.order_by("registered_at", "id"), many=True).data,
+        )
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            name="Poll Night",
+            location="Hall",
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            max_capacity=1,
+            waitlist_enabled=True,
+        )
+        self.detail_url = reverse("events:event-detail", args=[self.event.id])
+        self.attendees_url = reverse("events:event-attendees", args=[self.event.id])
+
+    def etags(self):
+        return [self.client.get(url)["ETag"] for url in (self.detail_url, self.attendees_url)]
+
+    def test_unchanged_event_answers_304_with_one_query(self):
+        for url in (self.detail_url, self.attendees_url):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response["ETag"], first["ETag"])
+
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2024 00:00:00 GMT")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # If-None-Match wins over a matching If-Modified-Since
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH='"stale"', HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_writes_change_the_etag(self):
+        seen = [self.etags()]
+        RegistrationService.register_attendee(self.event.id, {"name": "Ann", "email": "ann@example.com"})
+        seen.append(self.etags())
+        WaitlistService.join(self.event.id, {"name": "Bob", "email": "bob@example.com"})
+        seen.append(self.etags())
+        # Deleting Ann promotes Bob from the waitlist
+        Attendee.objects.get(email="ann@example.com").delete()
+        seen.append(self.etags())
+        self.client.put(self.detail_url, {
+            "name": self.event.name,
+            "location": self.event.location,
+            "start_time": self.event.start_time.isoformat(),
+            "end_time": self.event.end_time.isoformat(),
+            "max_capacity": 5,
+        }, format="json")
+        seen.append(self.etags())
+        RegistrationService.bulk_register(self.event.id, [{"name": "Cy", "email": "cy@example.com"}])
+        seen.append(self.etags())
+        self.assertEqual(len({tag for tags in seen for tag in tags}), len(seen))
+
+        response = self.client.get(self.attendees_url, HTTP_IF_NONE_MATCH=seen[0][1])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_stale_instance_save_does_not_reuse_a_version(self):
+        stale = Event.objects.get(pk=self.event.id)
+        RegistrationService.register_attendee(self.event.id, {"name": "Ann", "email": "ann@example.com"})
+        stale.name = "Renamed"
+        stale.save()
+        self.assertEqual(stale.version, 2)
+        self.assertEqual(Event.objects.get(pk=self.event.id).version, 2)
+
+    def test_missing_event(self):
+        response = self.client.get(reverse("events:event-attendees", args=[999]), HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_views(self):
+        factory = AsyncRequestFactory()
+        for view, url in ((async_views.event_detail, self.detail_url), (async_views.attendee_list, self.attendees_url)):
+            response = await view(factory.get(url), pk=self.event.id)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = await view(factory.get(url, headers={"If-None-Match": response["ETag"]}), pk=self.event.id)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class AdminTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "admin"))
+        start = timezone.now() + timedelta(days=3)
+        self.event = Event.objects.create(
+            name="Mega Conf", location="Expo", start_time=start, end_time=start + timedelta(hours=8), max_capacity=100,
+        )
+        Attendee.objects.bulk_create(
+            Attendee(event=self.event, name=f"Guest {n}", email=f"guest{n}@example.com") for n in range(30)
+        )
+        self.change_url = reverse("admin:events_event_change", args=[self.event.id])
+
+    def test_event_page_shows_latest_attendees_and_links_the_rest(self):
+        response = self.client.get(self.change_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().count("@example.com</"), AttendeeInline.max_rows)
+        self.assertContains(response, f"?event__id__exact={self.event.id}")
+        self.assertContains(response, "View all 30 attendees")
+
+        response = self.client.get(reverse("admin:events_attendee_changelist"), {"event__id__exact": self.event.id})
+        self.assertContains(response, "30 attendees")
+
+    def test_saving_event_with_partial_inline(self):
+        recent = Attendee.objects.filter(event=self.event).order_by("-registered_at", "-id")[:AttendeeInline.max_rows]
+        data = {
+            "name": "Mega Conf 2",
+            "location": "Expo",
+            "start_time_0": self.event.start_time.strftime("%Y-%m-%d"),
+            "start_time_1": self.event.start_time.strftime("%H:%M:%S"),
+            "end_time_0": self.event.end_time.strftime("%Y-%m-%d"),
+            "end_time_1": self.event.end_time.strftime("%H:%M:%S"),
+            "max_capacity": 100,
+            "attendees-TOTAL_FORMS": len(recent),
+            "attendees-INITIAL_FORMS": len(recent),
+            "attendees-MIN_NUM_FORMS": 0,
+            "attendees-MAX_NUM_FORMS": 1000,
+        }
+        for n, attendee in enumerate(recent):
+            data[f"attendees-{n}-id"] = attendee.id
+            data[f"attendees-{n}-event"] = self.event.id
+        response = self.client.post(self.change_url, data)
+        self.assertEqual(response.status_code, 302, getattr(response, "context_data", {}).get("errors"))
+        self.assertEqual(Event.objects.get(pk=self.event.id).name, "Mega Conf 2")
+        self.assertEqual(Attendee.objects.filter(event=self.event).count(), 30)
+
+    def test_unfiltered_attendee_count_is_estimated(self):
+        Attendee.objects.filter(email__in=["guest0@example.com", "guest1@example.com"]).delete()
+        # Deleting the newest rows, as archiving does, must not leave the count high
+        old = Event.objects.create(
+            name="Old Conf", location="Expo", start_time=self.event.start_time, end_time=self.event.end_time,
+            max_capacity=100,
+        )
+        Attendee.objects.bulk_create(
+            Attendee(event=old, name=f"Guest {n}", email=f"guest{n}@example.com") for n in range(50)
+        )
+        old.delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Attendee.objects.all(), 10).count, 28)
+        self.assertEqual(EstimatedCountPaginator(Attendee.objects.filter(event=self.event), 10).count, 28)
+
+    def test_search_by_email_is_exact(self):
+        response = self.client.get(reverse("admin:events_attendee_changelist"), {"q": "Guest7@Example.com"})
+        self.assertEqual([a.email for a in response.context["cl"].result_list], ["guest7@example.com"])
+
+    def test_event_autocomplete_uses_search_index(self):
+        response = self.client.get(reverse("admin:autocomplete"), {
+            "app_label": "events", "model_name": "attendee", "field_name": "event", "term": "mega",
+        })
+        self.assertEqual([result["id"] for result in response.json()["results"]], [str(self.event.id)])
+
+
+class VenueConflictTestCase(APITestCase):
+    def setUp(self):
+        self.start = (timezone.now() + timedelta(days=5)).replace(microsecond=0)
+        self.booked = Event.objects.create(
+            name="Gala", location="Main Hall", start_time=self.start, end_time=self.start + timedelta(hours=3),
+            max_capacity=10,
+        )
+
+    def payload(self, name, offset_hours, hours=2, location="Main Hall"):
+        start = self.start + timedelta(hours=offset_hours)
+        return {
+            "name": name,
+            "location": location,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=hours)).isoformat(),
+            "max_capacity": 10,
+        }
+
+    def test_create_rejects_overlap(self):
+        url = reverse("events:event-list")
+        response = self.client.post(url, self.payload("Clash", 2), format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["conflicts"], [self.booked.id])
+        self.assertFalse(Event.objects.filter(name="Clash").exists())
+
+        # Back to back and elsewhere are fine
+        self.assertEqual(self.client.post(url, self.payload("After", 3), format="json").status_code, 201)
+        self.assertEqual(
+            self.client.post(url, self.payload("Other", 1, location="Annex"), format="json").status_code, 201
+        )
+
+    def test_update_rejects_overlap(self):
+        other = EventService.create_event({
+            "name": "Late", "location": "Main Hall", "start_time": self.start + timedelta(hours=4),
+            "end_time": self.start + timedelta(hours=6), "max_capacity": 10,
+        })
+        url = reverse("events:event-detail", args=[other.id])
+        response = self.client.put(url, self.payload("Late", 2), format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        other.refresh_from_db()
+        self.assertEqual(other.start_time, self.start + timedelta(hours=4))
+
+        # Its own slot does not conflict with itself
+        self.assertEqual(self.client.put(url, self.payload("Later", 4), format="json").status_code, 200)
+
+    def test_update_keeping_the_slot_skips_the_check(self):
+        # Overlapping events from before the check existed
+        clash = Event.objects.create(
+            name="Clash", location="Main Hall", start_time=self.start + timedelta(hours=1),
+            end_time=self.start + timedelta(hours=3), max_capacity=10,
+        )
+        url = reverse("events:event-detail", args=[clash.id])
+        response = self.client.put(url, {**self.payload("Clash", 1), "max_capacity": 20}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        clash.refresh_from_db()
+        self.assertEqual(clash.max_capacity, 20)
+
+        # Moving it is still checked
+        response = self.client.put(url, {**self.payload("Clash", 2), "max_capacity": 20}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_conflicts_endpoint(self):
+        url = reverse("events:event-conflicts")
+        window = {"location": "Main Hall", "start": (self.start + timedelta(hours=1)).isoformat(),
+                  "end": (self.start + timedelta(hours=5)).isoformat()}
+        response = self.client.get(url, window)
+        self.assertEqual([event["id"] for event in response.data["conflicts"]], [self.booked.id])
+        response = self.client.get(url, {**window, "location": "Annex"})
+        self.assertEqual(response.data["conflicts"], [])
+
+        self.assertEqual(self.client.get(url, {**window, "location": ""}).status_code, 400)
+        self.assertEqual(self.client.get(url, {**window, "end": window["start"]}).status_code, 400)
+        self.assertEqual(self.client.get(url, {**window, "start": "soon"}).status_code, 400)
+
+    def test_check_seeks_the_venue_index(self):
+        plan = EventService.find_conflicts("Main Hall", self.start, self.start + timedelta(hours=1)).explain()
+        self.assertIn("(location=? AND end_time>?)", plan)
+
+
+class AttendeeRegistrationsTestCase(APITestCase):
+    def setUp(self):
+        start = timezone.now() + timedelta(days=7)
+        self.events = [
+            Event.objects.create(
+                name=f"Workshop {n}", location=f"Room {n}", start_time=start + timedelta(days=n),
+                end_time=start + timedelta(days=n, hours=2), max_capacity=10,
+            )
+            for n in range(3)
+        ]
+        for event in self.events:
+            RegistrationService.register_attendee(event.id, {"name": "Ada", "email": "ada@example.com"})
+        RegistrationService.register_attendee(self.events[1].id, {"name": "Bo", "email": "bo@example.com"})
+        RegistrationService.register_attendee(self.events[2].id, {"name": "Cy", "email": "cy@example.com"})
+        self.url = reverse("events:attendee-registrations")
+
+    def test_one_email_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"email": " ADA@example.com "})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([row["event"]["id"] for row in results], [event.id for event in self.events])
+        self.assertEqual(results[0]["event"]["name"], "Workshop 0")
+        self.assertIsNone(response.data["next"])
+
+    def test_renders_like_model_serializer(self):
+        queryset = RegistrationService.get_registrations_for_emails(["ada@example.com", "bo@example.com"])
+        rows = queryset.values(*AttendeeRegistrationListSerializer.columns())
+        self.assertEqual(
+            JSONRenderer().render(AttendeeRegistrationListSerializer(rows).data),
+            JSONRenderer().render(AttendeeRegistrationSerializer(queryset, many=True).data),
+        )
+
+    def test_many_emails_with_cursor(self):
+        seen, url, params = [], self.url, {"email": ["bo@example.com,cy@example.com", "ada@example.com"], "page_size": 2}
+        while url:
+            response = self.client.get(url, params)
+            seen += [(row["email"], row["event"]["id"]) for row in response.data["results"]]
+            url, params = response.data["next"], None
+        self.assertEqual(seen, [
+            *(("ada@example.com", event.id) for event in self.events),
+            ("bo@example.com", self.events[1].id),
+            ("cy@example.com", self.events[2].id),
+        ])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = ",".join(f"p{n}@example.com" for n in range(501))
+        self.assertEqual(self.client.get(self.url, {"email": too_many}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lookup_uses_email_index(self):
+        plan = RegistrationService.get_registrations_for_emails(["ada@example.com"]).explain()
+        self.assertIn("events_atte_email_89656c_idx (email=?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class CheckinTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        start = timezone.now() + timedelta(hours=1)
+        self.event = Event.objects.create(
+            name="Festival", location="Park", start_time=start, end_time=start + timedelta(hours=8), max_capacity=100,
+        )
+        self.other = Event.objects.create(
+            name="Afterparty", location="Club", start_time=start, end_time=start + timedelta(hours=8), max_capacity=100,
+        )
+        self.url = reverse("events:event-checkin", args=[self.event.id])
+        self.batch_url = reverse("events:event-checkin-batch", args=[self.event.id])
+
+    def register(self, email, event=None):
+        response = self.client.post(
+            reverse("events:event-register", args=[(event or self.event).id]), {"name": "Guest", "email": email},
+            format="json",
+        )
+        return response.data["checkin_token"]
+
+    def test_registration_issues_token(self):
+        token = self.register("ann@example.com")
+        self.assertRegex(token, r"^[0-9a-f]{16}$")
+        self.assertEqual(Attendee.objects.get(email="ann@example.com").checkin_token, token)
+        self.assertNotIn("checkin_token", self.client.get(
+            reverse("events:event-attendees", args=[self.event.id])
+        ).data["results"][0])
+
+        response = self.client.post(reverse("events:event-register-bulk", args=[self.event.id]), [
+            {"name": "Bo", "email": "bo@example.com"}, {"name": "Ann", "email": "ann@example.com"},
+        ], format="json")
+        self.assertEqual(response.data["results"][0]["checkin_token"], Attendee.objects.get(email="bo@example.com").checkin_token)
+        self.assertNotIn("checkin_token", response.data["results"][1])
+
+        result = process_batch([("t1", {"event_id": self.event.id, "name": "Cy", "email": "cy@example.com"})])["t1"]
+        self.assertEqual(result["checkin_token"], Attendee.objects.get(email="cy@example.com").checkin_token)
+
+    def test_check_in_once(self):
+        token = self.register("ann@example.com")
+        with self.assertNumQueries(2):
+            response = self.client.post(self.url, {"token": token.upper()}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "checked_in")
+        self.assertEqual(response.data["email"], "ann@example.com")
+        checked_in_at = Attendee.objects.get(email="ann@example.com").checked_in_at
+        self.assertIsNotNone(checked_in_at)
+
+        response = self.client.post(self.url, {"token": token}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual((response.data["status"], response.data["checked_in_at"]), ("duplicate", checked_in_at))
+
+    def test_unknown_tokens(self):
+        other_token = self.register("ann@example.com", event=self.other)
+        for token in (other_token, "0" * 16):
+            response = self.client.post(self.url, {"token": token}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.post(self.url, {}, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_sync(self):
+        first, second, early = self.register("a@example.com"), self.register("b@example.com"), self.register("c@example.com")
+        CheckinService.check_in(self.event.id, early)
+        base = timezone.now().replace(microsecond=0) - timedelta(minutes=30)
+        scans = [
+            {"token": first, "scanned_at": (base + timedelta(minutes=5)).isoformat()},
+            {"token": second, "scanned_at": base.isoformat()},
+            {"token": first, "scanned_at": base.isoformat()},
+            {"token": early, "scanned_at": base.isoformat()},
+            {"token": "f" * 16, "scanned_at": base.isoformat()},
+        ]
+        response = self.client.post(self.batch_url, {"scans": scans}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["status"] for row in response.data["results"]],
+            ["duplicate", "checked_in", "checked_in", "duplicate", "unknown"],
+        )
+        self.assertEqual((response.data["checked_in"], response.data["duplicate"], response.data["unknown"]), (2, 2, 1))
+        # Checked in at the earliest scan, as recorded by the device
+        self.assertEqual(Attendee.objects.get(email="a@example.com").checked_in_at, base)
+
+        response = self.client.post(self.batch_url, {"scans": scans[:2]}, format="json")
+        self.assertEqual(response.data["duplicate"], 2)
+
+    def test_batch_errors(self):
+        self.assertEqual(self.client.post(self.batch_url, [], format="json").status_code, status.HTTP_400_BAD_REQUEST)
+        bad = {"scans": [{"token": "abc"}]}
+        self.assertEqual(self.client.post(self.batch_url, bad, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+        missing = reverse("events:event-checkin-batch", args=[999])
+        scans = {"scans": [{"token": "abc", "scanned_at": timezone.now().isoformat()}]}
+        self.assertEqual(self.client.post(missing, scans, format="json").status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ArchiveTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = self.settings(ARCHIVE={"PATH": os.path.join(tmp.name, "archive.sqlite3"), "RETENTION_DAYS": 30})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        now = timezone.now()
+        self.old = [
+            self.make_event(f"Old {n}", now - timedelta(days=100 - n), location="Hall" if n % 2 else "Annex")
+            for n in range(5)
+        ]
+        self.recent = self.make_event("Recent", now - timedelta(days=10))
+        self.upcoming = self.make_event("Upcoming", now + timedelta(days=10))
+        for event in (self.old[0], self.recent, self.upcoming):
+            for n in range(3):
+                Attendee.objects.create(event=event, name=f"Guest {n}", email=f"guest{n}@example.com")
+        Attendee.objects.filter(event=self.old[0], email="guest0@example.com").update(checked_in_at=now - timedelta(days=100))
+        WaitlistEntry.objects.create(event=self.old[0], name="Late", email="late@example.com", position=1)
+
+    def make_event(self, name, start, location="Hall"):
+        return Event.objects.create(
+            name=name, location=location, start_time=start, end_time=start + timedelta(hours=2), max_capacity=3,
+        )
+
+    def test_command_moves_only_finished_events(self):
+        call_command("archive_events", stdout=StringIO())
+
+        old_ids = [event.id for event in self.old]
+        self.assertFalse(Event.objects.filter(pk__in=old_ids).exists())
+        self.assertFalse(Attendee.objects.filter(event_id__in=old_ids).exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertEqual(set(Event.objects.values_list("id", flat=True)), {self.recent.id, self.upcoming.id})
+        self.assertEqual(Attendee.objects.count(), 6)
+        self.assertEqual([row["id"] for row in get_archive().list_events()], old_ids)
+
+    def test_chunks_limit_and_rerun(self):
+        self.assertEqual(archive_events(chunk_size=2, limit=3), (3, 3))
+        self.assertEqual(Event.objects.filter(pk__in=[event.id for event in self.old]).count(), 2)
+        self.assertEqual(archive_events(chunk_size=2), (2, 0))
+        self.assertEqual(archive_events(), (0, 0))
+
+        out = StringIO()
+        call_command("archive_events", dry_run=True, older_than_days=0, stdout=out)
+        self.assertIn("1 event(s)", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("archive_events", chunk_size=0, stdout=StringIO())
+
+    def test_restore_round_trip(self):
+        event = self.old[0]
+        event_row = Event.objects.values().get(pk=event.id)
+        attendee_rows = list(Attendee.objects.filter(event=event).order_by("id").values())
+        archive_events()
+
+        self.assertEqual(restore_events([event.id, self.upcoming.id, 999]), ([event.id], []))
+        self.assertEqual(Event.objects.values().get(pk=event.id), {**event_row, "waitlist_head": 0, "waitlist_tail": 0})
+        self.assertEqual(list(Attendee.objects.filter(event=event).order_by("id").values()), attendee_rows)
+        self.assertIsNone(get_archive().get_event(event.id))
+        self.assertEqual(Event.objects.search("Old 0").get(), Event.objects.get(pk=event.id))
+
+        # Restoring again finds nothing; a clash with a live event stays archived
+        self.assertEqual(restore_events([event.id]), ([], []))
+        archive_events()
+        self.make_event("Old 0", event.start_time, location="Annex")
+        self.assertEqual(restore_events([event.id]), ([], [event.id]))
+        self.assertIsNotNone(get_archive().get_event(event.id))
+
+    def test_archive_api(self):
+        live = AttendeeSerializer(Attendee.objects.filter(event=self.old[0]).order_by("id").first()).data
+        archive_events()
+        url = reverse("events:archived-event-list")
+
+        response = self.client.get(url, {"location": "Hall", "page_size": 1})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.old[1].id])
+        self.assertEqual(response.data["results"][0]["start_time"], EventSerializer(self.old[1]).data["start_time"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.old[3].id])
+        self.assertIsNone(response.data["next"])
+        response = self.client.get(url, {"starts_after": self.old[3].start_time.isoformat()})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.old[3].id, self.old[4].id])
+        self.assertEqual(self.client.get(url, {"starts_before": "soon"}).status_code, 400)
+
+        response = self.client.get(reverse("events:archived-event-detail", args=[self.old[0].id]))
+        self.assertEqual(response.data["attendee_count"], 3)
+        first = response.data["attendees"][0]
+        self.assertEqual(set(first), {"id", "name", "email", "registered_at", "checked_in_at"})
+        self.assertEqual({field: first[field] for field in live}, dict(live))
+        self.assertIsNotNone(first["checked_in_at"])
+        detail = reverse("events:archived-event-detail", args=[self.upcoming.id])
+        self.assertEqual(self.client.get(detail).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_open_events_use_partial_index(self):
+        plan = EventService.get_upcoming_events().filter(attendee_count__lt=F("max_capacity")).explain()
+        self.assertIn("event_open_start_idx", plan)
@@ -0,0 +1,175 @@
+"""
+Write throttling: token buckets per client and per event, plus load shedding.
+
+Rates come from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` as
+``'<n>/<sec|min|hour|day>'``: a bucket of ``n`` tokens refilled at ``n`` per
+period, so ``n`` is also the burst size. A scope without a rate is not
+limited. Buckets live in the cache named by ``THROTTLE_CACHE_ALIAS``; use a
+shared cache (``REDIS_URL``) to limit across worker processes. Bucket updates
+are read-then-write, so concurrent requests can occasionally overdraw a bucket
+by a token, the same trade-off DRF's own throttles make.
+
+Load shedding looks at this process's database writes: how many are in
+flight and how long recent ones took. Above ``LOAD_SHEDDING`` thresholds new
+writes get ``503`` with ``Retry-After`` before they queue on the lock.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """``'30/min'`` -> ``(30, 0.5)``: bucket size and tokens refilled per second."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class; subclasses set ``scope`` and build the bucket key."""
+    scope = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_bucket_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        key = rate and self.get_bucket_key(request, view)
+        if not key:
+            return True
+
+        capacity, refill = parse_rate(rate)
+        cache = caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+        now = time.time()
+        tokens, stamp = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - stamp) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self._wait = (1 - tokens) / refill
+        # An untouched bucket is full again after capacity / refill seconds
+        cache.set(key, (tokens, now), timeout=math.ceil(capacity / refill) + 1)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class ClientRateThrottle(TokenBucketThrottle):
+    def get_bucket_key(self, request, view):
+        return f'throttle:{self.scope}:{self.get_ident(request)}'
+
+
+class EventRateThrottle(TokenBucketThrottle):
+    """Shared by all clients of one event, e.g. against a flash-sale stampede."""
+
+    def get_bucket_key(self, request, view):
+        pk = view.kwargs.get('pk')
+        return pk is not None and f'throttle:{self.scope}:{pk}'
+
+
+class RegisterClientThrottle(ClientRateThrottle):
+    scope = 'register'
+
+
+class RegisterEventThrottle(EventRateThrottle):
+    scope = 'register_event'
+
+
+class EventCreateThrottle(ClientRateThrottle):
+    scope = 'event_create'
+
+
+class Overloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The service is busy, please retry shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait):
+        super().__init__()
+        # DRF's exception handler turns this into Retry-After
+        self.wait = wait
+
+
+class WriteLoad:
+    """In-flight count and smoothed latency of this process's database writes."""
+    SMOOTHING = 0.2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = 0.0
+        self.updated_at = 0.0
+
+    @contextmanager
+    def track(self):
+        with self._lock:
+            self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self.in_flight -= 1
+                self.latency += self.SMOOTHING * (finished - started - self.latency)
+                self.updated_at = finished
+
+    def overloaded(self):
+        config = {'MAX_WRITES_IN_FLIGHT': 64, 'MAX_WRITE_LATENCY': 1.0, 'LATENCY_WINDOW': 2.0,
+                  **getattr(settings, 'LOAD_SHEDDING', {})}
+        if self.in_flight >= config['MAX_WRITES_IN_FLIGHT']:
+            return True
+        # Only recent samples count: while writes are shed no new samples
+        # arrive, and the latency signal must expire so traffic can resume
+        recent = time.monotonic() - self.updated_at < config['LATENCY_WINDOW']
+        return recent and self.latency > config['MAX_WRITE_LATENCY']
+
+
+write_load = WriteLoad()
+
+
+def retry_after():
+    """Seconds a shed or lock-timed-out write tells the client to wait."""
+    return getattr(settings, 'LOAD_SHEDDING', {}).get('RETRY_AFTER', 1)
+
+
+class LoadSheddingThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        if request.method not in SAFE_METHODS and write_load.overloaded():
+            raise Overloaded(wait=retry_after())
+        return True
+
+
+WRITE_THROTTLES = [LoadSheddingThrottle]
+REGISTER_THROTTLES = [LoadSheddingThrottle, RegisterClientThrottle, RegisterEventThrottle]
+EVENT_CREATE_THROTTLES = [LoadSheddingThrottle, EventCreateThrottle]
+
+
+def check_throttles(request, throttle_classes, view_kwargs):
+    """``APIView.check_throttles`` for views outside DRF; raises ``Throttled`` or ``Overloaded``."""
+    view = SimpleNamespace(kwargs=view_kwargs)
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            waits.append(throttle.wait())
+    if waits:
+        raise Throttled(max(waits))
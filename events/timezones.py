@@ -0,0 +1,27 @@
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = 'Asia/Kolkata'
+
+# IANA names are short; anything longer is rejected without a lookup
+MAX_TIMEZONE_NAME_LENGTH = 64
+
+
+@lru_cache(maxsize=128)
+def _load_timezone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def resolve_timezone(name):
+    """
+    Return the ``ZoneInfo`` for an IANA zone name, or ``None`` if it is unknown.
+
+    Lookups, including misses, go through a bounded LRU so the tz database is
+    read at most once per zone rather than once per request or per event.
+    """
+    if not name or len(name) > MAX_TIMEZONE_NAME_LENGTH:
+        return None
+    return _load_timezone(name)
@@ -1,16 +1,59 @@
+from django.conf import settings
 from django.urls import path
+from .idempotency import idempotent
 from .views import (
     EventListCreate,
     EventRetrieveUpdateDestroy,
     register_attendee,
+    registration_ticket,
+    bulk_register_attendees,
+    waitlist_position,
+    export_attendees,
+    event_occupancy,
+    event_conflicts,
+    attendee_registrations,
+    check_in,
+    check_in_batch,
+    archived_events,
+    archived_event_detail,
+    metrics,
     AttendeeList
 )
 
 app_name = 'events' 
 
+if getattr(settings, 'EVENTS_API_STACK', 'sync') == 'async':
+    from . import async_views
+
+    event_list = async_views.event_list
+    event_detail = async_views.event_detail
+    event_register = async_views.register_attendee
+    event_attendees = async_views.attendee_list
+else:
+    event_list = EventListCreate.as_view()
+    event_detail = EventRetrieveUpdateDestroy.as_view()
+    event_register = register_attendee
+    event_attendees = AttendeeList.as_view()
+
+# Clients retry these POSTs on timeouts; see events/idempotency.py
+event_list = idempotent(event_list)
+event_register = idempotent(event_register)
+
 urlpatterns = [
-    path('api/events/', EventListCreate.as_view(), name='event-list'),
-    path('api/events/<int:pk>/', EventRetrieveUpdateDestroy.as_view(), name='event-detail'),
-    path('api/events/<int:pk>/register/', register_attendee, name='event-register'),
-    path('api/events/<int:pk>/attendees/', AttendeeList.as_view(), name='event-attendees'),
+    path('api/events/', event_list, name='event-list'),
+    path('api/events/occupancy', event_occupancy, name='event-occupancy'),
+    path('api/events/conflicts', event_conflicts, name='event-conflicts'),
+    path('api/events/<int:pk>/', event_detail, name='event-detail'),
+    path('api/events/<int:pk>/register/', event_register, name='event-register'),
+    path('api/events/<int:pk>/register/bulk/', bulk_register_attendees, name='event-register-bulk'),
+    path('api/events/<int:pk>/attendees/', event_attendees, name='event-attendees'),
+    path('api/events/<int:pk>/attendees/export/', export_attendees, name='event-attendees-export'),
+    path('api/events/<int:pk>/checkin/', check_in, name='event-checkin'),
+    path('api/events/<int:pk>/checkin/batch/', check_in_batch, name='event-checkin-batch'),
+    path('api/events/<int:pk>/waitlist/', waitlist_position, name='event-waitlist'),
+    path('api/attendees/registrations', attendee_registrations, name='attendee-registrations'),
+    path('api/archive/events/', archived_events, name='archived-event-list'),
+    path('api/archive/events/<int:pk>/', archived_event_detail, name='archived-event-detail'),
+    path('api/registrations/<str:ticket>/', registration_ticket, name='registration-ticket'),
+    path('metrics', metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,35 +1,79 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
-from rest_framework.pagination import PageNumberPagination
-from django.shortcuts import get_object_or_404
+from rest_framework.decorators import api_view, throttle_classes
+from django.urls import reverse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from .models import Event, Attendee
-from .serializers import EventSerializer, AttendeeSerializer, RegistrationSerializer
-from .services import EventService, RegistrationService
+from .serializers import (
+    EventSerializer,
+    AttendeeSerializer,
+    RegistrationSerializer,
+    WaitlistEntrySerializer,
+    EventListSerializer,
+    AttendeeListSerializer,
+    AttendeeRegistrationListSerializer,
+    RegisteredAttendeeSerializer,
+    CheckinSerializer,
+    CheckinScanSerializer,
+)
+from .services import EventService, RegistrationService, WaitlistService, CheckinService, EventFull, VenueConflict
+from .timezones import DEFAULT_TIMEZONE, resolve_timezone
+from .filters import EventSearchFilter, parse_bound
+from .exports import EXPORT_FORMATS
+from .metrics import registry
+from .throttling import EVENT_CREATE_THROTTLES, REGISTER_THROTTLES, WRITE_THROTTLES, Overloaded, retry_after
+from .occupancy import MAX_IDS as MAX_OCCUPANCY_IDS, occupancy_index
+from .queueing import QUEUED, enqueue_registration, get_ticket, queue_enabled
+from .archive import get_store as get_archive, public_event, public_summary
+from .cache import (
+    cache_listing,
+    etag_matches,
+    event_validators,
+    get_cached_listing,
+    not_modified,
+    stamp_current_time,
+)
+from .pagination import (
+    EventPagination,
+    EventCursorPagination,
+    AttendeeCursorPagination,
+    RegistrationCursorPagination,
+    ArchiveCursorPagination,
+    SelectablePaginationMixin,
+)
+from django.db import OperationalError, transaction
 from django.utils import timezone
-import pytz
 import logging
 
 logger = logging.getLogger(__name__)
 
-class EventPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-    ordering = 'start_time'
+MAX_BULK_REGISTRATIONS = 10000
+MAX_LOOKUP_EMAILS = 500
+MAX_BATCH_SCANS = 10000
 
 class ErrorResponse(Response):
     def __init__(self, message, status=status.HTTP_400_BAD_REQUEST):
         logger.error(f"ErrorResponse: {message}")
         super().__init__({"error": message}, status=status)
 
-class EventListCreate(generics.ListCreateAPIView):
+def venue_conflict_response(conflict):
+    logger.error(f"ErrorResponse: {conflict.message}")
+    return Response(
+        {"error": conflict.message, "conflicts": [event.id for event in conflict.conflicts]},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+class EventListCreate(SelectablePaginationMixin, generics.ListCreateAPIView):
     serializer_class = EventSerializer
     pagination_class = EventPagination
+    pagination_modes = {'page': EventPagination, 'cursor': EventCursorPagination}
+    filter_backends = [EventSearchFilter]
+    throttle_classes = EVENT_CREATE_THROTTLES
 
     def get_queryset(self):
         logger.info("Fetching upcoming events")
-        return EventService.get_upcoming_events()
+        return EventService.get_upcoming_events(starts_after=EventSearchFilter.starts_after(self.request))
 
     def create(self, request, *args, **kwargs):
         logger.info("Creating a new event")
@@ -40,85 +84,395 @@ class EventListCreate(generics.ListCreateAPIView):
             headers = self.get_success_headers(serializer.data)
             logger.info(f"Event created successfully: {event}")
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        except VenueConflict as e:
+            return venue_conflict_response(e)
+        except OperationalError:
+            # Usually 'database is locked': worth a retry, so 503 rather than 400
+            logger.exception("Failed to create event")
+            raise Overloaded(wait=retry_after())
         except Exception as e:
             logger.exception("Failed to create event")
             return ErrorResponse(str(e))
 
     def list(self, request, *args, **kwargs):
-        timezone_str = request.query_params.get('timezone', 'Asia/Kolkata')
+        timezone_str = request.query_params.get('timezone', DEFAULT_TIMEZONE)
         logger.info(f"Listing events with timezone: {timezone_str}")
         
-        try:
-            tz = pytz.timezone(timezone_str)
-            queryset = self.filter_queryset(self.get_queryset())
-            
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                response_data = {
-                    'current_time': timezone.now().astimezone(tz).isoformat(),
-                    'timezone': timezone_str,
-                    'events': serializer.data
-                }
-                logger.info("Paginated event list returned")
-                return self.get_paginated_response(response_data)
-            
-            serializer = self.get_serializer(queryset, many=True)
-            logger.info("Full event list returned")
-            return Response({
-                'current_time': timezone.now().astimezone(tz).isoformat(),
-                'timezone': timezone_str,
-                'events': serializer.data
-            })
-            
-        except pytz.UnknownTimeZoneError:
+        tz = resolve_timezone(timezone_str)
+        if tz is None:
             logger.warning("Invalid timezone provided")
             return ErrorResponse('Invalid timezone provided')
 
+        cached = get_cached_listing(request)
+        if cached is None:
+            next_start_time = EventService.get_upcoming_events().values_list('start_time', flat=True).first()
+            cached = cache_listing(request, self.build_listing(timezone_str, tz), next_start_time)
+        else:
+            logger.info("Event list served from cache")
+
+        etag, data = cached
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        return Response(stamp_current_time(data, tz), headers={'ETag': etag})
+
+    def build_listing(self, timezone_str, tz):
+        # Read-only rows: EventListSerializer renders the same JSON as
+        # EventSerializer without building model instances
+        queryset = self.filter_queryset(self.get_queryset()).values(*EventListSerializer.columns())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            # DRF renders datetimes in the active timezone, so one override
+            # converts every start_time/end_time on the page
+            with timezone.override(tz):
+                events = EventListSerializer(page).data
+            response_data = {
+                'current_time': None,
+                'timezone': timezone_str,
+                'events': events
+            }
+            logger.info("Paginated event list returned")
+            return self.get_paginated_response(response_data).data
+
+        with timezone.override(tz):
+            events = EventListSerializer(queryset).data
+        logger.info("Full event list returned")
+        return {
+            'current_time': None,
+            'timezone': timezone_str,
+            'events': events
+        }
+
 class EventRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    throttle_classes = WRITE_THROTTLES
     lookup_url_kwarg = 'pk'
 
     def retrieve(self, request, *args, **kwargs):
         logger.info(f"Retrieving event with ID: {kwargs['pk']}")
-        return super().retrieve(request, *args, **kwargs)
+        event = self.get_object()
+        etag, last_modified = event_validators(event.version, event.updated_at)
+        headers = {'ETag': etag, 'Last-Modified': last_modified}
+        if not_modified(request, etag, last_modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(self.get_serializer(event).data, headers=headers)
 
     def update(self, request, *args, **kwargs):
         logger.info(f"Updating event with ID: {kwargs['pk']}")
-        return super().update(request, *args, **kwargs)
+        try:
+            with transaction.atomic():
+                return super().update(request, *args, **kwargs)
+        except VenueConflict as e:
+            return venue_conflict_response(e)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        previous_capacity = instance.max_capacity
+        previous_slot = (instance.location, instance.start_time, instance.end_time)
+        event = serializer.save()
+        # Only a new slot can clash; events that already overlap stay editable
+        if (event.location, event.start_time, event.end_time) != previous_slot:
+            EventService.check_venue(event)
+        if event.max_capacity > previous_capacity:
+            promoted = WaitlistService.promote(event.id)
+            if promoted:
+                logger.info(f"Promoted {len(promoted)} waitlisted attendee(s) for event {event.id}")
 
     def destroy(self, request, *args, **kwargs):
         logger.info(f"Deleting event with ID: {kwargs['pk']}")
         return super().destroy(request, *args, **kwargs)
 
 @api_view(['POST'])
+@throttle_classes(REGISTER_THROTTLES)
 def register_attendee(request, pk):
     logger.info(f"Registering attendee for event ID: {pk}")
-    event = get_object_or_404(Event, pk=pk)
     serializer = RegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
+    if queue_enabled():
+        return queue_registration(pk, serializer.validated_data)
     
     try:
         attendee = RegistrationService.register_attendee(
-            event.id, 
+            pk, 
             serializer.validated_data
         )
         logger.info(f"Attendee registered: {attendee}")
         return Response(
-            AttendeeSerializer(attendee).data,
+            RegisteredAttendeeSerializer(attendee).data,
             status=status.HTTP_201_CREATED
         )
+    except EventFull:
+        return join_waitlist(pk, serializer.validated_data)
+    except Event.DoesNotExist:
+        raise Http404("No Event matches the given query.")
+    except OperationalError:
+        logger.exception("Attendee registration failed")
+        raise Overloaded(wait=retry_after())
     except Exception as e:
         logger.exception("Attendee registration failed")
         return ErrorResponse(str(e))
 
-class AttendeeList(generics.ListAPIView):
+def queue_registration(pk, attendee_data):
+    if not Event.objects.filter(pk=pk).exists():
+        raise Http404("No Event matches the given query.")
+    ticket = enqueue_registration(pk, attendee_data)
+    logger.info(f"Registration for event {pk} queued as ticket {ticket}")
+    return Response(
+        {'ticket': ticket, 'status': QUEUED},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': reverse('events:registration-ticket', args=[ticket])},
+    )
+
+@api_view(['GET'])
+def event_occupancy(request):
+    try:
+        ids = list(dict.fromkeys(int(part) for part in request.query_params.get('ids', '').split(',') if part.strip()))
+    except ValueError:
+        return ErrorResponse('ids must be a comma-separated list of event ids')
+    if not ids:
+        return ErrorResponse('The ids query parameter is required')
+    if len(ids) > MAX_OCCUPANCY_IDS:
+        return ErrorResponse(f'At most {MAX_OCCUPANCY_IDS} ids can be requested at once')
+
+    found = occupancy_index.get_many(ids)
+    return Response({
+        'results': [
+            {
+                'id': event_id,
+                'max_capacity': found[event_id][0],
+                'attendee_count': found[event_id][1],
+                'seats_left': max(found[event_id][0] - found[event_id][1], 0),
+            }
+            for event_id in ids if event_id in found
+        ],
+        'missing': [event_id for event_id in ids if event_id not in found],
+    })
+
+@api_view(['GET'])
+def event_conflicts(request):
+    location = request.query_params.get('location', '').strip()
+    if not location:
+        return ErrorResponse('The location query parameter is required')
+    start = parse_bound('start', request.query_params.get('start', ''))
+    end = parse_bound('end', request.query_params.get('end', ''))
+    if start >= end:
+        return ErrorResponse('start must be before end')
+
+    rows = EventService.find_conflicts(location, start, end).values(*EventListSerializer.columns())
+    return Response({
+        'location': location,
+        'start': start,
+        'end': end,
+        'conflicts': EventListSerializer(rows).data,
+    })
+
+@api_view(['GET'])
+def attendee_registrations(request):
+    # ?email=a@x.com&email=b@y.com or ?email=a@x.com,b@y.com; stored emails are lowercase
+    emails = list(dict.fromkeys(
+        email.strip().lower()
+        for value in request.query_params.getlist('email')
+        for email in value.split(',') if email.strip()
+    ))
+    if not emails:
+        return ErrorResponse('The email query parameter is required')
+    if len(emails) > MAX_LOOKUP_EMAILS:
+        return ErrorResponse(f'At most {MAX_LOOKUP_EMAILS} emails can be looked up at once')
+
+    logger.info(f"Looking up registrations for {len(emails)} email(s)")
+    queryset = RegistrationService.get_registrations_for_emails(emails)
+    paginator = RegistrationCursorPagination()
+    page = paginator.paginate_queryset(queryset.values(*AttendeeRegistrationListSerializer.columns()), request)
+    return paginator.get_paginated_response(AttendeeRegistrationListSerializer(page).data)
+
+@api_view(['GET'])
+def archived_events(request):
+    # Read-only: events moved out of the live tables by archive_events
+    params = request.query_params
+    starts_after, starts_before = params.get('starts_after'), params.get('starts_before')
+    paginator = ArchiveCursorPagination()
+    page = paginator.paginate_archive(
+        get_archive(),
+        request,
+        location=params.get('location', '').strip() or None,
+        starts_after=parse_bound('starts_after', starts_after) if starts_after else None,
+        starts_before=parse_bound('starts_before', starts_before) if starts_before else None,
+    )
+    return paginator.get_paginated_response([public_summary(row) for row in page])
+
+@api_view(['GET'])
+def archived_event_detail(request, pk):
+    data = get_archive().get_event(pk)
+    if data is None:
+        raise Http404("No archived event matches the given query.")
+    return Response(public_event(data))
+
+@api_view(['GET'])
+def registration_ticket(request, ticket):
+    result = get_ticket(ticket)
+    if result is None:
+        raise Http404("Unknown registration ticket.")
+    return Response(result)
+
+def join_waitlist(pk, attendee_data):
+    try:
+        entry = WaitlistService.join(pk, attendee_data)
+    except OperationalError:
+        logger.exception("Joining waitlist failed")
+        raise Overloaded(wait=retry_after())
+    except Exception as e:
+        logger.exception("Joining waitlist failed")
+        return ErrorResponse(str(e))
+    if isinstance(entry, Attendee):
+        logger.info(f"Attendee registered from the waitlist: {entry}")
+        return Response(RegisteredAttendeeSerializer(entry).data, status=status.HTTP_201_CREATED)
+    logger.info(f"Attendee waitlisted: {entry}")
+    return Response(WaitlistEntrySerializer(entry).data, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def waitlist_position(request, pk):
+    email = request.query_params.get('email', '').strip().lower()
+    if not email:
+        return ErrorResponse('The email query parameter is required')
+    position = WaitlistService.get_position(pk, email)
+    if position is None:
+        raise Http404("This email is not on the waitlist for the event.")
+    return Response({'email': email, 'position': position})
+
+@api_view(['POST'])
+@throttle_classes(REGISTER_THROTTLES)
+def bulk_register_attendees(request, pk):
+    logger.info(f"Bulk registering attendees for event ID: {pk}")
+    if not isinstance(request.data, list):
+        return ErrorResponse('Expected a list of attendees')
+    if len(request.data) > MAX_BULK_REGISTRATIONS:
+        return ErrorResponse(f'At most {MAX_BULK_REGISTRATIONS} attendees can be registered per request')
+
+    serializer = RegistrationSerializer(data=request.data, many=True)
+    serializer.is_valid(raise_exception=True)
+
+    try:
+        statuses = RegistrationService.bulk_register(pk, serializer.validated_data)
+    except Event.DoesNotExist:
+        raise Http404("No Event matches the given query.")
+    except OperationalError:
+        logger.exception("Bulk attendee registration failed")
+        raise Overloaded(wait=retry_after())
+    except Exception as e:
+        logger.exception("Bulk attendee registration failed")
+        return ErrorResponse(str(e))
+
+    summary = {
+        state: statuses.count(state)
+        for state in (RegistrationService.ACCEPTED, RegistrationService.DUPLICATE, RegistrationService.OVER_CAPACITY)
+    }
+    logger.info(f"Bulk registration for event {pk}: {summary}")
+    accepted = [row['email'] for row, state in zip(serializer.validated_data, statuses) if state == RegistrationService.ACCEPTED]
+    tokens = RegistrationService.get_checkin_tokens(pk, accepted)
+    results = []
+    for row, state in zip(serializer.validated_data, statuses):
+        result = {'email': row['email'], 'status': state}
+        if state == RegistrationService.ACCEPTED:
+            result['checkin_token'] = tokens[row['email']]
+        results.append(result)
+    return Response(
+        {**summary, 'results': results},
+        status=status.HTTP_201_CREATED if summary[RegistrationService.ACCEPTED] else status.HTTP_200_OK,
+    )
+
+@api_view(['POST'])
+@throttle_classes(WRITE_THROTTLES)
+def check_in(request, pk):
+    serializer = CheckinSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    state, attendee = CheckinService.check_in(pk, serializer.validated_data['token'])
+    if state == CheckinService.UNKNOWN:
+        return ErrorResponse('Unknown check-in token', status=status.HTTP_404_NOT_FOUND)
+    logger.info(f"Check-in for event {pk}: attendee {attendee['id']} {state}")
+    return Response(
+        {'status': state, **attendee},
+        status=status.HTTP_200_OK if state == CheckinService.CHECKED_IN else status.HTTP_409_CONFLICT,
+    )
+
+@api_view(['POST'])
+@throttle_classes(WRITE_THROTTLES)
+def check_in_batch(request, pk):
+    scans = request.data.get('scans') if isinstance(request.data, dict) else None
+    if not isinstance(scans, list):
+        return ErrorResponse('Expected {"scans": [{"token": ..., "scanned_at": ...}, ...]}')
+    if len(scans) > MAX_BATCH_SCANS:
+        return ErrorResponse(f'At most {MAX_BATCH_SCANS} scans can be synced per request')
+
+    serializer = CheckinScanSerializer(data=scans, many=True)
+    serializer.is_valid(raise_exception=True)
+    try:
+        results = CheckinService.check_in_batch(pk, serializer.validated_data)
+    except Event.DoesNotExist:
+        raise Http404("No Event matches the given query.")
+
+    states = [state for state, _ in results]
+    summary = {
+        state: states.count(state)
+        for state in (CheckinService.CHECKED_IN, CheckinService.DUPLICATE, CheckinService.UNKNOWN)
+    }
+    logger.info(f"Check-in sync for event {pk}: {summary}")
+    return Response({
+        **summary,
+        'results': [
+            {'token': scan['token'], 'status': state, 'checked_in_at': checked_in_at}
+            for scan, (state, checked_in_at) in zip(serializer.validated_data, results)
+        ],
+    })
+
+class AttendeeList(SelectablePaginationMixin, generics.ListAPIView):
     serializer_class = AttendeeSerializer
     pagination_class = EventPagination
+    pagination_modes = {'page': EventPagination, 'cursor': AttendeeCursorPagination}
 
     def get_queryset(self):
+        return RegistrationService.get_attendees_for_event(self.kwargs['pk'])
+
+    def list(self, request, *args, **kwargs):
         event_id = self.kwargs['pk']
         logger.info(f"Fetching attendees for event ID: {event_id}")
-        event = get_object_or_404(Event, pk=event_id)
-        return RegistrationService.get_attendees_for_event(event.id)
+        # One primary key lookup answers polls that have seen this version
+        validators = Event.objects.filter(pk=event_id).values_list('version', 'updated_at').first()
+        if validators is None:
+            raise Http404("No Event matches the given query.")
+        etag, last_modified = event_validators(*validators)
+        headers = {'ETag': etag, 'Last-Modified': last_modified}
+        if not_modified(request, etag, last_modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*AttendeeListSerializer.columns())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(AttendeeListSerializer(page).data)
+        else:
+            response = Response(AttendeeListSerializer(queryset).data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+@require_GET
+def export_attendees(request, pk):
+    # A plain Django view: DRF would treat ?format= as a renderer override
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"error": f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    if not Event.objects.filter(pk=pk).exists():
+        raise Http404("No Event matches the given query.")
+
+    logger.info(f"Exporting attendees for event ID: {pk} as {export_format}")
+    stream, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(stream(pk), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="event-{pk}-attendees.{export_format}"'
+    return response
+
+@require_GET
+def metrics(request):
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
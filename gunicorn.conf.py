@@ -0,0 +1,20 @@
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+# Set GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker (with omnify_eventora.asgi)
+# together with EVENTS_API_STACK=async to serve the async views
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+raw_env = ['DJANGO_SETTINGS_MODULE=omnify_eventora.settings_production']
+
+
+def post_worker_init(worker):
+    # Fill the occupancy index before the worker takes requests
+    from django.db import connection
+    from events.occupancy import occupancy_index
+
+    occupancy_index.warm()
+    # Requests run on other threads, with their own connections
+    connection.close()
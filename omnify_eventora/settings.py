@@ -18,8 +18,6 @@ load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-DEBUG = os.environ.get('DEBUG', 'False') == 'True'
-
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -27,7 +25,8 @@ DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-$i!px!u6%)-2vu*yc8)3++x1)3!dyi%%snm)#lpbzdsdt1w$ea')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# omnify_eventora.settings_production forces it off.
+DEBUG = os.environ.get('DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = ["*"]
 
@@ -44,12 +43,24 @@ INSTALLED_APPS = [
     'rest_framework',
     'events',
 ]
+# 'sync' serves the API with DRF views (WSGI); 'async' switches the list,
+# detail, register and attendee endpoints to async views for ASGI servers.
+EVENTS_API_STACK = os.environ.get('EVENTS_API_STACK', 'sync')
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    # Token buckets on writes, '<n>/<sec|min|hour|day>' (see events/throttling.py).
+    # Unset scopes are not limited.
+    'DEFAULT_THROTTLE_RATES': {
+        'register': os.environ.get('THROTTLE_REGISTER'),              # per client
+        'register_event': os.environ.get('THROTTLE_REGISTER_EVENT'),  # per event, all clients
+        'event_create': os.environ.get('THROTTLE_EVENT_CREATE'),      # per client
+    },
 }
 
 MIDDLEWARE = [
+    'events.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,6 +100,92 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory by default; point REDIS_URL at a shared Redis to share the
+# cache between workers (needs the `redis` package). Idempotency records and
+# throttle buckets get caches of their own, so cached listing pages filling
+# the default cache cannot evict them.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': prefix,
+        }
+        for alias, prefix in (('default', ''), ('idempotency', 'idempotency'), ('throttle', 'throttle'))
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'omnify-eventora',
+        },
+        'idempotency': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'omnify-eventora-idempotency',
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('IDEMPOTENCY_MAX_ENTRIES', 50_000))},
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'omnify-eventora-throttle',
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('THROTTLE_MAX_ENTRIES', 100_000))},
+        },
+    }
+
+# Cached /api/events/ pages. Entries also expire when the next event starts.
+EVENT_LIST_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('EVENT_LIST_CACHE_TIMEOUT', 60)),
+}
+
+# Responses stored for Idempotency-Key retries of POST /api/events/ and /register/
+IDEMPOTENCY = {
+    'ALIAS': 'idempotency',
+    'TTL': int(os.environ.get('IDEMPOTENCY_TTL', 24 * 60 * 60)),
+}
+
+# Queued (write-behind) registrations: POST /register/ answers 202 with a ticket.
+# WORKER 'thread' drains the queue inside each server process; with 'command',
+# run `python manage.py process_registration_queue` with a backend the web
+# workers share, such as events.queueing.SQLiteQueue (OPTIONS: path, result_ttl).
+REGISTRATION_QUEUE = {
+    'ENABLED': os.environ.get('REGISTRATION_QUEUE', 'False') == 'True',
+    'BACKEND': os.environ.get('REGISTRATION_QUEUE_BACKEND', 'events.queueing.MemoryQueue'),
+    'OPTIONS': {},
+    'BATCH_SIZE': 500,
+    'WORKER': os.environ.get('REGISTRATION_QUEUE_WORKER', 'thread'),
+}
+
+# /api/events/occupancy entries older than this are reloaded from the database
+OCCUPANCY_INDEX = {
+    'MAX_AGE': int(os.environ.get('OCCUPANCY_MAX_AGE', 5)),
+}
+
+# Cold storage for finished events: `python manage.py archive_events` moves events
+# that ended more than RETENTION_DAYS ago, CHUNK_SIZE per transaction, into PATH
+ARCHIVE = {
+    'PATH': os.environ.get('ARCHIVE_PATH', BASE_DIR / 'archive.sqlite3'),
+    'RETENTION_DAYS': int(os.environ.get('ARCHIVE_RETENTION_DAYS', 90)),
+    'CHUNK_SIZE': 100,
+}
+
+# Cache holding the throttle buckets
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+# Writes get 503 + Retry-After while this process has too many database writes
+# in flight, or recent writes (within LATENCY_WINDOW seconds) averaged too long
+LOAD_SHEDDING = {
+    'MAX_WRITES_IN_FLIGHT': int(os.environ.get('LOAD_SHEDDING_MAX_WRITES', 64)),
+    'MAX_WRITE_LATENCY': float(os.environ.get('LOAD_SHEDDING_MAX_LATENCY', 1.0)),
+    'LATENCY_WINDOW': 2.0,
+    'RETRY_AFTER': 1,
+}
+
+# One JSON line per request (view, status, latency, query count) on the events.requests logger
+METRICS_LOG_REQUESTS = os.environ.get('METRICS_LOG_REQUESTS', 'False') == 'True'
+
 
 LOGGING = {
     'version': 1,
@@ -0,0 +1,48 @@
+"""
+Production settings for omnify_eventora.
+
+Use with ``DJANGO_SETTINGS_MODULE=omnify_eventora.settings_production`` behind a
+multi-worker server, e.g. ``gunicorn -c gunicorn.conf.py omnify_eventora.wsgi``.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, REST_FRAMEWORK
+
+# Also stops Django from keeping every executed query in memory
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '*').split(',')
+
+# SQLite tuned for concurrent workers: WAL lets readers run alongside the
+# single writer, and writers wait on the busy timeout instead of failing with
+# "database is locked".
+DATABASES = {
+    'default': {
+        'ENGINE': 'omnify_eventora.sqlite_backend',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+                'cache_size': -64000,  # KiB, i.e. 64 MB per connection
+                'mmap_size': 268435456,
+                'temp_store': 'MEMORY',
+            },
+        },
+    }
+}
+
+# Write limits on by default; override with the THROTTLE_* variables
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {
+        'register': os.environ.get('THROTTLE_REGISTER', '30/min'),
+        'register_event': os.environ.get('THROTTLE_REGISTER_EVENT', '200/sec'),
+        'event_create': os.environ.get('THROTTLE_EVENT_CREATE', '10/min'),
+    },
+}
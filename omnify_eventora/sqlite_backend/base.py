@@ -0,0 +1,21 @@
+"""
+SQLite backend that applies ``OPTIONS['pragmas']`` to every new connection.
+
+    'ENGINE': 'omnify_eventora.sqlite_backend',
+    'OPTIONS': {'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}},
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Not a sqlite3.connect() argument, so take it out before connecting
+        self.pragmas = params.pop('pragmas', {})
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn